@@ -0,0 +1,296 @@
+"""
+AI Hub Dashboard Aggregation for DowUrk Inc.
+Materialized per-user dashboard documents, built concurrently and updated as AI Hub events happen
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+from usage_metering import usage_meter
+
+DASHBOARD_CACHE_SECONDS = 30
+DASHBOARD_CACHE_MAX_USERS = 5000
+DEADLINES_CACHE_SECONDS = 300
+DEADLINE_WINDOW_DAYS = 30
+
+# Sections stored in the materialized document; subscription usage and grant
+# deadlines change independently of the user's own events and are read live
+SECTIONS = ("coaching", "grants", "mentors", "peer_group")
+
+QUICK_ACTIONS = [
+    {"action": "start_coaching", "label": "Start AI Coaching", "icon": "🎯"},
+    {"action": "find_grants", "label": "Find Grants", "icon": "💰"},
+    {"action": "match_mentor", "label": "Find a Mentor", "icon": "👥"},
+    {"action": "take_course", "label": "Take a Course", "icon": "📚"}
+]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _is_anonymous(user_key: str) -> bool:
+    # Anonymous callers are keyed by client IP, which everyone behind one NAT or proxy shares
+    return user_key.startswith("ip:")
+
+
+class DashboardAggregator:
+    """
+    Serves the AI Hub dashboard from a materialized document per user.
+
+    Missing sections are rebuilt from their source collections concurrently;
+    the record_* hooks update individual sections as coaching sessions,
+    check-ins, grant matches, mentor matches and peer groups are produced.
+    Anonymous callers get a blank dashboard and nothing is stored for them.
+    """
+
+    def __init__(self):
+        self.db = None
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # user -> (expires_at, doc)
+        self._deadlines: Optional[tuple] = None
+
+    async def start(self, db) -> None:
+        self.db = db
+        await db.coaching_sessions.create_index("session_id", unique=True)
+        await db.coaching_sessions.create_index([("user_id", 1), ("created_at", -1)])
+
+    # ---------- reads ----------
+
+    async def get_dashboard(self, user_key: str, display_user_id: Optional[str] = None) -> Dict[str, Any]:
+        doc, subscription, deadlines = await asyncio.gather(
+            self._get_document(user_key),
+            usage_meter.get_usage(user_key),
+            self._upcoming_deadlines()
+        )
+
+        coaching = doc["coaching"]
+        grants = doc["grants"]
+        mentors = doc["mentors"]
+        peer_group = doc["peer_group"]
+
+        return {
+            "user_id": display_user_id or "demo_user",
+            "subscription": {
+                "tier": subscription["tier"],
+                "days_remaining": None,
+                "usage": subscription["usage"]
+            },
+            "coaching": coaching,
+            "grants": {
+                "matches_found": grants["matches_found"],
+                "top_matches": grants["top_matches"],
+                "applications_in_progress": grants["applications_in_progress"],
+                "upcoming_deadlines": deadlines
+            },
+            "community": {
+                "mentor_matches": mentors["mentor_matches"],
+                "peer_group": peer_group,
+                "networking_score": min(100, 25 + 15 * mentors["mentor_matches"] + (25 if peer_group else 0))
+            },
+            "quick_actions": QUICK_ACTIONS,
+            "recommendations": _recommendations(coaching, grants, mentors)
+        }
+
+    async def _get_document(self, user_key: str) -> Dict[str, Any]:
+        if _is_anonymous(user_key):
+            return _blank_document()
+        now = time.monotonic()
+        cached = self._cache.get(user_key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        doc = await self.db.ai_hub_dashboards.find_one({"_id": user_key}) or {"_id": user_key}
+        missing = [section for section in SECTIONS if section not in doc]
+        if missing:
+            built = await asyncio.gather(*(self._build_section(section, user_key) for section in missing))
+            updates = dict(zip(missing, built))
+            doc.update(updates)
+            await self.db.ai_hub_dashboards.update_one(
+                {"_id": user_key},
+                {"$set": {**updates, "updated_at": _utcnow().isoformat()}},
+                upsert=True
+            )
+
+        self._remember(user_key, doc)
+        return doc
+
+    def _remember(self, user_key: str, doc: Dict[str, Any]) -> None:
+        self._cache[user_key] = (time.monotonic() + DASHBOARD_CACHE_SECONDS, doc)
+        self._cache.move_to_end(user_key)
+        while len(self._cache) > DASHBOARD_CACHE_MAX_USERS:
+            self._cache.popitem(last=False)
+
+    async def _build_section(self, section: str, user_key: str) -> Any:
+        if section == "coaching":
+            session = await self.db.coaching_sessions.find_one(
+                {"user_id": user_key}, {"_id": 0}, sort=[("created_at", -1)]
+            )
+            return _coaching_section(session)
+        if section == "grants":
+            latest = await self.db.grant_match_results.find_one({"_id": user_key})
+            return _grants_section((latest or {}).get("matches", []))
+        if section == "mentors":
+            latest = await self.db.mentor_match_results.find_one({"_id": user_key})
+            return {"mentor_matches": len((latest or {}).get("matches", []))}
+        if section == "peer_group":
+            group = await self.db.peer_groups.find_one({"_id": user_key})
+            return _peer_group_section(group)
+        raise ValueError(f"Unknown dashboard section: {section}")
+
+    async def _upcoming_deadlines(self) -> int:
+        now = time.monotonic()
+        if self._deadlines and self._deadlines[0] > now:
+            return self._deadlines[1]
+        today = _utcnow()
+        count = await self.db.grants.count_documents({
+            "is_active": True,
+            "deadline": {
+                "$gte": today.isoformat(),
+                "$lte": (today + timedelta(days=DEADLINE_WINDOW_DAYS)).isoformat()
+            }
+        })
+        self._deadlines = (now + DEADLINES_CACHE_SECONDS, count)
+        return count
+
+    # ---------- incremental updates ----------
+
+    async def _set_section(self, user_key: str, section: str, value: Any) -> None:
+        await self.db.ai_hub_dashboards.update_one(
+            {"_id": user_key},
+            {"$set": {section: value, "updated_at": _utcnow().isoformat()}},
+            upsert=True
+        )
+        cached = self._cache.get(user_key)
+        if cached:
+            cached[1][section] = value
+
+    async def record_coaching_session(self, user_key: str, session: Dict[str, Any]) -> None:
+        if _is_anonymous(user_key):
+            return
+        doc = {
+            "session_id": session["session_id"],
+            "user_id": user_key,
+            "business_stage": session.get("business_stage"),
+            "health_score": session.get("health_score"),
+            "completed_milestones": 0,
+            "created_at": _utcnow().isoformat(),
+            "next_checkin": (_utcnow() + timedelta(days=7)).isoformat()
+        }
+        await self.db.coaching_sessions.insert_one(dict(doc))
+        await self._set_section(user_key, "coaching", _coaching_section(doc))
+
+    async def record_checkin(self, user_key: str, session_id: str, checkin: Dict[str, Any],
+                             completed_tasks: List[str]) -> None:
+        if _is_anonymous(user_key):
+            return
+        change = checkin.get("health_score_change")
+        if not isinstance(change, (int, float)):
+            change = 0
+        session = await self.db.coaching_sessions.find_one_and_update(
+            {"session_id": session_id, "user_id": user_key},
+            [{"$set": {
+                "health_score": {"$cond": [
+                    {"$isNumber": "$health_score"}, {"$add": ["$health_score", change]}, "$health_score"
+                ]},
+                "completed_milestones": {"$add": [{"$ifNull": ["$completed_milestones", 0]}, len(completed_tasks)]},
+                "next_checkin": (_utcnow() + timedelta(days=7)).isoformat()
+            }}],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        if session:
+            await self._set_section(session["user_id"], "coaching", _coaching_section(session))
+
+    async def record_grant_matches(self, user_key: str, result: Dict[str, Any]) -> None:
+        if _is_anonymous(user_key):
+            return
+        matches = result.get("matches", [])
+        await self.db.grant_match_results.replace_one(
+            {"_id": user_key},
+            {"matches": matches, "created_at": _utcnow().isoformat()},
+            upsert=True
+        )
+        await self._set_section(user_key, "grants", _grants_section(matches))
+
+    async def record_mentor_matches(self, user_key: str, result: Dict[str, Any]) -> None:
+        if _is_anonymous(user_key):
+            return
+        matches = result.get("matches", [])
+        await self.db.mentor_match_results.replace_one(
+            {"_id": user_key},
+            {"matches": matches, "created_at": _utcnow().isoformat()},
+            upsert=True
+        )
+        await self._set_section(user_key, "mentors", {"mentor_matches": len(matches)})
+
+    async def record_peer_group(self, user_key: str, group: Dict[str, Any]) -> None:
+        if _is_anonymous(user_key):
+            return
+        doc = {**group, "created_at": _utcnow().isoformat()}
+        await self.db.peer_groups.replace_one({"_id": user_key}, doc, upsert=True)
+        await self._set_section(user_key, "peer_group", _peer_group_section(doc))
+
+
+# ==================== SECTION SHAPES ====================
+
+def _blank_document() -> Dict[str, Any]:
+    return {
+        "coaching": _coaching_section(None),
+        "grants": _grants_section([]),
+        "mentors": {"mentor_matches": 0},
+        "peer_group": _peer_group_section(None)
+    }
+
+
+def _coaching_section(session: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not session:
+        return {"active_session": False, "health_score": None, "next_checkin": None, "completed_milestones": 0}
+    score = session.get("health_score")
+    return {
+        "active_session": True,
+        "session_id": session["session_id"],
+        "health_score": max(0, min(100, score)) if isinstance(score, (int, float)) else None,
+        "next_checkin": session.get("next_checkin"),
+        "completed_milestones": session.get("completed_milestones", 0)
+    }
+
+
+def _grants_section(matches: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ranked = sorted(matches, key=lambda m: m.get("match_score") or 0, reverse=True)
+    return {
+        "matches_found": len(matches),
+        "top_matches": [
+            {"grant_id": m.get("grant_id"), "grant_title": m.get("grant_title"), "match_score": m.get("match_score")}
+            for m in ranked[:3]
+        ],
+        "applications_in_progress": 0
+    }
+
+
+def _peer_group_section(group: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not group:
+        return None
+    return {
+        "group_name": group.get("group_name"),
+        "group_focus": group.get("group_focus"),
+        "member_count": len(group.get("members", []))
+    }
+
+
+def _recommendations(coaching: Dict, grants: Dict, mentors: Dict) -> List[str]:
+    recommendations = []
+    if grants["matches_found"] == 0:
+        recommendations.append("Complete your business profile to get better grant matches")
+    if not coaching["active_session"]:
+        recommendations.append("Start a coaching session to create your 30-day action plan")
+    if mentors["mentor_matches"] == 0:
+        recommendations.append("Connect with a mentor in your industry")
+    return recommendations or ["Keep up the momentum - check in with your coach this week"]
+
+
+dashboards = DashboardAggregator()
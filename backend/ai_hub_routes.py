@@ -7,7 +7,6 @@ from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timezone
-import uuid
 
 # Import AI Hub services
 from ai_hub_service import (
@@ -24,6 +23,9 @@ from ai_hub_service import (
     generate_custom_report,
     SUBSCRIPTION_TIERS
 )
+from auth import caller_key, get_optional_user
+from usage_metering import metered, usage_meter
+from ai_hub_dashboard import dashboards
 
 # Create router
 ai_hub_router = APIRouter(prefix="/api/ai-hub", tags=["AI Hub"])
@@ -117,13 +119,10 @@ class CustomReportRequest(BaseModel):
 # ==================== COACHING ENDPOINTS ====================
 
 @ai_hub_router.post("/coach/session")
-async def create_coaching_session(request: CoachingSessionRequest, user_id: str = None):
+async def create_coaching_session(request: CoachingSessionRequest, user_key: str = Depends(metered("ai_chats_per_month"))):
     """Start a new AI coaching session"""
-    if user_id is None:
-        user_id = str(uuid.uuid4())  # For demo purposes
-    
     result = await start_coaching_session(
-        user_id=user_id,
+        user_id=user_key,
         business_stage=request.business_stage,
         business_description=request.business_description,
         current_challenges=request.current_challenges
@@ -132,10 +131,11 @@ async def create_coaching_session(request: CoachingSessionRequest, user_id: str
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
     
+    await dashboards.record_coaching_session(user_key, result)
     return result
 
 @ai_hub_router.post("/coach/checkin")
-async def process_weekly_checkin(request: WeeklyCheckinRequest):
+async def process_weekly_checkin(request: WeeklyCheckinRequest, user_key: str = Depends(metered("ai_chats_per_month"))):
     """Process weekly accountability check-in"""
     result = await weekly_checkin(
         session_id=request.session_id,
@@ -148,9 +148,10 @@ async def process_weekly_checkin(request: WeeklyCheckinRequest):
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
     
+    await dashboards.record_checkin(user_key, request.session_id, result, request.completed_tasks)
     return result
 
-@ai_hub_router.post("/coach/micro-course")
+@ai_hub_router.post("/coach/micro-course", dependencies=[Depends(metered("ai_chats_per_month"))])
 async def get_micro_course(request: MicroCourseRequest):
     """Generate a micro-course on a specific topic"""
     result = await generate_micro_course(
@@ -203,7 +204,7 @@ async def get_coaching_topics():
 # ==================== GRANT ENDPOINTS ====================
 
 @ai_hub_router.post("/grants/match")
-async def find_matching_grants(request: GrantMatchRequest):
+async def find_matching_grants(request: GrantMatchRequest, user_key: str = Depends(metered("grant_matches"))):
     """Find grants matching the business profile"""
     # Sample grants for matching (in production, fetch from database)
     sample_grants = [
@@ -263,9 +264,10 @@ async def find_matching_grants(request: GrantMatchRequest):
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
     
+    await dashboards.record_grant_matches(user_key, result)
     return result
 
-@ai_hub_router.post("/grants/apply")
+@ai_hub_router.post("/grants/apply", dependencies=[Depends(metered("ai_chats_per_month"))])
 async def generate_application(request: GrantApplicationRequest):
     """Generate grant application content"""
     grant_info = {
@@ -329,7 +331,7 @@ async def get_grant_deadlines():
 # ==================== COMMUNITY ENDPOINTS ====================
 
 @ai_hub_router.post("/community/mentors")
-async def find_mentors(request: MentorMatchRequest):
+async def find_mentors(request: MentorMatchRequest, user_key: str = Depends(metered("mentor_requests"))):
     """Find matching mentors"""
     # Sample mentors (in production, fetch from database)
     sample_mentors = [
@@ -385,9 +387,10 @@ async def find_mentors(request: MentorMatchRequest):
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
     
+    await dashboards.record_mentor_matches(user_key, result)
     return result
 
-@ai_hub_router.post("/community/collaborate")
+@ai_hub_router.post("/community/collaborate", dependencies=[Depends(metered("ai_chats_per_month"))])
 async def find_collaboration_opportunities(request: CollaboratorRequest):
     """Find potential collaborators"""
     # Sample users (in production, fetch from database)
@@ -434,7 +437,7 @@ async def find_collaboration_opportunities(request: CollaboratorRequest):
     return result
 
 @ai_hub_router.post("/community/peer-group")
-async def create_accountability_group(request: PeerGroupRequest):
+async def create_accountability_group(request: PeerGroupRequest, user_key: str = Depends(metered("ai_chats_per_month"))):
     """Create an AI-curated peer accountability group"""
     # Sample users for group formation
     sample_users = [
@@ -451,6 +454,7 @@ async def create_accountability_group(request: PeerGroupRequest):
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
     
+    await dashboards.record_peer_group(user_key, result)
     return result
 
 @ai_hub_router.get("/community/networking-events")
@@ -535,21 +539,15 @@ async def upgrade_subscription(request: SubscriptionUpgradeRequest, user_id: str
     }
 
 @ai_hub_router.get("/subscription/status")
-async def get_subscription_status(user_id: str = None):
+async def get_subscription_status(user_key: str = Depends(caller_key), user_id: Optional[str] = Depends(get_optional_user)):
     """Get current subscription status"""
-    # In production, fetch from database
+    metering = await usage_meter.get_usage(user_key)
     return {
         "user_id": user_id or "demo_user",
-        "current_tier": "free",
-        "tier_info": SUBSCRIPTION_TIERS["free"],
-        "usage": {
-            "ai_chats_used": 5,
-            "ai_chats_limit": 20,
-            "grant_matches_used": 1,
-            "grant_matches_limit": 3,
-            "mentor_requests_used": 0,
-            "mentor_requests_limit": 1
-        },
+        "current_tier": metering["tier"],
+        "tier_info": SUBSCRIPTION_TIERS[metering["tier"]],
+        "period": metering["period"],
+        "usage": metering["usage"],
         "upgrade_benefits": {
             "pro": ["Unlimited AI chats", "Full coaching access", "More mentor matches"],
             "elite": ["1:1 coaching", "Custom reports", "Investor introductions"]
@@ -559,8 +557,8 @@ async def get_subscription_status(user_id: str = None):
 
 # ==================== ELITE FEATURES ====================
 
-@ai_hub_router.post("/elite/custom-report")
-async def create_custom_report(request: CustomReportRequest, user_id: str = None):
+@ai_hub_router.post("/elite/custom-report", dependencies=[Depends(metered("ai_chats_per_month"))])
+async def create_custom_report(request: CustomReportRequest, user_id: Optional[str] = Depends(get_optional_user)):
     """Generate custom business report (Elite tier only)"""
     # In production, check user subscription
     # if not check_feature_access(user_tier, "custom_reports"):
@@ -627,39 +625,6 @@ async def get_report_types():
 # ==================== DASHBOARD ENDPOINTS ====================
 
 @ai_hub_router.get("/dashboard")
-async def get_ai_hub_dashboard(user_id: str = None):
+async def get_ai_hub_dashboard(user_key: str = Depends(caller_key), user_id: Optional[str] = Depends(get_optional_user)):
     """Get AI Hub dashboard data"""
-    return {
-        "user_id": user_id or "demo_user",
-        "subscription": {
-            "tier": "free",
-            "days_remaining": None
-        },
-        "coaching": {
-            "active_session": False,
-            "health_score": None,
-            "next_checkin": None,
-            "completed_milestones": 0
-        },
-        "grants": {
-            "matches_found": 3,
-            "applications_in_progress": 0,
-            "upcoming_deadlines": 2
-        },
-        "community": {
-            "mentor_matches": 0,
-            "peer_group": None,
-            "networking_score": 25
-        },
-        "quick_actions": [
-            {"action": "start_coaching", "label": "Start AI Coaching", "icon": "🎯"},
-            {"action": "find_grants", "label": "Find Grants", "icon": "💰"},
-            {"action": "match_mentor", "label": "Find a Mentor", "icon": "👥"},
-            {"action": "take_course", "label": "Take a Course", "icon": "📚"}
-        ],
-        "recommendations": [
-            "Complete your business profile to get better grant matches",
-            "Start a coaching session to create your 30-day action plan",
-            "Connect with a mentor in your industry"
-        ]
-    }
+    return await dashboards.get_dashboard(user_key, display_user_id=user_id)
@@ -1,11 +1,14 @@
 import os
-from openai import AsyncOpenAI
+from llm_client import LazyAsyncOpenAI, create_chat_completion
+from resilience import CircuitOpenError
+from tracing import span
 from typing import List, Dict, Optional
 import json
+import uuid
 from datetime import datetime, timezone
 
 # Initialize OpenAI client
-client = AsyncOpenAI(
+client = LazyAsyncOpenAI(
     api_key=os.environ.get('OPENAI_API_KEY'),
     base_url=os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com/v1')
 )
@@ -82,7 +85,7 @@ async def start_coaching_session(
     """
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -93,10 +96,12 @@ async def start_coaching_session(
         )
         
         result = json.loads(response.choices[0].message.content)
-        result["session_id"] = f"coach_{user_id}_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}"
+        result["session_id"] = f"coach_{uuid.uuid4().hex}"
         result["business_stage"] = business_stage
         return result
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error starting coaching session: {str(e)}")
         return {"error": "Unable to start coaching session"}
@@ -139,7 +144,7 @@ async def weekly_checkin(
     """
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": "You are an encouraging business coach providing weekly check-in feedback."},
@@ -151,6 +156,8 @@ async def weekly_checkin(
         
         return json.loads(response.choices[0].message.content)
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error processing check-in: {str(e)}")
         return {"error": "Unable to process check-in"}
@@ -187,7 +194,7 @@ async def generate_micro_course(topic: str, business_stage: str) -> Dict:
     """
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": "You are an expert business educator creating engaging micro-courses."},
@@ -199,6 +206,8 @@ async def generate_micro_course(topic: str, business_stage: str) -> Dict:
         
         return json.loads(response.choices[0].message.content)
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error generating micro-course: {str(e)}")
         return {"error": "Unable to generate micro-course"}
@@ -212,7 +221,9 @@ async def match_grants(
 ) -> List[Dict]:
     """Match business profile with available grants"""
     
-    prompt = f"""
+    with span("grants.build_prompt", **{"grants.count": len(available_grants)}) as current:
+        grants_json = json.dumps(available_grants, indent=2)
+        prompt = f"""
     Analyze this business profile and match it with available grants.
     
     Business Profile:
@@ -224,7 +235,7 @@ async def match_grants(
     - Certifications: {', '.join(business_profile.get('certifications', []))}
     
     Available Grants:
-    {json.dumps(available_grants, indent=2)}
+    {grants_json}
     
     For each grant, provide:
     1. Match score (0-100)
@@ -251,9 +262,10 @@ async def match_grants(
         "suggested_actions": ["action 1", "action 2"]
     }}
     """
+        current.set(**{"prompt.chars": len(prompt)})
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": "You are a grant funding expert helping Louisiana entrepreneurs find funding opportunities."},
@@ -263,8 +275,11 @@ async def match_grants(
             response_format={"type": "json_object"}
         )
         
-        return json.loads(response.choices[0].message.content)
+        with span("grants.parse_response"):
+            return json.loads(response.choices[0].message.content)
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error matching grants: {str(e)}")
         return {"error": "Unable to match grants", "matches": []}
@@ -311,7 +326,7 @@ async def generate_grant_application(
     """
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": "You are an expert grant writer who has helped secure millions in funding for Louisiana businesses."},
@@ -323,6 +338,8 @@ async def generate_grant_application(
         
         return json.loads(response.choices[0].message.content)
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error generating grant application: {str(e)}")
         return {"error": "Unable to generate application content"}
@@ -374,7 +391,7 @@ async def match_mentors(
     """
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": "You are an expert at matching entrepreneurs with mentors for maximum growth and success."},
@@ -386,6 +403,8 @@ async def match_mentors(
         
         return json.loads(response.choices[0].message.content)
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error matching mentors: {str(e)}")
         return {"error": "Unable to match mentors", "matches": []}
@@ -437,7 +456,7 @@ async def find_collaborators(
     """
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": "You are an expert business networker helping Louisiana entrepreneurs find valuable connections."},
@@ -449,6 +468,8 @@ async def find_collaborators(
         
         return json.loads(response.choices[0].message.content)
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error finding collaborators: {str(e)}")
         return {"error": "Unable to find collaborators", "collaborators": []}
@@ -492,7 +513,7 @@ async def create_peer_group(
     """
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": "You are an expert at creating high-performing peer accountability groups for entrepreneurs."},
@@ -504,6 +525,8 @@ async def create_peer_group(
         
         return json.loads(response.choices[0].message.content)
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error creating peer group: {str(e)}")
         return {"error": "Unable to create peer group"}
@@ -644,7 +667,7 @@ async def generate_custom_report(
     """
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4.1-mini",
             messages=[
                 {"role": "system", "content": "You are a senior business consultant creating executive-level reports."},
@@ -658,6 +681,8 @@ async def generate_custom_report(
         result["generated_at"] = datetime.now(timezone.utc).isoformat()
         return result
         
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error generating report: {str(e)}")
         return {"error": "Unable to generate report"}
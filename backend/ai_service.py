@@ -1,10 +1,12 @@
 import os
-from openai import AsyncOpenAI
+from fastapi import HTTPException
+from llm_client import LazyAsyncOpenAI, create_chat_completion
+from resilience import CircuitOpenError
 from typing import List, Dict
 import json
 
 # Initialize OpenAI client with Emergent Universal Key
-client = AsyncOpenAI(
+client = LazyAsyncOpenAI(
     api_key=os.environ.get('OPENAI_API_KEY'),
     base_url='https://llm.emergent.sh/v1'
 )
@@ -74,7 +76,7 @@ async def generate_ai_response(
     
     try:
         # Call OpenAI API
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4o-mini",  # Using cost-effective model
             messages=messages,
             temperature=0.7,
@@ -83,9 +85,14 @@ async def generate_ai_response(
         
         return response.choices[0].message.content
     
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error calling OpenAI API: {str(e)}")
-        return "I apologize, but I'm having trouble processing your request right now. Please try again later."
+        raise HTTPException(
+            status_code=502,
+            detail="I apologize, but I'm having trouble processing your request right now. Please try again later."
+        )
 
 async def generate_business_plan_outline(business_idea: str, industry: str) -> Dict[str, any]:
     """
@@ -120,7 +127,7 @@ async def generate_business_plan_outline(business_idea: str, industry: str) -> D
     """
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a business planning expert. Respond only with valid JSON."},
@@ -132,9 +139,11 @@ async def generate_business_plan_outline(business_idea: str, industry: str) -> D
         
         return json.loads(response.choices[0].message.content)
     
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error generating business plan: {str(e)}")
-        return {"error": "Unable to generate business plan outline"}
+        raise HTTPException(status_code=502, detail="Unable to generate business plan outline")
 
 async def analyze_grant_eligibility(business_description: str, grant_criteria: List[str]) -> Dict[str, any]:
     """
@@ -164,7 +173,7 @@ async def analyze_grant_eligibility(business_description: str, grant_criteria: L
     """
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a grant funding expert. Respond only with valid JSON."},
@@ -176,9 +185,11 @@ async def analyze_grant_eligibility(business_description: str, grant_criteria: L
         
         return json.loads(response.choices[0].message.content)
     
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error analyzing grant eligibility: {str(e)}")
-        return {"error": "Unable to analyze grant eligibility"}
+        raise HTTPException(status_code=502, detail="Unable to analyze grant eligibility")
 
 async def generate_marketing_content(business_name: str, business_description: str, content_type: str) -> str:
     """
@@ -194,7 +205,7 @@ async def generate_marketing_content(business_name: str, business_description: s
     prompt = prompts.get(content_type, prompts["tagline"])
     
     try:
-        response = await client.chat.completions.create(
+        response = await create_chat_completion(client,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": "You are a creative marketing copywriter."},
@@ -206,6 +217,8 @@ async def generate_marketing_content(business_name: str, business_description: s
         
         return response.choices[0].message.content
     
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error generating marketing content: {str(e)}")
-        return "Unable to generate content at this time."
+        raise HTTPException(status_code=502, detail="Unable to generate content at this time.")
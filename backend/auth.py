@@ -0,0 +1,65 @@
+"""
+Authentication for DowUrk API
+JWT access tokens and the FastAPI dependencies that resolve the calling user
+"""
+
+import os
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+import jwt
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from rate_limiter import client_ip
+
+JWT_ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 30
+
+security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+
+def jwt_secret() -> str:
+    # Read per call: this module is imported before server.py loads backend/.env
+    return os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production')
+
+
+def create_access_token(data: dict):
+    to_encode = data.copy()
+    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire})
+    encoded_jwt = jwt.encode(to_encode, jwt_secret(), algorithm=JWT_ALGORITHM)
+    return encoded_jwt
+
+
+def decode_subject(token: str) -> str:
+    """The user id (`sub`) of a valid access token; 401 otherwise"""
+    try:
+        payload = jwt.decode(token, jwt_secret(), algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired")
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    return user_id
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return decode_subject(credentials.credentials)
+
+
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> Optional[str]:
+    """The signed-in user, or None for anonymous requests (a bad token is still a 401)"""
+    if credentials is None:
+        return None
+    return decode_subject(credentials.credentials)
+
+
+async def caller_key(request: Request, user_id: Optional[str] = Depends(get_optional_user)) -> str:
+    """Quota key for the caller: the authenticated user, or the client IP when anonymous"""
+    return user_id or f"ip:{client_ip(request)}"
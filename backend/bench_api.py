@@ -0,0 +1,322 @@
+"""
+In-process API benchmark and regression suite for DowUrk
+Drives the FastAPI app through httpx's ASGI transport against a throwaway MongoDB database,
+with the LLM and Louisiana SOS APIs answered by in-process mock servers
+
+Each scenario fires --requests calls with --concurrency in flight and records p50/p95/p99
+latency and throughput. Results are written to --output; with --baseline, any scenario whose
+p95 grew or throughput dropped by more than --threshold is reported and the exit code is 1.
+
+Usage:
+    python bench_api.py                                   # local mongod, throwaway database
+    python bench_api.py --mongo mongomock                 # no MongoDB needed (in-memory mongomock-motor)
+    python bench_api.py --baseline bench_baseline.json    # compare against a stored run
+    python bench_api.py --output bench_baseline.json      # record a new baseline
+    python bench_api.py --sos-fixtures fixtures/la_sos    # replay recorded LA SOS responses (see la_sos_transport)
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", f"dowurk_bench_{os.getpid()}")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+# The mock LA SOS API is free: lift the paid-call quotas so cold scenarios measure the app, not 429s
+for name in ("LA_SOS_LIVE_CALLS_PER_MINUTE", "LA_SOS_DAILY_CALLS", "LA_SOS_DAILY_CALLS_PER_USER"):
+    os.environ.setdefault(name, "-1")
+
+import httpx
+from openai import AsyncOpenAI
+
+import ai_hub_service
+import ai_service
+import la_sos_service
+from auth import create_access_token
+from la_sos_transport import ReplayTransport
+import server
+import synthetic_data
+
+BENCH_USER_ID = "bench-user"
+
+
+# ==================== MOCK UPSTREAMS ====================
+
+def llm_transport(latency_ms: float) -> httpx.MockTransport:
+    """OpenAI-compatible chat completions endpoint"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        body = json.loads(request.content)
+        wants_json = (body.get("response_format") or {}).get("type") == "json_object"
+        content = json.dumps({"matches": [], "summary": "Benchmark response"}) if wants_json else "Benchmark response"
+        return httpx.Response(200, json={
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "bench"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 120, "completion_tokens": 40, "total_tokens": 160}
+        })
+    return httpx.MockTransport(handler)
+
+
+def la_sos_transport(latency_ms: float, result_count: int) -> httpx.MockTransport:
+    """Louisiana SOS Commercial API: entity search and charter lookup"""
+    search = {
+        "Status": "Success", "TokenType": "Test", "ResultCount": result_count,
+        "EntitySearchResults": [
+            {"Name": f"BAYOU BUSINESS {i} LLC", "EntityNumber": f"4234{i:05d}K", "EntityTypeId": 1,
+             "City": "BATON ROUGE", "EntityStatus": "Active", "TypeName": "Limited Liability Company"}
+            for i in range(result_count)
+        ]
+    }
+    charter = {"Status": "Success", "CharterDetails": {
+        "CharterNumber": "42340001K", "CharterName": "BAYOU BUSINESS 1 LLC",
+        "CharterStatusDescription": "Active", "City": "BATON ROUGE", "AnnualReportStatus": "Good Standing",
+        "Agents": [{"FirstName": "MARIE", "LastName": "JOHNSON", "City": "BATON ROUGE", "State": "LA"}],
+        "Officers": [{"FirstName": "MARIE", "LastName": "JOHNSON", "Titles": "Manager"}],
+        "Addresses": [], "PreviousNames": [], "Amendments": []
+    }}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return httpx.Response(200, json=charter if "EntityNumber" in request.url.params else search)
+    return httpx.MockTransport(handler)
+
+
+def install_mocks(opts: argparse.Namespace) -> None:
+    transport = llm_transport(opts.llm_latency_ms)
+    for module in (ai_service, ai_hub_service):
+        module.client = AsyncOpenAI(api_key="bench", base_url="http://llm.bench/v1",
+                                    http_client=httpx.AsyncClient(transport=transport))
+    if opts.sos_fixtures:
+        la_sos_service.set_transport(ReplayTransport(opts.sos_fixtures, latency_ms=opts.sos_latency_ms,
+                                                     error_rate=opts.sos_error_rate, seed=opts.seed))
+    else:
+        la_sos_service.set_transport(la_sos_transport(opts.sos_latency_ms, opts.sos_results))
+
+
+def use_database(opts: argparse.Namespace) -> None:
+    if opts.mongo == "mongomock":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--mongo mongomock needs: pip install mongomock-motor")
+        server.db = AsyncMongoMockClient()[os.environ["DB_NAME"]]
+
+
+# ==================== DATA ====================
+
+async def seed(db, opts: argparse.Namespace) -> Dict[str, Any]:
+    """Load a synthetic dataset and return ids the scenarios refer to"""
+    gen = argparse.Namespace(users=opts.businesses // 5 or 1, password_hash=server.hash_password("bench"),
+                             base_time=synthetic_data.base_time())
+    rng = synthetic_data._rng(opts.seed, "bench", 0)
+    counts = {"users": gen.users, "businesses": opts.businesses, "events": 200, "posts": 500, "grants": 100}
+    for kind, total in counts.items():
+        make_row = synthetic_data.GENERATORS[kind]
+        for start in range(0, total, 1000):
+            await db[kind].insert_many([make_row(rng, i, gen) for i in range(start, min(start + 1000, total))])
+    await db.blessings.insert_many([
+        {"id": f"bench-blessing-{i}", "name": "Anonymous", "blessing": "Grateful for this community.",
+         "is_anonymous": True, "created_at": datetime.now(timezone.utc).isoformat()}
+        for i in range(100)
+    ])
+    # Unlimited plan, so metering never turns AI scenarios into 429s
+    await db.users.insert_one({"id": BENCH_USER_ID, "email": "bench@example.com", "full_name": "Bench User",
+                               "subscription_tier": "pro"})
+    business = await db.businesses.find_one({}, {"_id": 0, "id": 1})
+    return {"business_id": business["id"]}
+
+
+# ==================== SCENARIOS ====================
+
+def scenarios(ids: Dict[str, Any]) -> List[Dict[str, Any]]:
+    bench_user = {"Authorization": f"Bearer {create_access_token({'sub': BENCH_USER_ID})}"}
+    grant_profile = {"business_name": "Bayou Bakery", "category": "food", "parish": "Orleans",
+                     "description": "Family bakery in the Seventh Ward", "certifications": ["MBE"]}
+    return [
+        {"name": "GET /api/businesses", "method": "GET", "url": "/api/businesses"},
+        {"name": "GET /api/businesses?fields", "method": "GET",
+         "url": "/api/businesses?fields=business_name,category,city"},
+        {"name": "GET /api/businesses?category", "method": "GET", "url": "/api/businesses?category=beauty"},
+        {"name": "GET /api/businesses/search", "method": "GET",
+         "url": "/api/businesses/search?category=beauty&category=business&certifications=MBE"},
+        {"name": "GET /api/businesses/{id}", "method": "GET", "url": f"/api/businesses/{ids['business_id']}"},
+        {"name": "GET /api/events", "method": "GET", "url": "/api/events"},
+        {"name": "GET /api/grants", "method": "GET", "url": "/api/grants"},
+        {"name": "GET /api/posts", "method": "GET", "url": "/api/posts"},
+        {"name": "GET /api/blessings", "method": "GET", "url": "/api/blessings"},
+        {"name": "POST /api/ai/chat", "method": "POST", "url": "/api/ai/chat", "headers": bench_user,
+         "json": {"message": "How do I register an LLC in Louisiana?"}},
+        {"name": "POST /api/ai-hub/grants/match", "method": "POST",
+         "url": "/api/ai-hub/grants/match", "headers": bench_user, "json": grant_profile},
+        {"name": "GET /api/ai-hub/dashboard", "method": "GET", "url": "/api/ai-hub/dashboard", "headers": bench_user},
+        # Repeats are answered by the mirror and lookup cache; the cold variants reach the API every call
+        {"name": "POST /api/la-sos/search", "method": "POST", "url": "/api/la-sos/search",
+         "json": {"entity_name": "bayou"}},
+        {"name": "POST /api/la-sos/search (cold)", "method": "POST", "url": "/api/la-sos/search",
+         "json": lambda n: {"entity_name": f"cold search {n}"}},
+        {"name": "POST /api/la-sos/lookup", "method": "POST", "url": "/api/la-sos/lookup",
+         "json": {"entity_number": "42340001K"}},
+        {"name": "POST /api/la-sos/lookup (cold)", "method": "POST", "url": "/api/la-sos/lookup",
+         "json": lambda n: {"entity_number": f"9{n:08d}K"}},
+    ]
+
+
+def percentile(sorted_ms: List[float], pct: float) -> float:
+    index = min(len(sorted_ms) - 1, max(0, round(pct / 100 * len(sorted_ms)) - 1))
+    return sorted_ms[index]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Dict[str, Any], opts: argparse.Namespace) -> Dict[str, Any]:
+    # A callable body is given the call number, so every call can send a distinct request
+    body = scenario.get("json")
+    calls = itertools.count()
+
+    async def call() -> int:
+        payload = body(next(calls)) if callable(body) else body
+        response = await client.request(scenario["method"], scenario["url"], json=payload,
+                                        headers=scenario.get("headers"))
+        await response.aread()
+        return response.status_code
+
+    for _ in range(opts.warmup):
+        await call()
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = iter(range(opts.requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            code = await call()
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[code] = statuses.get(code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(opts.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for code, count in statuses.items() if code >= 400),
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "rps": round(len(latencies) / elapsed, 1)
+    }
+
+
+# ==================== REPORTING ====================
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Scenarios that regressed beyond threshold (p95 up or throughput down)"""
+    print(f"\nCompared with baseline from {baseline['meta'].get('timestamp', '?')} (threshold {threshold:.0%})")
+    print(f"{'Scenario':<36}{'p95 ms':>10}{'base':>10}{'Δ':>9}{'rps':>10}{'base':>10}{'Δ':>9}")
+    print("-" * 94)
+    regressions = []
+    for name, now in results["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before:
+            continue
+        p95_delta = now["p95_ms"] / max(before["p95_ms"], 1e-9) - 1
+        rps_delta = now["rps"] / max(before["rps"], 1e-9) - 1
+        flag = ""
+        if p95_delta > threshold or rps_delta < -threshold or now["errors"] > before["errors"]:
+            regressions.append(name)
+            flag = "  ⚠ REGRESSION"
+        print(f"{name:<36}{now['p95_ms']:>10.2f}{before['p95_ms']:>10.2f}{p95_delta:>+9.0%}"
+              f"{now['rps']:>10.1f}{before['rps']:>10.1f}{rps_delta:>+9.0%}{flag}")
+    return regressions
+
+
+async def run(opts: argparse.Namespace) -> int:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    use_database(opts)
+    install_mocks(opts)
+    db = server.db
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "mongo": opts.mongo,
+            "businesses": opts.businesses,
+            "concurrency": opts.concurrency,
+            "requests": opts.requests,
+            "llm_latency_ms": opts.llm_latency_ms,
+            "sos_latency_ms": opts.sos_latency_ms,
+            "sos_fixtures": opts.sos_fixtures
+        },
+        "scenarios": {}
+    }
+    only = set(opts.only or [])
+    try:
+        async with server.app.router.lifespan_context(server.app):
+            ids = await seed(db, opts)
+            transport = httpx.ASGITransport(app=server.app, client=("10.0.0.1", 50000))
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+                print(f"{'Scenario':<36}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'rps':>10}{'errors':>8}")
+                print("-" * 84)
+                for scenario in scenarios(ids):
+                    if only and not any(part in scenario["name"] for part in only):
+                        continue
+                    stats = await run_scenario(client, scenario, opts)
+                    results["scenarios"][scenario["name"]] = stats
+                    print(f"{scenario['name']:<36}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+                          f"{stats['p99_ms']:>10.2f}{stats['rps']:>10.1f}{stats['errors']:>8}")
+    finally:
+        if opts.mongo == "mongod":
+            await server.client.drop_database(os.environ["DB_NAME"])
+
+    with open(opts.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📝 Results written to {opts.output}")
+
+    if opts.baseline:
+        with open(opts.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, opts.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} scenario(s) regressed: {', '.join(regressions)}")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo", choices=["mongod", "mongomock"], default="mongod",
+                        help="mongod uses MONGO_URL with a throwaway database that is dropped afterwards")
+    parser.add_argument("--businesses", type=int, default=5000, help="Synthetic businesses to load")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=300, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per scenario")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="Simulated LLM response time")
+    parser.add_argument("--sos-latency-ms", type=float, default=0, help="Simulated LA SOS response time")
+    parser.add_argument("--sos-results", type=int, default=200, help="Rows in each mock LA SOS search")
+    parser.add_argument("--sos-fixtures", help="Replay recorded LA SOS fixtures from this directory instead of the mock")
+    parser.add_argument("--sos-error-rate", type=float, default=0, help="Share of replayed LA SOS calls answered 503")
+    parser.add_argument("--only", nargs="*", help="Run scenarios whose name contains any of these")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative p95/throughput change")
+    sys.exit(asyncio.run(run(parser.parse_args())))
@@ -0,0 +1,197 @@
+"""
+Serialization benchmark for DowUrk API responses
+Compares FastAPI's default JSONResponse path with FastJSONResponse per endpoint
+
+Usage:
+    python bench_json_response.py [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "dowurk_bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from starlette.responses import JSONResponse
+
+from json_response import FastJSONResponse
+from server import Business, Event, Grant, Resource, Post
+
+
+def _iso(days: int = 0) -> str:
+    return (datetime.now(timezone.utc) + timedelta(days=days)).isoformat()
+
+
+# ==================== SAMPLE PAYLOADS ====================
+
+def make_businesses(n: int) -> List[Dict[str, Any]]:
+    return [{
+        "id": str(uuid.uuid4()),
+        "business_name": f"Bayou Business {i}",
+        "owner_name": "Marie Johnson",
+        "email": f"owner{i}@example.com",
+        "phone": "(504) 555-0101",
+        "category": "food",
+        "description": "Authentic Creole and Cajun cuisine featuring family recipes passed down through generations.",
+        "address": f"{i} Magazine St",
+        "city": "New Orleans",
+        "parish": "Orleans",
+        "zip_code": "70130",
+        "website": "https://example.com",
+        "social_media": {"facebook": "https://facebook.com/x", "instagram": "https://instagram.com/x"},
+        "hours_of_operation": "Mon-Sat: 11am-9pm",
+        "services_offered": ["Dine-in", "Takeout", "Catering"],
+        "organization_type": "for-profit",
+        "certifications": ["MBE", "WBE"],
+        "user_id": str(uuid.uuid4()),
+        "created_at": datetime.fromisoformat(_iso(-i)),
+        "updated_at": datetime.fromisoformat(_iso(-i)),
+        "is_verified": True,
+        "rating": 4.5,
+        "review_count": i
+    } for i in range(n)]
+
+
+def make_events(n: int) -> List[Dict[str, Any]]:
+    return [{
+        "id": str(uuid.uuid4()),
+        "title": f"Workshop {i}",
+        "description": "Hands-on training for Louisiana entrepreneurs.",
+        "event_type": "workshop",
+        "start_time": datetime.fromisoformat(_iso(i)),
+        "end_time": datetime.fromisoformat(_iso(i + 1)),
+        "location": "Baton Rouge",
+        "organizer": "DowUrk Inc.",
+        "max_attendees": 50,
+        "tags": ["training", "business"],
+        "created_at": datetime.fromisoformat(_iso()),
+        "attendees": []
+    } for i in range(n)]
+
+
+def make_grants(n: int) -> List[Dict[str, Any]]:
+    return [{
+        "id": str(uuid.uuid4()),
+        "title": f"Small Business Grant {i}",
+        "organization": "Louisiana Economic Development",
+        "description": "Funding for small businesses.",
+        "amount_range": "$5,000 - $25,000",
+        "eligibility": ["Louisiana-based", "Under 50 employees"],
+        "deadline": datetime.fromisoformat(_iso(i)),
+        "application_link": "https://example.com/apply",
+        "categories": ["small_business"],
+        "created_at": datetime.fromisoformat(_iso())
+    } for i in range(n)]
+
+
+def make_resources(n: int) -> List[Dict[str, Any]]:
+    return [{
+        "id": str(uuid.uuid4()),
+        "title": f"Guide {i}",
+        "description": "How to register your business in Louisiana.",
+        "resource_type": "article",
+        "category": "legal",
+        "url": "https://example.com/guide",
+        "tags": ["legal"],
+        "created_at": datetime.fromisoformat(_iso())
+    } for i in range(n)]
+
+
+def make_posts(n: int) -> List[Dict[str, Any]]:
+    return [{
+        "id": str(uuid.uuid4()),
+        "title": f"Looking for a partner {i}",
+        "content": "We are looking for a catering partner for events in Lafayette.",
+        "post_type": "collaboration",
+        "tags": ["food"],
+        "user_id": str(uuid.uuid4()),
+        "user_name": "Marie Johnson",
+        "created_at": datetime.fromisoformat(_iso())
+    } for i in range(n)]
+
+
+def make_blessings(n: int) -> Dict[str, Any]:
+    return {"total": n, "blessings": [
+        {"id": str(uuid.uuid4()), "name": "Anonymous", "blessing": "Grateful for this community.",
+         "is_anonymous": True, "created_at": _iso()}
+        for _ in range(n)
+    ]}
+
+
+def make_la_sos_search(n: int) -> Dict[str, Any]:
+    return {"success": True, "result_count": n, "token_type": "Live", "results": [
+        {"name": f"LOUISIANA BUSINESS {i} LLC", "entity_number": f"4234{i:05d}K", "entity_type": "Charter",
+         "city": "BATON ROUGE", "status": "Active", "type_name": "Limited Liability Company"}
+        for i in range(n)
+    ]}
+
+
+# ==================== SERIALIZATION PATHS ====================
+
+def response_model_path(model) -> Callable[[Any, type], bytes]:
+    """Route with response_model: validate + serialize, then render with the response class"""
+    field = create_response_field(name=f"Response_{model.__name__}", type_=List[model])
+    loop = asyncio.new_event_loop()
+
+    def run(content: Any, response_class: type) -> bytes:
+        serialized = loop.run_until_complete(serialize_response(field=field, response_content=content))
+        return response_class(serialized).body
+
+    return run
+
+
+def plain_path(content: Any, response_class: type) -> bytes:
+    """Route returning a dict: jsonable_encoder before, returned directly as FastJSONResponse after"""
+    if response_class is JSONResponse:
+        return JSONResponse(jsonable_encoder(content)).body
+    return FastJSONResponse(content).body
+
+
+def time_call(fn: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def run_benchmark(rows: int, repeat: int) -> None:
+    endpoints = [
+        ("GET /api/businesses", response_model_path(Business), make_businesses(rows)),
+        ("GET /api/events", response_model_path(Event), make_events(rows)),
+        ("GET /api/grants", response_model_path(Grant), make_grants(rows)),
+        ("GET /api/resources", response_model_path(Resource), make_resources(rows)),
+        ("GET /api/posts", response_model_path(Post), make_posts(50)),
+        ("GET /api/blessings", plain_path, make_blessings(50)),
+        ("POST /api/la-sos/search", plain_path, make_la_sos_search(rows)),
+    ]
+
+    print(f"{'Endpoint':<28}{'JSONResponse ms':>18}{'FastJSONResponse ms':>22}{'Speedup':>10}")
+    print("-" * 78)
+    for name, path, payload in endpoints:
+        before_body = path(payload, JSONResponse)
+        after_body = path(payload, FastJSONResponse)
+        assert len(after_body) > 0 and len(before_body) > 0
+
+        before = time_call(lambda: path(payload, JSONResponse), repeat)
+        after = time_call(lambda: path(payload, FastJSONResponse), repeat)
+        print(f"{name:<28}{before:>18.2f}{after:>22.2f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per list payload")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per endpoint (median reported)")
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.repeat)
@@ -0,0 +1,214 @@
+"""
+Decoding benchmark for Louisiana SOS responses
+Compares the previous decode path (httpx Response.json() plus a BusinessSearchResult model per
+row) with decode_search_response / decode_lookup_response, from raw response bytes to the API
+output shape, and checks both produce identical output
+
+Payloads are synthetic by default; --fixtures replays responses recorded with LA_SOS_MODE=record.
+
+Usage:
+    python bench_la_sos_decode.py [--rows 5000] [--repeat 20]
+    python bench_la_sos_decode.py --fixtures fixtures/la_sos
+"""
+
+import argparse
+import functools
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from pydantic import BaseModel
+
+from la_sos_service import ENTITY_TYPES, decode_lookup_response, decode_search_response
+
+decode_charter_response = functools.partial(decode_lookup_response, entity_type_id=1)
+
+
+# ==================== SAMPLE PAYLOADS ====================
+
+def make_search(rows: int) -> bytes:
+    agents = rows // 10
+    return json.dumps({
+        "Status": "Success", "TokenType": "Live", "ResultCount": rows + agents,
+        "EntitySearchResults": [
+            {"Name": f"LOUISIANA BUSINESS {i} LLC", "EntityNumber": f"4234{i:05d}K", "EntityTypeId": 1,
+             "City": "BATON ROUGE", "EntityStatus": "Active", "TypeName": "Limited Liability Company"}
+            for i in range(rows)
+        ],
+        "AgentOfficerSearchResults": [
+            {"AgentOfficerName": f"JOHNSON, MARIE {i}", "EntityNumber": f"4234{i:05d}K", "EntityTypeId": 1,
+             "City": "BATON ROUGE", "EntityStatus": "Active", "TypeName": "Limited Liability Company",
+             "Affiliation": "Registered Agent"}
+            for i in range(agents)
+        ]
+    }).encode()
+
+
+def make_charter(people: int) -> bytes:
+    person = {"FirstName": "MARIE", "LastName": "JOHNSON", "Address1": "100 MAIN ST", "Address2": "SUITE 2",
+              "City": "BATON ROUGE", "State": "LA", "ZipCode": "70801", "Zip": "70801",
+              "AppointmentDate": "2020-06-15", "Titles": "Manager"}
+    return json.dumps({"Status": "Success", "CharterDetails": {
+        "CharterNumber": "42340001K", "CharterName": "BAYOU BUSINESS 1 LLC",
+        "CharterStatusDescription": "Active", "City": "BATON ROUGE", "AnnualReportStatus": "Good Standing",
+        "Agents": [person] * people, "Officers": [person] * people,
+        "Addresses": [{"AddressType": "Mailing", "Address1": "100 MAIN ST", "City": "BATON ROUGE",
+                       "State": "LA", "ZipCode": "70801"}] * people,
+        "PreviousNames": [{"Name": "OLD NAME LLC", "ChangeDate": "2019-01-01"}] * people,
+        "Amendments": [{"Description": "Amendment", "DateFiled": "2021-01-01"}] * people
+    }}).encode()
+
+
+def load_fixtures(fixture_dir: str) -> List[Tuple[str, bytes, Callable[[bytes], Any], Callable[[bytes], Any]]]:
+    cases = []
+    for path in sorted(Path(fixture_dir).glob("*.json")):
+        fixture = json.loads(path.read_text())
+        if fixture["status_code"] != 200:
+            continue
+        body = fixture["body"].encode()
+        params = fixture["request"]["params"]
+        if "EntityNumber" in params:
+            # The baseline only covers charters, where nearly all the decoding work is
+            if int(params.get("EntityTypeId", 1)) == 1:
+                cases.append((f"lookup {path.stem}", body, baseline_lookup, decode_charter_response))
+        elif "EntityName" in params or "FirstName" in params or "LastName" in params:
+            cases.append((f"search {path.stem}", body, baseline_search, decode_search_response))
+    return cases
+
+
+# ==================== BASELINE (previous decode path) ====================
+
+class BusinessSearchResult(BaseModel):
+    """The per-row model the service used to build before decoding to plain dicts"""
+    name: str
+    entity_number: str
+    entity_type: str
+    city: Optional[str] = None
+    status: Optional[str] = None
+    type_name: Optional[str] = None
+
+
+def _response_json(content: bytes) -> Dict[str, Any]:
+    return httpx.Response(200, content=content, headers={"content-type": "application/json"}).json()
+
+
+def baseline_search(content: bytes) -> Dict[str, Any]:
+    data = _response_json(content)
+    if data.get("Status") == "Error":
+        return {"error": data.get("Message", "Unknown error"), "response_code": data.get("ResponseCode")}
+    results = [BusinessSearchResult(
+        name=entity.get("Name", ""),
+        entity_number=entity.get("EntityNumber", ""),
+        entity_type=ENTITY_TYPES.get(entity.get("EntityTypeId", 0), "Unknown"),
+        city=entity.get("City"),
+        status=entity.get("EntityStatus"),
+        type_name=entity.get("TypeName")
+    ) for entity in data.get("EntitySearchResults", [])]
+    agents = [BusinessSearchResult(
+        name=agent.get("AgentOfficerName", ""),
+        entity_number=agent.get("EntityNumber", ""),
+        entity_type=ENTITY_TYPES.get(agent.get("EntityTypeId", 0), "Unknown"),
+        city=agent.get("City"),
+        status=agent.get("EntityStatus"),
+        type_name=f"{agent.get('TypeName', '')} ({agent.get('Affiliation', '')})"
+    ) for agent in data.get("AgentOfficerSearchResults", [])]
+    entity_rows = [result.model_dump() for result in results]
+    agent_rows = [result.model_dump() for result in agents]
+    return {
+        "entity_rows": entity_rows,
+        "agent_rows": agent_rows,
+        "result_count": data.get("ResultCount", len(entity_rows) + len(agent_rows)),
+        "token_type": data.get("TokenType", "Test")
+    }
+
+
+def baseline_lookup(content: bytes) -> Dict[str, Any]:
+    data = _response_json(content)
+    details = data.get("CharterDetails", {})
+    annual_status = details.get("AnnualReportStatus", "")
+    return {
+        "success": True,
+        "entity_type": "Charter",
+        "entity_number": details.get("CharterNumber", ""),
+        "name": details.get("CharterName", ""),
+        "status": details.get("CharterStatusDescription", ""),
+        "sub_status": details.get("CharterSubStatusDescription"),
+        "registration_date": details.get("RegistrationDate"),
+        "file_date": details.get("FileDate"),
+        "city": details.get("City"),
+        "category": details.get("CharterCategory"),
+        "business_type": details.get("BusinessType"),
+        "annual_report_status": annual_status,
+        "is_good_standing": annual_status.lower() in ["good standing", "current", "active"],
+        "agents": [{
+            "name": f"{a.get('FirstName', '')} {a.get('LastName', '')}".strip(),
+            "address": f"{a.get('Address1', '')} {a.get('Address2', '')}".strip(),
+            "city": a.get("City"), "state": a.get("State"), "zip": a.get("ZipCode"),
+            "appointment_date": a.get("AppointmentDate")
+        } for a in details.get("Agents", [])],
+        "officers": [{
+            "name": f"{o.get('FirstName', '')} {o.get('LastName', '')}".strip(),
+            "titles": o.get("Titles", ""),
+            "address": f"{o.get('Address1', '')} {o.get('Address2', '')}".strip(),
+            "city": o.get("City"), "state": o.get("State"), "zip": o.get("Zip")
+        } for o in details.get("Officers", [])],
+        "addresses": [{
+            "type": addr.get("AddressType"), "address1": addr.get("Address1"), "address2": addr.get("Address2"),
+            "city": addr.get("City"), "state": addr.get("State"), "zip": addr.get("ZipCode")
+        } for addr in details.get("Addresses", [])],
+        "previous_names": [{"name": pn.get("Name"), "change_date": pn.get("ChangeDate")}
+                           for pn in details.get("PreviousNames", [])],
+        "amendments": [{"description": am.get("Description"), "date_filed": am.get("DateFiled")}
+                       for am in details.get("Amendments", [])]
+    }
+
+
+# ==================== RUN ====================
+
+def time_call(fn: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def run_benchmark(rows: int, repeat: int, fixture_dir: Optional[str] = None) -> None:
+    if fixture_dir:
+        cases = load_fixtures(fixture_dir)
+        if not cases:
+            raise SystemExit(f"No search or lookup fixtures with status 200 in {fixture_dir}")
+    else:
+        cases = [
+            (f"search {rows} rows", make_search(rows), baseline_search, decode_search_response),
+            (f"search {rows // 10} rows", make_search(rows // 10), baseline_search, decode_search_response),
+            ("charter lookup (20 people)", make_charter(20), baseline_lookup, decode_charter_response),
+        ]
+
+    print(f"{'Payload':<36}{'KB':>8}{'Baseline ms':>14}{'Decoder ms':>13}{'Speedup':>10}")
+    print("-" * 81)
+    for name, content, baseline, decoder in cases:
+        # Baselines are strict where the decoders tolerate nulls; compare only when both succeed
+        try:
+            expected = baseline(content)
+        except Exception:
+            expected = None
+        if expected is not None and expected != decoder(content):
+            raise SystemExit(f"{name}: decoder output differs from the baseline")
+
+        before = time_call(lambda: baseline(content), repeat) if expected is not None else float("nan")
+        after = time_call(lambda: decoder(content), repeat)
+        print(f"{name[:35]:<36}{len(content) / 1024:>8.0f}{before:>14.3f}{after:>13.3f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="Entity rows in the large synthetic search")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per payload (median reported)")
+    parser.add_argument("--fixtures", help="Benchmark recorded LA SOS fixtures instead of synthetic payloads")
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.repeat, args.fixtures)
@@ -0,0 +1,226 @@
+"""
+Cold-start benchmark for the DowUrk API
+Measures worker boot in fresh interpreters: importing server.py, running the lifespan startup,
+and serving the first request, plus a -X importtime profile of what the import spends time on
+
+Startup runs against seeded collections (synthetic directory data plus LA SOS names, entities
+and charters sized by --businesses), since index setup and any loads scale with data; seeding is
+not counted in the timings. --businesses 0 times an empty database.
+
+Each run is a separate `python -X importtime` process so nothing is cached between runs. The
+median of --runs is reported; with --baseline, a total more than --threshold slower exits 1.
+
+Usage:
+    python bench_startup.py --mongo mongomock              # no MongoDB needed (pip install mongomock-motor)
+    python bench_startup.py --runs 10 --top 30             # steadier numbers, longer import profile
+    python bench_startup.py --businesses 50000             # larger seeded collections
+    python bench_startup.py --output startup_baseline.json # record a baseline
+    python bench_startup.py --baseline startup_baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+PHASES = ("interpreter_ms", "import_ms", "startup_ms", "first_request_ms", "total_ms")
+FIRST_REQUEST = "/api/businesses?limit=1"
+
+
+# ==================== CHILD PROCESS ====================
+
+async def seed(db, businesses: int) -> None:
+    """Directory collections from synthetic_data, plus a mirrored charter, indexed name and agent per business"""
+    import synthetic_data
+    from la_sos_name_index import NameIndex
+    from la_sos_people_index import PeopleIndex
+
+    gen = argparse.Namespace(users=max(businesses // 5, 1), password_hash="startup",
+                             base_time=synthetic_data.base_time())
+    counts = {"users": gen.users, "businesses": businesses, "events": businesses // 20,
+              "posts": businesses // 2, "grants": businesses // 100}
+    now = datetime.now(timezone.utc)
+    for kind, total in counts.items():
+        make_row = synthetic_data.GENERATORS[kind]
+        for start in range(0, total, 1000):
+            rng = synthetic_data._rng(42, kind, start // 1000)
+            docs = [make_row(rng, index, gen) for index in range(start, min(start + 1000, total))]
+            await db[kind].insert_many(docs)
+            if kind != "businesses":
+                continue
+            charters = [{
+                "entity_type": "Charter", "entity_number": f"{start + offset:08d}K", "name": doc["business_name"],
+                "status": "Active", "city": doc["city"], "agents": [{"name": doc["owner_name"]}], "officers": []
+            } for offset, doc in enumerate(docs)]
+            await db.la_sos_names.insert_many([NameIndex._document(charter, "snapshot", now) for charter in charters])
+            await db.la_sos_entities.insert_many([{
+                "_id": f"live:1:{charter['entity_number']}", "token": "live", "entity_type_id": 1,
+                "entity_number": charter["entity_number"], "name": charter["name"], "details": charter,
+                "seen_at": now, "refreshed_at": now, "requests": 0
+            } for charter in charters])
+            await db.la_sos_people.insert_many([link for charter in charters
+                                                for link in PeopleIndex._documents(charter, now).values()])
+    # A restarted worker finds the one-off people backfill already done
+    await db.la_sos_sync_state.insert_one({"_id": "people_backfill", "started_at": now, "finished_at": now})
+
+
+async def child(mongo: str, businesses: int) -> Dict[str, float]:
+    """Runs inside the measured interpreter; returns phase timings in ms"""
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", f"dowurk_startup_{os.getpid()}")
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+    start = time.perf_counter()
+    import server
+    imported = time.perf_counter()
+
+    if mongo == "mongomock":
+        from mongomock_motor import AsyncMongoMockClient
+        server.db = AsyncMongoMockClient()[os.environ["DB_NAME"]]
+    before_seed = time.perf_counter()
+    await seed(server.db, businesses)
+    seeded = time.perf_counter()
+
+    import httpx
+    try:
+        before_startup = time.perf_counter()
+        async with server.app.router.lifespan_context(server.app):
+            started = time.perf_counter()
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+                response = await client.get(FIRST_REQUEST)
+            served = time.perf_counter()
+            if mongo == "mongod":
+                await server.client.drop_database(os.environ["DB_NAME"])
+    except Exception as exc:
+        print(json.dumps({"error": f"{type(exc).__name__}: {exc}"}))
+        return {}
+
+    timings = {
+        "import_ms": (imported - start) * 1000,
+        "seed_ms": (seeded - before_seed) * 1000,
+        "startup_ms": (started - before_startup) * 1000,
+        "first_request_ms": (served - started) * 1000,
+        "status": response.status_code
+    }
+    print(json.dumps(timings))
+    return timings
+
+
+# ==================== PARENT ====================
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for every line of -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.partition(":")[2].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def run_once(opts: argparse.Namespace) -> Tuple[Dict[str, float], List[Tuple[str, int, int]]]:
+    command = [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", "--mongo", opts.mongo,
+               "--businesses", str(opts.businesses)]
+    spawned = time.perf_counter()
+    proc = subprocess.run(command, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    total_ms = (time.perf_counter() - spawned) * 1000
+
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    result = json.loads(lines[-1]) if lines else {"error": proc.stderr.strip().splitlines()[-1:] or "no output"}
+    if proc.returncode != 0 or "error" in result:
+        sys.exit(f"Child process failed: {result.get('error')}")
+
+    # Seeding is setup, not boot time
+    result["total_ms"] = total_ms - result["seed_ms"]
+    result["interpreter_ms"] = (result["total_ms"] - result["import_ms"] - result["startup_ms"]
+                                - result["first_request_ms"])
+    return result, parse_importtime(proc.stderr)
+
+
+def import_profile(modules: List[Tuple[str, int, int]], top: int) -> Dict[str, Any]:
+    """Self time summed per top-level package, and the slowest individual imports"""
+    packages: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    by_package = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    by_module = sorted(modules, key=lambda item: item[2], reverse=True)[:top]
+    return {
+        "modules_imported": len(modules),
+        "packages": [{"package": name, "self_ms": round(us / 1000, 2)} for name, us in by_package],
+        "slowest_imports": [{"module": name, "cumulative_ms": round(cumulative / 1000, 2)}
+                            for name, _, cumulative in by_module]
+    }
+
+
+def main(opts: argparse.Namespace) -> int:
+    runs, profile = [], None
+    for index in range(opts.runs):
+        timings, modules = run_once(opts)
+        runs.append(timings)
+        if profile is None:
+            profile = import_profile(modules, opts.top)
+        print(f"  run {index + 1}/{opts.runs}: " + "  ".join(f"{phase[:-3]} {timings[phase]:.0f} ms" for phase in PHASES))
+
+    summary = {phase: round(statistics.median(run[phase] for run in runs), 2) for phase in PHASES}
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "mongo": opts.mongo,
+            "runs": opts.runs,
+            "businesses": opts.businesses,
+            "first_request": FIRST_REQUEST
+        },
+        "median": summary,
+        "import_profile": profile
+    }
+
+    print(f"\n{'Phase':<20}{'median ms':>12}")
+    print("-" * 32)
+    for phase in PHASES:
+        print(f"{phase[:-3]:<20}{summary[phase]:>12.1f}")
+    print(f"\nImport self time by package ({profile['modules_imported']} modules):")
+    for item in profile["packages"]:
+        print(f"  {item['package']:<32}{item['self_ms']:>10.1f} ms")
+
+    with open(opts.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📝 Results written to {opts.output}")
+
+    if opts.baseline:
+        with open(opts.baseline) as f:
+            baseline = json.load(f)["median"]
+        limit = baseline["total_ms"] * (1 + opts.threshold)
+        if summary["total_ms"] > limit:
+            print(f"\n❌ Cold start regressed: {summary['total_ms']:.0f} ms vs {baseline['total_ms']:.0f} ms baseline")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo", choices=["mongod", "mongomock"], default="mongod",
+                        help="mongod uses MONGO_URL with a throwaway database that is dropped afterwards")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--businesses", type=int, default=10_000,
+                        help="Businesses (and LA SOS names and charters) seeded before each startup")
+    parser.add_argument("--top", type=int, default=20, help="Packages and imports listed in the profile")
+    parser.add_argument("--output", default="startup_results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative total slowdown")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    opts = parser.parse_args()
+    if opts.child:
+        sys.exit(0 if asyncio.run(child(opts.mongo, opts.businesses)) else 1)
+    sys.exit(main(opts))
@@ -0,0 +1,88 @@
+"""
+Trusted-read microbenchmark for DowUrk list endpoints
+CPU time to turn a 1000-document page from MongoDB into a response body,
+with response_model validation versus the TrustedReader fast path
+
+Usage:
+    python bench_trusted_reads.py [--rows 1000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from bench_json_response import make_businesses, make_events, make_grants, make_resources, make_posts
+from json_response import FastJSONResponse
+from server import (
+    Business, Event, Grant, Resource, Post,
+    business_reader, event_reader, grant_reader, resource_reader, post_reader
+)
+
+
+def as_stored(docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Documents as the app writes them: datetimes stored as ISO strings"""
+    return [
+        {k: v.isoformat() if isinstance(v, datetime) else v for k, v in doc.items()}
+        for doc in docs
+    ]
+
+
+def validated_path(model, datetime_fields) -> Callable[[List[Dict[str, Any]]], bytes]:
+    """Previous route body: parse timestamps by hand, then validate through response_model"""
+    field = create_response_field(name=f"Response_{model.__name__}", type_=List[model])
+    loop = asyncio.new_event_loop()
+
+    def run(docs: List[Dict[str, Any]]) -> bytes:
+        docs = [dict(doc) for doc in docs]
+        for doc in docs:
+            for name in datetime_fields:
+                if isinstance(doc.get(name), str):
+                    doc[name] = datetime.fromisoformat(doc[name])
+        content = loop.run_until_complete(serialize_response(field=field, response_content=docs))
+        return FastJSONResponse(content).body
+
+    return run
+
+
+def cpu_ms(fn: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.process_time()
+        fn()
+        samples.append(time.process_time() - start)
+    return statistics.median(samples) * 1000
+
+
+def run_benchmark(rows: int, repeat: int) -> None:
+    cases = [
+        ("businesses", Business, business_reader, ("created_at", "updated_at"), make_businesses(rows)),
+        ("events", Event, event_reader, ("created_at", "start_time", "end_time"), make_events(rows)),
+        ("grants", Grant, grant_reader, ("created_at", "deadline"), make_grants(rows)),
+        ("resources", Resource, resource_reader, ("created_at",), make_resources(rows)),
+        ("posts", Post, post_reader, ("created_at",), make_posts(rows)),
+    ]
+
+    print(f"CPU time per {rows}-document page")
+    print(f"{'Collection':<14}{'validated ms':>14}{'trusted ms':>12}{'saved ms':>10}{'speedup':>10}")
+    print("-" * 60)
+    for name, model, reader, datetime_fields, docs in cases:
+        stored = as_stored(docs)
+        validated = validated_path(model, datetime_fields)
+
+        before = cpu_ms(lambda: validated(stored), repeat)
+        after = cpu_ms(lambda: reader.response(stored).body, repeat)
+        print(f"{name:<14}{before:>14.2f}{after:>12.2f}{before - after:>10.2f}{before / max(after, 1e-6):>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Documents per page")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per collection (median reported)")
+    args = parser.parse_args()
+    run_benchmark(args.rows, args.repeat)
@@ -0,0 +1,92 @@
+"""
+Streaming Directory Export for DowUrk
+Encodes businesses straight off the MongoDB cursor as CSV or NDJSON, optionally gzipped
+"""
+
+import csv
+import io
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterable, List
+
+import orjson
+
+from trusted_reads import TrustedReader
+
+EXPORT_BATCH_SIZE = 2000
+# Rows encoded per call to the csv/orjson encoder
+ENCODE_ROWS = 500
+# Encoded rows are flushed to the client in chunks of roughly this size
+EXPORT_CHUNK_BYTES = 64 * 1024
+# Matches business_import.LIST_SEPARATOR so exports can be re-imported
+LIST_SEPARATOR = ";"
+
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return LIST_SEPARATOR.join(str(item) for item in value)
+    if isinstance(value, dict):
+        return orjson.dumps(value).decode()
+    return value
+
+
+def _encode_csv(rows: List[Dict[str, Any]], columns: Iterable[str]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([_csv_value(row.get(column)) for column in columns] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def _encode_ndjson(rows: List[Dict[str, Any]]) -> bytes:
+    dumps = orjson.dumps
+    return b"".join(dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+
+async def export_rows(cursor, reader: TrustedReader, fmt: str, gzip: bool = False) -> AsyncIterator[bytes]:
+    """
+    Stream an export body from an open cursor.
+
+    Args:
+        cursor: Motor cursor over the businesses to export
+        reader: Shapes each document (and picks the CSV columns)
+        fmt: "csv" or "ndjson"
+        gzip: Compress the stream as a .gz file
+
+    Returns:
+        Async iterator of body chunks; memory use is bounded by one chunk
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    columns = reader.fields
+
+    def encode(rows: List[Dict[str, Any]]) -> bytes:
+        data = _encode_csv(rows, columns) if fmt == "csv" else _encode_ndjson(rows)
+        return compressor.compress(data) if compressor else data
+
+    pending: List[bytes] = []
+    pending_size = 0
+    if fmt == "csv":
+        header = ",".join(columns).encode() + b"\n"
+        pending.append(compressor.compress(header) if compressor else header)
+
+    rows: List[Dict[str, Any]] = []
+    async for doc in cursor:
+        rows.append(reader.read(doc))
+        if len(rows) < ENCODE_ROWS:
+            continue
+        chunk = encode(rows)
+        rows = []
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= EXPORT_CHUNK_BYTES:
+            yield b"".join(pending)
+            pending, pending_size = [], 0
+
+    if rows:
+        pending.append(encode(rows))
+    if compressor:
+        pending.append(compressor.flush())
+    if pending:
+        yield b"".join(pending)
@@ -0,0 +1,248 @@
+"""
+Faceted search for the DowUrk Business Directory
+Filtered results plus facet counts, with directory-wide counts materialized and updated incrementally
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Facet name -> business document field
+FACET_FIELDS = {
+    "category": "category",
+    "parish": "parish",
+    "city": "city",
+    "organization_type": "organization_type",
+    "certifications": "certifications",
+    "verified": "is_verified",
+}
+ARRAY_FACETS = {"certifications"}
+
+FACET_VALUE_LIMIT = 50
+FILTERED_CACHE_SECONDS = 60
+FILTERED_CACHE_MAX_ENTRIES = 1000
+# Directory-wide counts are re-derived from scratch this often to absorb writes made outside the API
+MATERIALIZED_REBUILD_SECONDS = 3600
+MATERIALIZED_CACHE_SECONDS = 30
+
+
+def _encode_key(value: Any) -> str:
+    """Facet values become field names in the counts document ('.' and leading '$' are not allowed)"""
+    if isinstance(value, bool) or value is None:
+        value = "true" if value else "false"
+    value = str(value).replace(".", "．")
+    return "＄" + value[1:] if value.startswith("$") else value
+
+
+def _decode_key(key: str) -> Any:
+    value = key.replace("．", ".").replace("＄", "$")
+    if value in ("true", "false"):
+        return value == "true"
+    return value
+
+
+def _combine(*conditions: Dict[str, Any]) -> Dict[str, Any]:
+    conditions = [cond for cond in conditions if cond]
+    if not conditions:
+        return {}
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+class SearchFilters:
+    """Multi-select directory filters: OR within a facet, AND across facets"""
+
+    def __init__(
+        self,
+        search: Optional[str] = None,
+        category: Iterable[str] = (),
+        parish: Iterable[str] = (),
+        city: Iterable[str] = (),
+        organization_type: Iterable[str] = (),
+        certifications: Iterable[str] = (),
+        services_offered: Iterable[str] = (),
+        verified: Optional[bool] = None
+    ):
+        self.search = search or None
+        self.selected: Dict[str, Dict[str, Any]] = {}
+        for name, values in (("category", category), ("parish", parish), ("city", city),
+                             ("organization_type", organization_type), ("certifications", certifications),
+                             ("services_offered", services_offered)):
+            values = sorted(set(values))
+            if values:
+                self.selected[name] = {FACET_FIELDS.get(name, name): {"$in": values}}
+        if verified is not None:
+            self.selected["verified"] = {"is_verified": True} if verified else {"is_verified": {"$ne": True}}
+
+    @property
+    def is_empty(self) -> bool:
+        return self.search is None and not self.selected
+
+    def cache_key(self) -> Tuple:
+        return (self.search, tuple(sorted((name, repr(cond)) for name, cond in self.selected.items())))
+
+    def base_match(self) -> Dict[str, Any]:
+        if not self.search:
+            return {}
+        return {"$or": [
+            {"business_name": {"$regex": self.search, "$options": "i"}},
+            {"description": {"$regex": self.search, "$options": "i"}}
+        ]}
+
+    def match(self, exclude: Optional[str] = None) -> Dict[str, Any]:
+        return _combine(*(cond for name, cond in self.selected.items() if name != exclude))
+
+
+class BusinessFacets:
+    """
+    Facet counts for the business directory.
+
+    Counts for the unfiltered directory live in one materialized document that
+    is updated with $inc as businesses are created or approved. Counts for a
+    filtered view come from one $facet aggregation (each facet ignores its own
+    selection, so multi-select stays usable), run alongside the indexed results
+    query and cached briefly in-process.
+    """
+
+    def __init__(self):
+        self.db = None
+        self._filtered: "OrderedDict[Tuple, tuple]" = OrderedDict()  # key -> (expires_at, facets)
+        self._materialized: Optional[tuple] = None
+
+    async def start(self, db) -> None:
+        self.db = db
+        for field in FACET_FIELDS.values():
+            await db.businesses.create_index(field)
+        await db.businesses.create_index("services_offered")
+        await db.businesses.create_index("business_name")
+
+    # ---------- search ----------
+
+    async def search(self, filters: SearchFilters, projection: Dict[str, Any],
+                     skip: int = 0, limit: int = 50) -> Dict[str, Any]:
+        facets = await self._cached_facets(filters)
+        base = filters.base_match()
+        query = _combine(base, filters.match())
+
+        # The page and total are plain indexed queries; $facet sub-pipelines cannot use indexes
+        cursor = self.db.businesses.find(query, projection).sort("business_name", 1).skip(skip).limit(limit)
+        pending = [cursor.to_list(limit), self.db.businesses.count_documents(query)]
+        if facets is None:
+            pending.append(self._filtered_facets(filters, base))
+        results, total, *computed = await asyncio.gather(*pending)
+
+        if facets is None:
+            facets = computed[0]
+            self._remember(filters.cache_key(), facets)
+        return {"total": total, "results": results, "facets": facets}
+
+    async def _filtered_facets(self, filters: SearchFilters, base: Dict[str, Any]) -> Dict[str, List[Dict]]:
+        stages = {}
+        for name, field in FACET_FIELDS.items():
+            stage = [{"$match": filters.match(exclude=name)}]
+            if name in ARRAY_FACETS:
+                stage.append({"$unwind": f"${field}"})
+            group_key = {"$ifNull": [f"${field}", False]} if name == "verified" else f"${field}"
+            stage += [
+                {"$group": {"_id": group_key, "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": FACET_VALUE_LIMIT}
+            ]
+            stages[name] = stage
+
+        pipeline = [{"$match": base}] if base else []
+        pipeline.append({"$facet": stages})
+        out = (await self.db.businesses.aggregate(pipeline).to_list(1))[0]
+        return {
+            name: [{"value": bucket["_id"], "count": bucket["count"]} for bucket in out[name]]
+            for name in FACET_FIELDS
+        }
+
+    async def _cached_facets(self, filters: SearchFilters) -> Optional[Dict[str, List[Dict]]]:
+        if filters.is_empty:
+            return await self.directory_facets()
+        key = filters.cache_key()
+        cached = self._filtered.get(key)
+        if cached and cached[0] > time.monotonic():
+            self._filtered.move_to_end(key)
+            return cached[1]
+        return None
+
+    def _remember(self, key: Tuple, facets: Dict[str, List[Dict]]) -> None:
+        self._filtered[key] = (time.monotonic() + FILTERED_CACHE_SECONDS, facets)
+        self._filtered.move_to_end(key)
+        while len(self._filtered) > FILTERED_CACHE_MAX_ENTRIES:
+            self._filtered.popitem(last=False)
+
+    # ---------- materialized directory-wide counts ----------
+
+    async def directory_facets(self) -> Dict[str, List[Dict]]:
+        now = time.monotonic()
+        if self._materialized and self._materialized[0] > now:
+            return self._materialized[1]
+
+        doc = await self.db.business_facet_counts.find_one({"_id": "all"})
+        age = (datetime.now(timezone.utc).timestamp() - doc["built_at"]) if doc else None
+        if doc is None or age > MATERIALIZED_REBUILD_SECONDS:
+            doc = await self.rebuild()
+
+        facets = {}
+        for name in FACET_FIELDS:
+            counts = [(_decode_key(key), count) for key, count in doc["counts"].get(name, {}).items() if count > 0]
+            counts.sort(key=lambda item: (-item[1], str(item[0])))
+            facets[name] = [{"value": value, "count": count} for value, count in counts[:FACET_VALUE_LIMIT]]
+        self._materialized = (now + MATERIALIZED_CACHE_SECONDS, facets)
+        return facets
+
+    async def rebuild(self) -> Dict[str, Any]:
+        """Recompute directory-wide counts from the businesses collection"""
+        stages = {}
+        for name, field in FACET_FIELDS.items():
+            stage = [{"$unwind": f"${field}"}] if name in ARRAY_FACETS else []
+            group_key = {"$ifNull": [f"${field}", False]} if name == "verified" else f"${field}"
+            stage.append({"$group": {"_id": group_key, "count": {"$sum": 1}}})
+            stages[name] = stage
+        out = (await self.db.businesses.aggregate([{"$facet": stages}]).to_list(1))[0]
+
+        doc = {
+            "_id": "all",
+            "built_at": datetime.now(timezone.utc).timestamp(),
+            "counts": {
+                name: {_encode_key(bucket["_id"]): bucket["count"] for bucket in out[name] if bucket["_id"] is not None}
+                for name in FACET_FIELDS
+            }
+        }
+        await self.db.business_facet_counts.replace_one({"_id": "all"}, doc, upsert=True)
+        return doc
+
+    # ---------- incremental updates ----------
+
+    async def record_created(self, docs: Iterable[Dict[str, Any]]) -> None:
+        """Count newly created businesses into the materialized facets"""
+        inc: Dict[str, int] = defaultdict(int)
+        for doc in docs:
+            for name, field in FACET_FIELDS.items():
+                value = doc.get(field)
+                if name == "verified":
+                    value = bool(value)
+                values = value if name in ARRAY_FACETS else [value]
+                for item in values or []:
+                    if item is not None:
+                        inc[f"counts.{name}.{_encode_key(item)}"] += 1
+        if inc:
+            await self._apply(dict(inc))
+
+    async def record_approved(self, previous: Dict[str, Any]) -> None:
+        """Move an approved business from the unverified to the verified bucket"""
+        if not previous.get("is_verified"):
+            await self._apply({"counts.verified.true": 1, "counts.verified.false": -1})
+
+    async def _apply(self, inc: Dict[str, int]) -> None:
+        # Without upsert: if the document does not exist yet, the next read rebuilds it in full
+        await self.db.business_facet_counts.update_one({"_id": "all"}, {"$inc": inc})
+        self._materialized = None
+        self._filtered.clear()
+
+
+business_facets = BusinessFacets()
@@ -0,0 +1,296 @@
+"""
+Bulk Business Import for the DowUrk Directory
+Streams CSV/NDJSON uploads through validation into batched, idempotent, resumable writes
+"""
+
+import codecs
+import csv
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, UploadFile
+from pydantic import BaseModel, ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from business_facets import business_facets
+
+IMPORT_BATCH_SIZE = 500
+READ_CHUNK_BYTES = 64 * 1024
+MAX_REPORTED_ERRORS = 100
+# A line (NDJSON) or record (CSV, quoted cells may span lines) longer than this is rejected as a row error
+MAX_RECORD_CHARS = 64 * 1024
+# CSV cells holding lists use this separator, e.g. "MBE;WBE"
+LIST_SEPARATOR = ";"
+
+# Namespace for deterministic business ids, so re-importing a listing never duplicates it
+IMPORT_NAMESPACE = uuid.UUID("6f1c8a2e-4b1d-5c3a-9e7f-2d0b8c4a1e55")
+
+FORMATS = {"csv", "ndjson"}
+_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def detect_format(upload: UploadFile, fmt: Optional[str]) -> str:
+    """Explicit format wins, then the file extension, then the content type"""
+    if fmt:
+        if fmt not in FORMATS:
+            raise HTTPException(status_code=400, detail="format must be 'csv' or 'ndjson'")
+        return fmt
+    name = (upload.filename or "").lower()
+    for ext, detected in _EXTENSIONS.items():
+        if name.endswith(ext):
+            return detected
+    content_type = (upload.content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type:
+        return "ndjson"
+    raise HTTPException(status_code=400, detail="Could not detect upload format; pass format=csv or format=ndjson")
+
+
+def business_id_for(row: BaseModel) -> str:
+    """Stable id for a listing: same name, ZIP code and email always map to the same business"""
+    key = "|".join(
+        " ".join(str(value).lower().split())
+        for value in (row.business_name, row.zip_code, row.email)
+    )
+    return str(uuid.uuid5(IMPORT_NAMESPACE, key))
+
+
+# ==================== STREAMING PARSERS ====================
+
+async def _iter_lines(upload: UploadFile) -> AsyncIterator[Optional[str]]:
+    """
+    Decoded lines (newline kept) read from the upload in fixed-size chunks.
+
+    A line longer than MAX_RECORD_CHARS is yielded once as None and the rest of
+    it is discarded, so a file without newlines never buffers whole.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    skipping = False
+    while True:
+        chunk = await upload.read(READ_CHUNK_BYTES)
+        final = not chunk
+        pending += decoder.decode(chunk, final=final)
+        lines = pending.splitlines(keepends=True)
+        pending = lines.pop() if lines and not final and not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            if skipping:
+                # The end of an overlong line already reported
+                skipping = False
+                continue
+            yield line if len(line) <= MAX_RECORD_CHARS else None
+        if len(pending) > MAX_RECORD_CHARS:
+            if not skipping:
+                yield None
+            skipping = True
+            pending = ""
+        if final:
+            return
+
+
+def _csv_cell(field: str, value: str) -> Any:
+    if field in ("services_offered", "certifications"):
+        return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+    if field == "social_media":
+        return json.loads(value)
+    return value
+
+
+async def _iter_csv(upload: UploadFile) -> AsyncIterator[Tuple[int, Any]]:
+    header: Optional[List[str]] = None
+    record = ""
+    quotes = 0
+    row_number = 0
+    async for line in _iter_lines(upload):
+        # A quoted cell may span lines: keep reading until the quotes balance
+        if line is not None and len(record) + len(line) <= MAX_RECORD_CHARS:
+            record += line
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+            cells = next(csv.reader([record]), [])
+        else:
+            cells = None
+        record, quotes = "", 0
+        if cells is None:
+            row_number += 1
+            yield row_number, f"Record longer than {MAX_RECORD_CHARS} characters (check for an unbalanced quote)"
+            continue
+        if not any(cell.strip() for cell in cells):
+            continue
+        if header is None:
+            header = [cell.strip() for cell in cells]
+            continue
+
+        row_number += 1
+        try:
+            yield row_number, {
+                field: _csv_cell(field, value.strip())
+                for field, value in zip(header, cells)
+                if field and value.strip()
+            }
+        except ValueError as exc:
+            yield row_number, f"Invalid cell: {exc}"
+
+
+async def _iter_ndjson(upload: UploadFile) -> AsyncIterator[Tuple[int, Any]]:
+    row_number = 0
+    async for line in _iter_lines(upload):
+        if line is None:
+            row_number += 1
+            yield row_number, f"Line longer than {MAX_RECORD_CHARS} characters"
+            continue
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield row_number, f"Invalid JSON: {exc}"
+            continue
+        yield row_number, row if isinstance(row, dict) else "Each line must be a JSON object"
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+# ==================== IMPORT JOB ====================
+
+async def ensure_import_indexes(db) -> None:
+    # Upserts match on `id`; the unique index also keeps concurrent imports from duplicating a listing
+    await db.businesses.create_index("id", unique=True)
+    await db.business_imports.create_index("user_id")
+    # get_import_user looks up the caller's approved listings
+    await db.businesses.create_index("user_id")
+
+
+class BusinessImporter:
+    """
+    One import job. Rows are validated as they stream in and written in
+    unordered batches of upserts keyed by a deterministic id, so a batch never
+    stops at the first bad row and re-sending a file never duplicates listings.
+
+    Progress is checkpointed in `business_imports` after every batch; resending
+    the same file with its import_id skips rows that were already committed.
+    """
+
+    def __init__(self, db, row_model: Type[BaseModel], build_doc: Callable[[BaseModel, str, str], Dict[str, Any]]):
+        self.db = db
+        self.row_model = row_model
+        self.build_doc = build_doc
+
+    async def _load_job(self, import_id: Optional[str], user_id: str, upload: UploadFile, fmt: str) -> Dict[str, Any]:
+        if import_id:
+            job = await self.db.business_imports.find_one({"_id": import_id})
+            if not job or job["user_id"] != user_id:
+                raise HTTPException(status_code=404, detail="Import not found")
+            if job["format"] != fmt:
+                raise HTTPException(status_code=400, detail="Resumed upload must use the original format")
+            return job
+
+        now = datetime.now(timezone.utc).isoformat()
+        job = {
+            "_id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "filename": upload.filename,
+            "format": fmt,
+            "status": "running",
+            "rows_read": 0,
+            "rows_committed": 0,
+            "inserted": 0,
+            "duplicates": 0,
+            "error_count": 0,
+            "errors": [],
+            "created_at": now,
+            "updated_at": now
+        }
+        await self.db.business_imports.insert_one(job)
+        return job
+
+    async def run(self, upload: UploadFile, user_id: str, fmt: Optional[str] = None,
+                  import_id: Optional[str] = None) -> Dict[str, Any]:
+        fmt = detect_format(upload, fmt)
+        job = await self._load_job(import_id, user_id, upload, fmt)
+        job["status"] = "running"
+        resume_after = job["rows_committed"]
+        rows = _iter_csv(upload) if fmt == "csv" else _iter_ndjson(upload)
+
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        batch_errors: List[Dict[str, Any]] = []
+        last_row = resume_after
+        try:
+            async for row_number, row in rows:
+                if row_number <= resume_after:
+                    continue
+                last_row = row_number
+                if isinstance(row, str):
+                    batch_errors.append({"row": row_number, "error": row})
+                else:
+                    try:
+                        business = self.row_model.model_validate(row)
+                        batch.append((row_number, self.build_doc(business, user_id, business_id_for(business))))
+                    except ValidationError as exc:
+                        batch_errors.append({"row": row_number, "error": _validation_message(exc)})
+
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    await self._commit(job, batch, batch_errors, last_row)
+                    batch, batch_errors = [], []
+
+            job["status"] = "completed"
+            await self._commit(job, batch, batch_errors, last_row)
+        except Exception:
+            await self.db.business_imports.update_one(
+                {"_id": job["_id"]},
+                {"$set": {"status": "failed", "updated_at": datetime.now(timezone.utc).isoformat()}}
+            )
+            raise
+
+        return {
+            "import_id": job["_id"],
+            **{key: job[key] for key in ("status", "rows_read", "rows_committed", "inserted",
+                                         "duplicates", "error_count", "errors")}
+        }
+
+    async def _commit(self, job: Dict[str, Any], batch: List[Tuple[int, Dict[str, Any]]],
+                      errors: List[Dict[str, Any]], last_row: int) -> None:
+        """Write one batch, then checkpoint the job"""
+        inserted_docs: List[Dict[str, Any]] = []
+        duplicates = 0
+        if batch:
+            ops = [UpdateOne({"id": doc["id"]}, {"$setOnInsert": doc}, upsert=True) for _, doc in batch]
+            try:
+                result = await self.db.businesses.bulk_write(ops, ordered=False)
+                upserted = result.upserted_ids
+                duplicates = result.matched_count
+            except BulkWriteError as exc:
+                details = exc.details
+                upserted = {item["index"]: item["_id"] for item in details.get("upserted", [])}
+                duplicates = details.get("nMatched", 0)
+                for error in details.get("writeErrors", []):
+                    errors.append({"row": batch[error["index"]][0], "error": error.get("errmsg", "Write failed")})
+            inserted_docs = [batch[index][1] for index in upserted]
+            if inserted_docs:
+                await business_facets.record_created(inserted_docs)
+
+        job["rows_read"] = max(job["rows_read"], last_row)
+        job["rows_committed"] = max(job["rows_committed"], last_row)
+        job["inserted"] += len(inserted_docs)
+        job["duplicates"] += duplicates
+        job["error_count"] += len(errors)
+        room = MAX_REPORTED_ERRORS - len(job["errors"])
+        if room > 0:
+            job["errors"].extend(sorted(errors, key=lambda e: e["row"])[:room])
+        job["updated_at"] = datetime.now(timezone.utc).isoformat()
+
+        await self.db.business_imports.update_one({"_id": job["_id"]}, {"$set": {
+            key: job[key] for key in ("status", "rows_read", "rows_committed", "inserted",
+                                      "duplicates", "error_count", "errors", "updated_at")
+        }})
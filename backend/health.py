@@ -0,0 +1,171 @@
+"""
+Health Checks for DowUrk API
+Liveness and readiness probes: MongoDB ping, connection pool saturation, in-flight requests,
+and recent LLM / Louisiana SOS latency and error rates
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from pymongo import monitoring
+
+from metrics import HTTP_IN_FLIGHT, LA_SOS_RECENT, LLM_RECENT
+from resilience import BREAKERS
+
+# Probes within this window share one result (and one Mongo ping)
+HEALTH_CACHE_SECONDS = float(os.environ.get("HEALTH_CACHE_SECONDS", "2"))
+HEALTH_MONGO_TIMEOUT = float(os.environ.get("HEALTH_MONGO_TIMEOUT", "1"))
+# Not ready once this share of the Mongo pool is checked out (further requests would queue for a connection)
+HEALTH_MAX_POOL_USAGE = float(os.environ.get("HEALTH_MAX_POOL_USAGE", "0.9"))
+# Not ready above this many concurrent requests on the worker
+HEALTH_MAX_IN_FLIGHT = int(os.environ.get("HEALTH_MAX_IN_FLIGHT", "200"))
+# Upstreams above this recent error rate, or with a circuit not closed, are reported as degraded
+# (never fails readiness)
+HEALTH_UPSTREAM_ERROR_RATE = float(os.environ.get("HEALTH_UPSTREAM_ERROR_RATE", "0.5"))
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connections checked out of, and checkouts waiting on, the Mongo connection pools"""
+
+    def __init__(self):
+        self.checked_out = 0
+        self.waiting = 0
+        self._lock = threading.Lock()
+
+    def _adjust(self, checked_out: int = 0, waiting: int = 0) -> None:
+        with self._lock:
+            self.checked_out = max(0, self.checked_out + checked_out)
+            self.waiting = max(0, self.waiting + waiting)
+
+    def connection_check_out_started(self, event):
+        self._adjust(waiting=1)
+
+    def connection_checked_out(self, event):
+        self._adjust(checked_out=1, waiting=-1)
+
+    def connection_check_out_failed(self, event):
+        self._adjust(waiting=-1)
+
+    def connection_checked_in(self, event):
+        self._adjust(checked_out=-1)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+
+pool_monitor = PoolMonitor()
+
+
+class HealthChecker:
+    """Readiness result cached for HEALTH_CACHE_SECONDS; concurrent probes wait on one check"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._ping: Optional[asyncio.Future] = None
+
+    def liveness(self) -> Dict[str, Any]:
+        return {"status": "ok", "uptime_seconds": round(time.time() - self.started_at)}
+
+    async def readiness(self, db, max_pool_size: int) -> Dict[str, Any]:
+        if self._cached is not None and time.monotonic() - self._cached_at < HEALTH_CACHE_SECONDS:
+            return self._cached
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._cached is None or time.monotonic() - self._cached_at >= HEALTH_CACHE_SECONDS:
+                self._cached = await self._check(db, max_pool_size)
+                self._cached_at = time.monotonic()
+        return self._cached
+
+    async def _check(self, db, max_pool_size: int) -> Dict[str, Any]:
+        checks = {
+            "mongo": await self._check_mongo(db),
+            "mongo_pool": self._check_pool(max_pool_size),
+            "requests": self._check_in_flight(),
+            "llm": self._check_upstream("llm", LLM_RECENT.summary()),
+            "la_sos": self._check_upstream("la_sos", LA_SOS_RECENT.summary())
+        }
+        ready = all(checks[name]["status"] == "ok" for name in ("mongo", "mongo_pool", "requests"))
+        degraded = any(check["status"] == "degraded" for check in checks.values())
+        return {
+            "status": "not_ready" if not ready else "degraded" if degraded else "ok",
+            "ready": ready,
+            "checked_at": time.time(),
+            "checks": checks
+        }
+
+    async def _check_mongo(self, db) -> Dict[str, Any]:
+        # A ping stuck in server selection keeps running after the timeout; later probes wait
+        # on it instead of piling more pings onto Motor's executor
+        if self._ping is None or self._ping.done():
+            self._ping = asyncio.ensure_future(self._timed_ping(db))
+        try:
+            latency_ms = await asyncio.wait_for(asyncio.shield(self._ping), timeout=HEALTH_MONGO_TIMEOUT)
+        except asyncio.TimeoutError:
+            return {"status": "fail", "error": f"ping timed out after {HEALTH_MONGO_TIMEOUT}s"}
+        except Exception as exc:
+            return {"status": "fail", "error": str(exc)[:200]}
+        return {"status": "ok", "latency_ms": latency_ms}
+
+    @staticmethod
+    async def _timed_ping(db) -> float:
+        start = time.perf_counter()
+        await db.command("ping")
+        return round((time.perf_counter() - start) * 1000, 1)
+
+    @staticmethod
+    def _check_pool(max_pool_size: int) -> Dict[str, Any]:
+        checked_out, waiting = pool_monitor.checked_out, pool_monitor.waiting
+        usage = checked_out / max_pool_size if max_pool_size else 0.0
+        return {
+            "status": "fail" if usage >= HEALTH_MAX_POOL_USAGE else "ok",
+            "checked_out": checked_out,
+            "waiting": waiting,
+            "max_pool_size": max_pool_size,
+            "usage": round(usage, 3)
+        }
+
+    @staticmethod
+    def _check_in_flight() -> Dict[str, Any]:
+        # This probe is itself in flight
+        in_flight = max(0, int(HTTP_IN_FLIGHT.value()) - 1)
+        return {
+            "status": "fail" if in_flight >= HEALTH_MAX_IN_FLIGHT else "ok",
+            "in_flight": in_flight,
+            "limit": HEALTH_MAX_IN_FLIGHT
+        }
+
+    @staticmethod
+    def _check_upstream(name: str, summary: Dict[str, Any]) -> Dict[str, Any]:
+        breaker = BREAKERS.get(name)
+        circuit = breaker.snapshot() if breaker else None
+        degraded = (summary["calls"] > 0 and summary["error_rate"] >= HEALTH_UPSTREAM_ERROR_RATE) \
+            or (circuit is not None and circuit["state"] != "closed")
+        return {"status": "degraded" if degraded else "ok", **summary, "circuit": circuit}
+
+
+health_checker = HealthChecker()
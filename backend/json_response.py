@@ -0,0 +1,42 @@
+"""
+Fast JSON Responses for DowUrk API
+orjson-based response class used as the default for every route
+"""
+
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+# orjson handles datetime, date, UUID, enums and dataclasses natively
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for the types orjson does not serialize on its own"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Drop-in replacement for JSONResponse rendered with orjson.
+
+    Routes may also return it directly with raw documents (datetimes, UUIDs,
+    Pydantic models) to skip FastAPI's jsonable_encoder pass entirely.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
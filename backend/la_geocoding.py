@@ -0,0 +1,237 @@
+"""
+Offline geocoding for Louisiana business listings
+Maps city, ZIP code and parish to an approximate GeoJSON point from bundled centroid tables,
+so "near me" searches work without calling an external geocoding service
+
+Run directly to backfill `location` on existing businesses:
+    python la_geocoding.py
+"""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+
+# City centroids (lat, lng) - most precise match, checked first
+CITY_CENTROIDS = {
+    "New Orleans": (29.9511, -90.0715),
+    "Baton Rouge": (30.4515, -91.1871),
+    "Shreveport": (32.5252, -93.7502),
+    "Lafayette": (30.2241, -92.0198),
+    "Lake Charles": (30.2266, -93.2174),
+    "Kenner": (29.9941, -90.2417),
+    "Bossier City": (32.5160, -93.7321),
+    "Monroe": (32.5093, -92.1193),
+    "West Monroe": (32.5185, -92.1476),
+    "Alexandria": (31.3113, -92.4451),
+    "Pineville": (31.3224, -92.4343),
+    "Houma": (29.5958, -90.7195),
+    "Slidell": (30.2752, -89.7812),
+    "Hammond": (30.5044, -90.4612),
+    "Ponchatoula": (30.4388, -90.4415),
+    "Thibodaux": (29.7958, -90.8229),
+    "Ruston": (32.5232, -92.6379),
+    "Grambling": (32.5276, -92.7140),
+    "Zachary": (30.6485, -91.1565),
+    "Baker": (30.5882, -91.1682),
+    "Central": (30.5544, -91.0368),
+    "Metairie": (29.9841, -90.1529),
+    "Gretna": (29.9146, -90.0540),
+    "Harvey": (29.9035, -90.0773),
+    "Marrero": (29.8994, -90.1004),
+    "Westwego": (29.9063, -90.1423),
+    "Chalmette": (29.9427, -89.9634),
+    "Belle Chasse": (29.8549, -89.9906),
+    "Natchitoches": (31.7607, -93.0863),
+    "New Iberia": (30.0035, -91.8187),
+    "LaPlace": (30.0666, -90.4801),
+    "Sulphur": (30.2366, -93.3774),
+    "Opelousas": (30.5335, -92.0815),
+    "Eunice": (30.4944, -92.4176),
+    "Ville Platte": (30.6888, -92.2707),
+    "Mandeville": (30.3582, -90.0656),
+    "Covington": (30.4755, -90.1009),
+    "Bogalusa": (30.7910, -89.8487),
+    "Denham Springs": (30.4874, -90.9568),
+    "Gonzales": (30.2385, -90.9201),
+    "Prairieville": (30.3030, -90.9720),
+    "Plaquemine": (30.2891, -91.2343),
+    "Donaldsonville": (30.1010, -90.9940),
+    "Abbeville": (29.9747, -92.1343),
+    "Crowley": (30.2141, -92.3746),
+    "Jennings": (30.2224, -92.6571),
+    "DeRidder": (30.8463, -93.2891),
+    "Leesville": (31.1435, -93.2610),
+    "Minden": (32.6154, -93.2869),
+    "Bastrop": (32.7781, -91.9115),
+    "Youngsville": (30.0996, -91.9901),
+    "Broussard": (30.1471, -91.9612),
+    "Scott": (30.2358, -92.0943),
+    "Carencro": (30.3171, -92.0490),
+    "Breaux Bridge": (30.2735, -91.8993),
+    "Morgan City": (29.6994, -91.2068),
+    "Raceland": (29.7274, -90.5987),
+}
+
+# Three-digit ZIP prefix (sectional center) centroids covering every Louisiana ZIP code -
+# each spans several parishes, so this is the coarsest fallback
+ZIP3_CENTROIDS = {
+    "700": (29.98, -90.20),   # Metairie, Kenner, Jefferson and River Parishes
+    "701": (29.95, -90.07),   # New Orleans
+    "703": (29.65, -90.75),   # Houma, Thibodaux
+    "704": (30.45, -90.25),   # Northshore: Hammond, Covington, Slidell
+    "705": (30.22, -92.10),   # Acadiana: Lafayette
+    "706": (30.25, -93.20),   # Lake Charles
+    "707": (30.40, -91.00),   # Baton Rouge region
+    "708": (30.45, -91.15),   # Baton Rouge
+    "710": (32.50, -93.50),   # Shreveport region
+    "711": (32.50, -93.75),   # Shreveport
+    "712": (32.55, -92.10),   # Monroe
+    "713": (31.20, -92.30),   # Alexandria region
+    "714": (31.30, -92.45),   # Alexandria
+}
+
+# Parish centroids (approximated by the parish seat) - used when the city is unknown
+PARISH_CENTROIDS = {
+    "Acadia": (30.21, -92.37), "Allen": (30.62, -92.76), "Ascension": (30.20, -90.91),
+    "Assumption": (29.94, -91.02), "Avoyelles": (31.13, -92.07), "Beauregard": (30.85, -93.29),
+    "Bienville": (32.55, -92.92), "Bossier": (32.69, -93.74), "Caddo": (32.52, -93.75),
+    "Calcasieu": (30.23, -93.22), "Caldwell": (32.10, -92.08), "Cameron": (29.80, -93.33),
+    "Catahoula": (31.77, -91.82), "Claiborne": (32.79, -93.06), "Concordia": (31.57, -91.43),
+    "De Soto": (32.04, -93.70), "East Baton Rouge": (30.45, -91.19), "East Carroll": (32.80, -91.17),
+    "East Feliciana": (30.87, -91.02), "Evangeline": (30.69, -92.27), "Franklin": (32.16, -91.72),
+    "Grant": (31.52, -92.71), "Iberia": (30.00, -91.82), "Iberville": (30.29, -91.23),
+    "Jackson": (32.24, -92.72), "Jefferson": (29.98, -90.15), "Jefferson Davis": (30.22, -92.66),
+    "Lafayette": (30.22, -92.02), "Lafourche": (29.80, -90.82), "La Salle": (31.68, -92.13),
+    "Lincoln": (32.52, -92.64), "Livingston": (30.50, -90.75), "Madison": (32.41, -91.19),
+    "Morehouse": (32.78, -91.91), "Natchitoches": (31.76, -93.09), "Orleans": (29.95, -90.07),
+    "Ouachita": (32.51, -92.12), "Plaquemines": (29.58, -89.80), "Pointe Coupee": (30.70, -91.44),
+    "Rapides": (31.31, -92.45), "Red River": (32.01, -93.34), "Richland": (32.47, -91.75),
+    "Sabine": (31.57, -93.48), "St. Bernard": (29.94, -89.96), "St. Charles": (29.97, -90.41),
+    "St. Helena": (30.83, -90.67), "St. James": (30.02, -90.83), "St. John the Baptist": (30.07, -90.48),
+    "St. Landry": (30.53, -92.08), "St. Martin": (30.13, -91.83), "St. Mary": (29.80, -91.50),
+    "St. Tammany": (30.48, -90.10), "Tangipahoa": (30.73, -90.51), "Tensas": (31.92, -91.24),
+    "Terrebonne": (29.60, -90.72), "Union": (32.77, -92.41), "Vermilion": (29.97, -92.13),
+    "Vernon": (31.14, -93.26), "Washington": (30.85, -90.15), "Webster": (32.62, -93.29),
+    "West Baton Rouge": (30.45, -91.21), "West Carroll": (32.86, -91.39), "West Feliciana": (30.78, -91.38),
+    "Winn": (31.93, -92.64),
+}
+
+# ZIP3 prefixes serving each parish (first is the parish seat's), for generating consistent addresses
+PARISH_ZIP3 = {
+    "Acadia": ["705"], "Allen": ["706"], "Ascension": ["707"], "Assumption": ["703"], "Avoyelles": ["713"],
+    "Beauregard": ["706"], "Bienville": ["710"], "Bossier": ["711", "710"], "Caddo": ["711", "710"],
+    "Calcasieu": ["706"], "Caldwell": ["714"], "Cameron": ["706"], "Catahoula": ["713"], "Claiborne": ["710"],
+    "Concordia": ["713"], "De Soto": ["710"], "East Baton Rouge": ["708", "707"], "East Carroll": ["712"],
+    "East Feliciana": ["707"], "Evangeline": ["705"], "Franklin": ["712"], "Grant": ["714"], "Iberia": ["705"],
+    "Iberville": ["707"], "Jackson": ["712"], "Jefferson": ["700", "701"], "Jefferson Davis": ["705"],
+    "Lafayette": ["705"], "Lafourche": ["703"], "La Salle": ["713"], "Lincoln": ["712"], "Livingston": ["707"],
+    "Madison": ["712"], "Morehouse": ["712"], "Natchitoches": ["714"], "Orleans": ["701"], "Ouachita": ["712"],
+    "Plaquemines": ["700"], "Pointe Coupee": ["707"], "Rapides": ["713"], "Red River": ["710"],
+    "Richland": ["712"], "Sabine": ["714"], "St. Bernard": ["700"], "St. Charles": ["700"], "St. Helena": ["704"],
+    "St. James": ["700"], "St. John the Baptist": ["700"], "St. Landry": ["705"], "St. Martin": ["705"],
+    "St. Mary": ["703", "705"], "St. Tammany": ["704"], "Tangipahoa": ["704"], "Tensas": ["713"],
+    "Terrebonne": ["703"], "Union": ["712"], "Vermilion": ["705"], "Vernon": ["714"], "Washington": ["704"],
+    "Webster": ["710"], "West Baton Rouge": ["707"], "West Carroll": ["712"], "West Feliciana": ["707"],
+    "Winn": ["714"],
+}
+
+_CITY_KEYS = {name.lower(): coords for name, coords in CITY_CENTROIDS.items()}
+_PARISH_KEYS = {name.lower(): coords for name, coords in PARISH_CENTROIDS.items()}
+
+
+def _normalize_place(value: Optional[str]) -> str:
+    value = (value or "").strip().lower()
+    if value.endswith(" parish"):
+        value = value[:-len(" parish")]
+    return value.replace("saint ", "st. ")
+
+
+def geocode(city: Optional[str] = None, zip_code: Optional[str] = None,
+            parish: Optional[str] = None) -> Optional[Tuple[Dict[str, Any], str]]:
+    """
+    Approximate location for a Louisiana address.
+
+    Returns:
+        (GeoJSON Point, precision) where precision is "city", "parish" or "zip3"
+        (most to least precise), or None when nothing matched
+    """
+    coords = _CITY_KEYS.get(_normalize_place(city))
+    precision = "city"
+    if coords is None:
+        coords = _PARISH_KEYS.get(_normalize_place(parish))
+        precision = "parish"
+    if coords is None:
+        coords = ZIP3_CENTROIDS.get((zip_code or "").strip()[:3])
+        precision = "zip3"
+    if coords is None:
+        return None
+
+    lat, lng = coords
+    return {"type": "Point", "coordinates": [lng, lat]}, precision
+
+
+def geocode_business(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Location fields to store on a business document (empty when it can't be placed)"""
+    result = geocode(doc.get("city"), doc.get("zip_code"), doc.get("parish"))
+    if result is None:
+        return {}
+    point, precision = result
+    return {"location": point, "location_precision": precision}
+
+
+def parse_point(near: str) -> Dict[str, Any]:
+    """Parse a "lat,lng" query value into a GeoJSON Point"""
+    lat, lng = (float(part) for part in near.split(","))
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValueError("Coordinates out of range")
+    return {"type": "Point", "coordinates": [lng, lat]}
+
+
+async def ensure_geo_indexes(db) -> None:
+    await db.businesses.create_index([("location", "2dsphere")])
+
+
+async def backfill_business_locations(db, batch_size: int = 1000) -> int:
+    """Geocode businesses with no location, or only a ZIP3 one despite a parish; returns the number updated"""
+    updated = 0
+    ops = []
+    cursor = db.businesses.find(
+        {"$or": [
+            {"location": {"$exists": False}},
+            {"location_precision": "zip3", "parish": {"$nin": [None, ""]}}
+        ]},
+        {"_id": 1, "city": 1, "zip_code": 1, "parish": 1}
+    ).batch_size(batch_size)
+
+    async for doc in cursor:
+        fields = geocode_business(doc)
+        if fields:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+        if len(ops) >= batch_size:
+            updated += (await db.businesses.bulk_write(ops, ordered=False)).modified_count
+            ops = []
+    if ops:
+        updated += (await db.businesses.bulk_write(ops, ordered=False)).modified_count
+    return updated
+
+
+async def main():
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        await ensure_geo_indexes(db)
+        updated = await backfill_business_locations(db)
+        print(f"📍 Geocoded {updated} businesses")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,234 @@
+"""
+Louisiana SOS Spend Guard for DowUrk AI Hub
+Meters paid (live-token) LA SOS calls per user, per route and per day, enforces quotas before
+the call is made, and projects the month's call volume and spend
+"""
+
+import calendar
+import math
+import os
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import Depends, HTTPException
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from auth import caller_key
+from metrics import Counter
+from rate_limiter import MongoRateLimitStore, SlidingWindow
+
+# Daily quotas on live-token calls (-1 = unlimited); a user is the signed-in user or, when anonymous, the client IP
+LA_SOS_DAILY_CALLS = int(os.environ.get("LA_SOS_DAILY_CALLS", "2000"))
+LA_SOS_DAILY_CALLS_PER_USER = int(os.environ.get("LA_SOS_DAILY_CALLS_PER_USER", "50"))
+# Per-route daily quotas, e.g. "search=500,lookup=1000,mirror_sync=1400"; unlisted routes are unlimited
+LA_SOS_ROUTE_DAILY_CALLS = {
+    route.strip(): int(limit)
+    for route, _, limit in (
+        item.partition("=") for item in os.environ.get("LA_SOS_ROUTE_DAILY_CALLS", "").split(",") if "=" in item
+    )
+}
+# The Commercial API allows 18 calls/minute per subscription; counted in MongoDB so every worker shares it
+# (-1 = unlimited, 0 = no live calls)
+LA_SOS_LIVE_CALLS_PER_MINUTE = int(os.environ.get("LA_SOS_LIVE_CALLS_PER_MINUTE", "18"))
+# Price of one live call, for spend reporting (set to your subscription's effective per-call cost)
+LA_SOS_LIVE_CALL_COST = float(os.environ.get("LA_SOS_LIVE_CALL_COST", "0"))
+
+LA_SOS_LIVE_CALLS = Counter("la_sos_live_calls_total", "Paid Louisiana SOS calls by route", ("route",))
+LA_SOS_BUDGET_REJECTIONS = Counter("la_sos_budget_rejections_total", "Paid LA SOS calls refused by a quota", ("scope",))
+
+SYSTEM_CALLER = "system"
+
+# (user key, route) of the request making LA SOS calls; background jobs run as SYSTEM_CALLER
+_caller: ContextVar[Optional[Tuple[str, str]]] = ContextVar("la_sos_caller", default=None)
+
+
+class LaSosBudgetExceeded(HTTPException):
+    """Raised instead of making a live LA SOS call over quota (served as 429 with Retry-After)"""
+
+    def __init__(self, scope: str, detail: str, retry_after: float):
+        self.scope = scope
+        super().__init__(
+            status_code=429,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _seconds_until_tomorrow(now: datetime) -> float:
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (tomorrow - now).total_seconds()
+
+
+class LaSosBudget:
+    """
+    Daily call counters in the la_sos_budget collection, one document per
+    day + scope (total, route, user) + key.
+
+    A call is charged against every scope before it is made; each counter is a
+    conditional upsert that cannot pass its limit, so workers never overshoot.
+    """
+
+    def __init__(self):
+        self.db = None
+        self._minute = SlidingWindow(LA_SOS_LIVE_CALLS_PER_MINUTE, 60)
+        self._minute_store: Optional[MongoRateLimitStore] = None
+
+    async def start(self, db) -> None:
+        self.db = db
+        await db.la_sos_budget.create_index("expire_at", expireAfterSeconds=0)
+        await db.la_sos_budget.create_index("day")
+        # Always the shared store: the subscription's limit is per account, not per worker
+        self._minute_store = MongoRateLimitStore(db.rate_limits)
+        await self._minute_store.ensure_indexes()
+
+    # ---------- hot path ----------
+
+    async def charge(self, operation: str) -> None:
+        """Count one live call for the current caller, raising LaSosBudgetExceeded when over quota"""
+        if self.db is None:
+            return
+        user_key, route = _caller.get() or (SYSTEM_CALLER, operation)
+        now = _utcnow()
+        day = now.strftime("%Y-%m-%d")
+        scopes = [("total", "all", LA_SOS_DAILY_CALLS), ("route", route, LA_SOS_ROUTE_DAILY_CALLS.get(route, -1))]
+        if user_key != SYSTEM_CALLER:
+            scopes.append(("user", user_key, LA_SOS_DAILY_CALLS_PER_USER))
+
+        taken = []
+        for scope, key, limit in scopes:
+            if not await self._take(day, scope, key, limit, now):
+                await self._release(taken)
+                LA_SOS_BUDGET_REJECTIONS.inc(scope=scope)
+                raise LaSosBudgetExceeded(scope, self._refusal(scope), _seconds_until_tomorrow(now))
+            taken.append(f"{day}|{scope}|{key}")
+
+        # Checked last: the shared minute window only records calls that are actually made
+        if LA_SOS_LIVE_CALLS_PER_MINUTE >= 0:
+            result = await self._minute.hit(self._minute_store, "la_sos_live", time.time())
+            if not result.allowed:
+                await self._release(taken)
+                LA_SOS_BUDGET_REJECTIONS.inc(scope="minute")
+                raise LaSosBudgetExceeded(
+                    "minute", "The Louisiana Secretary of State lookup rate limit was reached. Please retry shortly.",
+                    result.retry_after
+                )
+        LA_SOS_LIVE_CALLS.inc(route=route)
+
+    async def _release(self, counter_ids: List[str]) -> None:
+        for counter_id in counter_ids:
+            await self.db.la_sos_budget.update_one({"_id": counter_id}, {"$inc": {"calls": -1}})
+
+    async def _take(self, day: str, scope: str, key: str, limit: int, now: datetime) -> bool:
+        if limit == 0:
+            return False
+        query: Dict[str, Any] = {"_id": f"{day}|{scope}|{key}"}
+        if limit > 0:
+            query["calls"] = {"$lt": limit}
+        try:
+            await self.db.la_sos_budget.find_one_and_update(
+                query,
+                {
+                    "$inc": {"calls": 1},
+                    "$setOnInsert": {"day": day, "scope": scope, "key": key, "expire_at": now + timedelta(days=400)}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The counter exists and is at its limit
+            return False
+        return True
+
+    @staticmethod
+    def _refusal(scope: str) -> str:
+        if scope == "user":
+            return "You've reached today's limit of live Louisiana Secretary of State lookups. Please try again tomorrow."
+        return "Today's Louisiana Secretary of State lookup budget has been used. Please try again tomorrow."
+
+    # ---------- reporting ----------
+
+    async def user_report(self, user_key: str) -> Dict[str, Any]:
+        """One user's live calls today and their daily quota, without the global figures"""
+        day = _utcnow().strftime("%Y-%m-%d")
+        doc = None
+        if self.db is not None:
+            doc = await self.db.la_sos_budget.find_one({"_id": f"{day}|user|{user_key}"}, {"calls": 1})
+        return {
+            "day": day,
+            "your_calls_today": doc["calls"] if doc else 0,
+            "limits": {"daily_calls_per_user": LA_SOS_DAILY_CALLS_PER_USER}
+        }
+
+    async def report(self, user_key: Optional[str] = None) -> Dict[str, Any]:
+        """Today's calls by route, month-to-date calls and the projected month's calls and spend"""
+        now = _utcnow()
+        day, month = now.strftime("%Y-%m-%d"), now.strftime("%Y-%m")
+        calls_today, by_route, mine = 0, {}, 0
+        if self.db is not None:
+            async for doc in self.db.la_sos_budget.find({"day": day}, {"scope": 1, "key": 1, "calls": 1}):
+                if doc["scope"] == "total":
+                    calls_today = doc["calls"]
+                elif doc["scope"] == "route":
+                    by_route[doc["key"]] = doc["calls"]
+                elif doc["key"] == user_key:
+                    mine = doc["calls"]
+            month_to_date = sum([doc["calls"] async for doc in self.db.la_sos_budget.find(
+                {"scope": "total", "day": {"$gte": f"{month}-01", "$lte": f"{month}-31"}}, {"calls": 1}
+            )])
+        else:
+            month_to_date = 0
+
+        days_in_month = calendar.monthrange(now.year, now.month)[1]
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        # Ignore the first hour so a handful of early calls are not projected across the month
+        elapsed = max((now - month_start).total_seconds(), 3600) / (days_in_month * 86400)
+        projected_calls = round(month_to_date / elapsed)
+
+        report = {
+            "day": day,
+            "calls_today": calls_today,
+            "calls_today_by_route": by_route,
+            "month": month,
+            "calls_month_to_date": month_to_date,
+            "projected_month_calls": projected_calls,
+            "cost_per_call": LA_SOS_LIVE_CALL_COST,
+            "spend_month_to_date": round(month_to_date * LA_SOS_LIVE_CALL_COST, 2),
+            "projected_month_spend": round(projected_calls * LA_SOS_LIVE_CALL_COST, 2),
+            "limits": {
+                "daily_calls": LA_SOS_DAILY_CALLS,
+                "daily_calls_per_user": LA_SOS_DAILY_CALLS_PER_USER,
+                "route_daily_calls": LA_SOS_ROUTE_DAILY_CALLS,
+                "calls_per_minute": LA_SOS_LIVE_CALLS_PER_MINUTE
+            }
+        }
+        if user_key is not None:
+            report["your_calls_today"] = mine
+        return report
+
+
+la_sos_budget = LaSosBudget()
+
+
+def attribute_calls(user_key: str, route: str) -> None:
+    """Charge live calls made from here on (in this task) to `user_key` under `route`"""
+    _caller.set((user_key, route))
+
+
+def budgeted(route: str):
+    """
+    FastAPI dependency that attributes the route's live LA SOS calls to the caller.
+
+    The caller is the user of the bearer token, or the client IP for anonymous requests.
+    """
+    async def dependency(user_key: str = Depends(caller_key)) -> str:
+        attribute_calls(user_key, route)
+        return user_key
+
+    return dependency
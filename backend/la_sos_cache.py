@@ -0,0 +1,133 @@
+"""
+Louisiana SOS Result Cache for DowUrk AI Hub
+Entity lookups persisted in MongoDB and served stale-while-revalidate, so lookups and grant
+verification keep answering when commercialapi.sos.la.gov is slow or down
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from fastapi import HTTPException
+
+# Served as-is (no upstream call) while younger than this
+LA_SOS_CACHE_FRESH_SECONDS = int(os.environ.get("LA_SOS_CACHE_FRESH_SECONDS", str(24 * 3600)))
+# Served immediately with stale: true while a background refresh runs
+LA_SOS_CACHE_REVALIDATE_SECONDS = int(os.environ.get("LA_SOS_CACHE_REVALIDATE_SECONDS", str(7 * 24 * 3600)))
+# Older results are refetched first and only served (stale) if the upstream fails; then deleted
+LA_SOS_CACHE_MAX_STALE_SECONDS = int(os.environ.get("LA_SOS_CACHE_MAX_STALE_SECONDS", str(30 * 24 * 3600)))
+
+logger = logging.getLogger(__name__)
+
+Fetch = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _age_seconds(fetched_at: datetime) -> float:
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+    return (_utcnow() - fetched_at).total_seconds()
+
+
+class LaSosCache:
+    """
+    Stale-while-revalidate cache over the la_sos_cache collection.
+
+    Only successful results are stored. A result carrying "error" (or an open
+    circuit) counts as an upstream failure, never as an answer to cache.
+    """
+
+    def __init__(self):
+        self.db = None
+        self._refreshing: Set[str] = set()
+        self._pending: Set[asyncio.Task] = set()
+
+    async def start(self, db) -> None:
+        self.db = db
+        await db.la_sos_cache.create_index("expires_at", expireAfterSeconds=0)
+
+    async def get(self, key: str, fetch: Fetch) -> Dict[str, Any]:
+        """
+        Cached result for `key`, fetching through `fetch` when needed.
+
+        Args:
+            key: Cache key, e.g. "lookup:live:1:12345678K"
+            fetch: Calls the LA SOS API; returns a result dict ("error" on failure)
+
+        Returns:
+            The result plus "stale" and "fetched_at" markers
+        """
+        if self.db is None:
+            return await fetch()
+
+        cached = await self.db.la_sos_cache.find_one({"_id": key}, {"result": 1, "fetched_at": 1})
+        age = _age_seconds(cached["fetched_at"]) if cached else None
+
+        if age is not None and age < LA_SOS_CACHE_FRESH_SECONDS:
+            return self._serve(cached, stale=False)
+        if age is not None and age < LA_SOS_CACHE_REVALIDATE_SECONDS:
+            self._refresh_in_background(key, fetch)
+            return self._serve(cached, stale=True)
+
+        try:
+            result = await fetch()
+        except HTTPException:
+            # Open circuit: the stale copy beats a 503
+            if cached:
+                return self._serve(cached, stale=True)
+            raise
+        if "error" not in result:
+            return self._serve(await self._store(key, result), stale=False)
+        if cached:
+            logger.warning(f"LA SOS fetch for {key} failed ({result['error']}); serving result from {cached['fetched_at']}")
+            return self._serve(cached, stale=True)
+        return result
+
+    async def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store a result fetched elsewhere (e.g. by the mirror sync) as fresh"""
+        if self.db is not None and "error" not in result:
+            await self._store(key, result)
+
+    async def _store(self, key: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        now = _utcnow()
+        doc = {
+            "result": result,
+            "fetched_at": now,
+            "expires_at": now + timedelta(seconds=LA_SOS_CACHE_MAX_STALE_SECONDS)
+        }
+        await self.db.la_sos_cache.update_one({"_id": key}, {"$set": doc}, upsert=True)
+        return doc
+
+    @staticmethod
+    def _serve(cached: Dict[str, Any], stale: bool) -> Dict[str, Any]:
+        fetched_at = cached["fetched_at"]
+        if fetched_at.tzinfo is None:
+            fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+        return {**cached["result"], "stale": stale, "fetched_at": fetched_at.isoformat()}
+
+    def _refresh_in_background(self, key: str, fetch: Fetch) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        # The event loop only keeps weak references to tasks
+        task = asyncio.create_task(self._refresh(key, fetch))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _refresh(self, key: str, fetch: Fetch) -> None:
+        try:
+            result = await fetch()
+            if "error" not in result:
+                await self._store(key, result)
+        except Exception as exc:
+            logger.warning(f"Background LA SOS refresh for {key} failed: {exc}")
+        finally:
+            self._refreshing.discard(key)
+
+
+la_sos_cache = LaSosCache()
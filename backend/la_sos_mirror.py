@@ -0,0 +1,302 @@
+"""
+Louisiana SOS Entity Mirror for DowUrk AI Hub
+Local copy of every charter, name reservation and trade service the API has returned, so repeat
+searches are indexed MongoDB reads, kept current by a budgeted background sync
+"""
+
+import asyncio
+import logging
+import os
+import re
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+# A search repeated within this window is answered from the mirror instead of the API
+LA_SOS_MIRROR_QUERY_SECONDS = int(os.environ.get("LA_SOS_MIRROR_QUERY_SECONDS", str(3 * 24 * 3600)))
+# Most mirrored entities returned for a name search answered by normalized-name prefix
+LA_SOS_MIRROR_SEARCH_LIMIT = int(os.environ.get("LA_SOS_MIRROR_SEARCH_LIMIT", "200"))
+# Mirrored entities older than this are refreshed by the sync job, most requested first
+LA_SOS_MIRROR_MAX_AGE_SECONDS = int(os.environ.get("LA_SOS_MIRROR_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+# Live lookups the sync job may spend per hour across all workers (0 disables the sync)
+LA_SOS_SYNC_BUDGET_PER_HOUR = int(os.environ.get("LA_SOS_SYNC_BUDGET_PER_HOUR", "60"))
+SYNC_INTERVAL_SECONDS = 300
+SYNC_LEASE_SECONDS = 600
+
+ENTITY_TYPE_IDS = {"Charter": 1, "Name Reservation": 8, "Trade Service": 16}
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def entity_key(token: str, entity_type_id: int, entity_number: str) -> str:
+    return f"{token}:{entity_type_id}:{entity_number.strip().upper()}"
+
+
+def query_key(token_type: str, entity_name: Optional[str], first_name: Optional[str],
+              last_name: Optional[str]) -> str:
+    parts = [(value or "").strip().upper() for value in (entity_name, first_name, last_name)]
+    return f"search:{token_type}:" + "|".join(parts)
+
+
+class LaSosMirror:
+    """
+    Entities live in la_sos_entities (one document per token + type + number,
+    with the latest search row and parsed lookup details); la_sos_mirror_queries
+    maps each recent search to the rows it returned. Only live-token entities
+    are synced; test-token data is mirrored but never refreshed.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.worker_id = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    async def start(self, db) -> None:
+        self.db = db
+        await db.la_sos_entities.create_index([("token", 1), ("refreshed_at", 1), ("requests", -1)])
+        await db.la_sos_entities.create_index([("token", 1), ("normalized_name", 1)])
+        await db.la_sos_mirror_queries.create_index("searched_at", expireAfterSeconds=LA_SOS_MIRROR_QUERY_SECONDS)
+        await db.la_sos_sync_state.create_index("expires_at", expireAfterSeconds=0)
+        if LA_SOS_SYNC_BUDGET_PER_HOUR > 0:
+            self._task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _in_background(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    # ---------- searches ----------
+
+    async def search(self, key: str, token: str, entity_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Answer a search from the mirror, or None to ask the API.
+
+        A search that reached the API recently is replayed with exactly the rows it returned;
+        any other entity-name search matches mirrored names by normalized-name prefix.
+        """
+        if self.db is None:
+            return None
+        query = await self.db.la_sos_mirror_queries.find_one({"_id": key})
+        if query is not None:
+            ids = query["entity_ids"]
+            entities = {doc["_id"]: doc async for doc in self.db.la_sos_entities.find(
+                {"_id": {"$in": ids}}, {"summary": 1, "details.status": 1}
+            )}
+            matched = [entities[entity_id] for entity_id in ids if entity_id in entities]
+            agent_rows = query.get("agent_rows", [])
+            token_type = query.get("token_type", "Test")
+            searched_at = query["searched_at"]
+        elif entity_name:
+            from la_sos_name_index import normalize_name
+            normalized = normalize_name(entity_name)
+            if not normalized:
+                return None
+            # An anchored, case-sensitive prefix is an index range scan on (token, normalized_name)
+            matched = await self.db.la_sos_entities.find(
+                {"token": token, "normalized_name": {"$regex": f"^{re.escape(normalized)}"}},
+                {"summary": 1, "details.status": 1, "seen_at": 1}
+            ).sort([("token", 1), ("normalized_name", 1)]).limit(LA_SOS_MIRROR_SEARCH_LIMIT).to_list(
+                LA_SOS_MIRROR_SEARCH_LIMIT
+            )
+            if not matched:
+                return None
+            agent_rows = []
+            token_type = token.title()
+            searched_at = min(doc["seen_at"] for doc in matched)
+        else:
+            return None
+
+        results = []
+        for entity in matched:
+            row = dict(entity["summary"])
+            # A sync-refreshed status beats the one captured at search time
+            status = (entity.get("details") or {}).get("status")
+            if status:
+                row["status"] = status
+            results.append(row)
+        results.extend(agent_rows)
+
+        if matched:
+            self._in_background(self.db.la_sos_entities.update_many(
+                {"_id": {"$in": [entity["_id"] for entity in matched]}},
+                {"$inc": {"requests": 1}, "$set": {"last_requested_at": _utcnow()}}
+            ))
+        if searched_at.tzinfo is None:
+            searched_at = searched_at.replace(tzinfo=timezone.utc)
+        return {
+            "success": True,
+            "result_count": len(results),
+            "results": results,
+            "token_type": token_type,
+            "source": "mirror",
+            "searched_at": searched_at.isoformat()
+        }
+
+    def record_search(self, key: str, token: str, entity_rows: List[Dict[str, Any]],
+                      agent_rows: List[Dict[str, Any]], token_type: str) -> None:
+        """Upsert the returned entities and remember which rows the search produced (in the background)"""
+        if self.db is not None:
+            self._in_background(self._record_search(key, token, entity_rows, agent_rows, token_type))
+
+    async def _record_search(self, key: str, token: str, entity_rows: List[Dict[str, Any]],
+                             agent_rows: List[Dict[str, Any]], token_type: str) -> None:
+        from la_sos_name_index import normalize_name
+
+        now = _utcnow()
+        ids, operations = [], []
+        for row in entity_rows:
+            type_id = ENTITY_TYPE_IDS.get(row.get("entity_type"))
+            if not type_id or not row.get("entity_number"):
+                continue
+            entity_id = entity_key(token, type_id, row["entity_number"])
+            ids.append(entity_id)
+            operations.append(UpdateOne({"_id": entity_id}, {
+                "$set": {
+                    "summary": row,
+                    "name": row.get("name"),
+                    "normalized_name": normalize_name(row.get("name") or ""),
+                    "seen_at": now
+                },
+                "$setOnInsert": {
+                    "token": token,
+                    "entity_type_id": type_id,
+                    "entity_number": row["entity_number"],
+                    "refreshed_at": None,
+                    "first_seen_at": now
+                },
+                "$inc": {"requests": 1}
+            }, upsert=True))
+        if operations:
+            await self.db.la_sos_entities.bulk_write(operations, ordered=False)
+        await self.db.la_sos_mirror_queries.update_one({"_id": key}, {"$set": {
+            "entity_ids": ids,
+            "agent_rows": agent_rows,
+            "token_type": token_type,
+            "searched_at": now
+        }}, upsert=True)
+
+    # ---------- lookups ----------
+
+    def record_details(self, token: str, entity_type_id: int, entity_number: str, details: Dict[str, Any]) -> None:
+        """Store a parsed lookup (_parse_charter_details and friends) on the mirrored entity"""
+        from la_sos_name_index import normalize_name
+
+        if self.db is None or "error" in details or not entity_number:
+            return
+        now = _utcnow()
+        self._in_background(self.db.la_sos_entities.update_one(
+            {"_id": entity_key(token, entity_type_id, entity_number)},
+            {
+                "$set": {"details": details, "refreshed_at": now, "seen_at": now},
+                "$setOnInsert": {
+                    "token": token,
+                    "entity_type_id": entity_type_id,
+                    "entity_number": entity_number,
+                    "name": details.get("name"),
+                    "normalized_name": normalize_name(details.get("name") or ""),
+                    "summary": {
+                        "name": details.get("name", ""),
+                        "entity_number": entity_number,
+                        "entity_type": details.get("entity_type", "Unknown"),
+                        "city": details.get("city"),
+                        "status": details.get("status"),
+                        "type_name": details.get("business_type")
+                    },
+                    "first_seen_at": now,
+                    "requests": 0
+                }
+            },
+            upsert=True
+        ))
+
+    # ---------- sync ----------
+
+    async def _sync_loop(self) -> None:
+        from la_sos_budget import SYSTEM_CALLER, attribute_calls
+        attribute_calls(SYSTEM_CALLER, "mirror_sync")
+        while True:
+            await asyncio.sleep(SYNC_INTERVAL_SECONDS)
+            try:
+                if await self._acquire_lease():
+                    await self.sync_once(max(1, LA_SOS_SYNC_BUDGET_PER_HOUR * SYNC_INTERVAL_SECONDS // 3600))
+            except Exception as exc:
+                logger.warning(f"LA SOS mirror sync failed: {exc}")
+
+    async def _acquire_lease(self) -> bool:
+        """One worker syncs at a time; the lease lapses if that worker dies"""
+        now = _utcnow()
+        try:
+            lease = await self.db.la_sos_sync_state.find_one_and_update(
+                {"_id": "lease", "$or": [{"owner": self.worker_id}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": self.worker_id, "expires_at": now + timedelta(seconds=SYNC_LEASE_SECONDS)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            return False
+        return lease is not None and lease["owner"] == self.worker_id
+
+    async def _spend(self, calls: int) -> int:
+        """Reserve up to `calls` from this hour's budget; returns how many were granted"""
+        hour = _utcnow().strftime("%Y-%m-%dT%H")
+        state = await self.db.la_sos_sync_state.find_one_and_update(
+            {"_id": f"budget:{hour}"},
+            {"$inc": {"spent": calls}, "$setOnInsert": {"expires_at": _utcnow() + timedelta(hours=2)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        overspent = max(0, state["spent"] - LA_SOS_SYNC_BUDGET_PER_HOUR)
+        granted = max(0, calls - overspent)
+        if granted < calls:
+            await self.db.la_sos_sync_state.update_one({"_id": f"budget:{hour}"}, {"$inc": {"spent": granted - calls}})
+        return granted
+
+    def due_query(self) -> Dict[str, Any]:
+        cutoff = _utcnow() - timedelta(seconds=LA_SOS_MIRROR_MAX_AGE_SECONDS)
+        return {"token": "live", "$or": [{"refreshed_at": None}, {"refreshed_at": {"$lt": cutoff}}]}
+
+    async def sync_once(self, limit: int) -> Dict[str, int]:
+        """Refresh up to `limit` due entities, most requested first, within the hourly budget"""
+        from la_sos_service import lookup_business, lookup_cache_key
+        from la_sos_cache import la_sos_cache
+
+        due = await self.db.la_sos_entities.find(
+            self.due_query(), {"entity_type_id": 1, "entity_number": 1}
+        ).sort([("requests", -1), ("seen_at", -1)]).limit(limit).to_list(limit)
+        granted = await self._spend(len(due)) if due else 0
+        refreshed = failed = 0
+        for entity in due[:granted]:
+            result = await lookup_business(entity["entity_number"], entity_type_id=entity["entity_type_id"],
+                                           use_test_token=False)
+            if "error" in result:
+                failed += 1
+                continue
+            # lookup_business already recorded the details; keep lookups served from cache current too
+            await la_sos_cache.put(lookup_cache_key(entity["entity_number"], entity["entity_type_id"], False), result)
+            refreshed += 1
+        if refreshed or failed:
+            logger.info(f"LA SOS mirror sync refreshed {refreshed} entities ({failed} failed)")
+        return {"due": len(due), "budget": granted, "refreshed": refreshed, "failed": failed}
+
+    async def stats(self) -> Dict[str, Any]:
+        total, due = await asyncio.gather(
+            self.db.la_sos_entities.count_documents({"token": "live"}),
+            self.db.la_sos_entities.count_documents(self.due_query())
+        )
+        return {"entities": total, "due_for_refresh": due, "sync_budget_per_hour": LA_SOS_SYNC_BUDGET_PER_HOUR}
+
+
+la_sos_mirror = LaSosMirror()
@@ -0,0 +1,312 @@
+"""
+Louisiana Business Name Index for DowUrk AI Hub
+Local index of known Louisiana entity names (normalized, trigram and Soundex keyed) so name
+availability checks rank look-alikes in milliseconds and only call the state API when needed
+
+Bulk snapshot load (CSV or NDJSON with name, entity_number, entity_type, status, city columns):
+    python la_sos_name_index.py entities.csv
+Add trigram and phonetic keys to names stored before they were indexed:
+    python la_sos_name_index.py --reindex
+"""
+
+import asyncio
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from pymongo import UpdateOne
+
+# A remote search for the same normalized name within this window is trusted instead of a new call
+LA_SOS_NAME_CONFIRM_SECONDS = int(os.environ.get("LA_SOS_NAME_CONFIRM_SECONDS", str(7 * 24 * 3600)))
+MIN_SIMILARITY = 0.35
+# Trigrams shared by more names than this are skipped when enough rarer ones exist
+COMMON_TRIGRAM_POSTINGS = 5000
+# Posting counts only drift as names are added, so each trigram's count is reused for this long
+TRIGRAM_COUNT_CACHE_SECONDS = 3600
+
+# Trailing entity designators do not make a name distinguishable, nor does a leading "THE"
+DESIGNATORS = {
+    "LLC", "LC", "L3C", "PLLC", "INC", "INCORPORATED", "CORP", "CORPORATION", "CO", "COMPANY",
+    "LTD", "LIMITED", "LP", "LLP", "LLLP", "PC", "APC", "APLC", "PARTNERSHIP"
+}
+_PUNCTUATION = re.compile(r"[^A-Z0-9 ]+")
+_DOTTED = re.compile(r"\b(?:[A-Z]\.){2,}")
+_SOUNDEX_CODES = {**dict.fromkeys("BFPV", "1"), **dict.fromkeys("CGJKQSXZ", "2"), **dict.fromkeys("DT", "3"),
+                  "L": "4", **dict.fromkeys("MN", "5"), "R": "6"}
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== NORMALIZATION ====================
+
+def normalize_name(name: str) -> str:
+    """'The Acme Co., L.L.C.' -> 'ACME'; '&' becomes AND, punctuation and designators are dropped"""
+    upper = _DOTTED.sub(lambda match: match.group(0).replace(".", ""), name.upper().replace("&", " AND "))
+    tokens = _PUNCTUATION.sub(" ", upper).split()
+    kept = tokens[1:] if len(tokens) > 1 and tokens[0] == "THE" else list(tokens)
+    while len(kept) > 1 and kept[-1] in DESIGNATORS:
+        kept.pop()
+    return " ".join(kept)
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def soundex(token: str) -> str:
+    token = "".join(char for char in token if char.isalpha())
+    if not token:
+        return token
+    code, previous = token[0], _SOUNDEX_CODES.get(token[0], "")
+    for char in token[1:]:
+        digit = _SOUNDEX_CODES.get(char, "")
+        if digit and digit != previous:
+            code += digit
+        if char not in "HW":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def phonetic_keys(normalized: str) -> Set[str]:
+    return {soundex(token) if token.isalpha() else token for token in normalized.split()}
+
+
+# ==================== INDEX ====================
+
+class NameIndex:
+    """
+    Inverted index over the la_sos_names collection, queried in MongoDB.
+
+    Each name document carries its normalized form, trigrams and phonetic keys
+    under multikey indexes, so every worker answers from the same data
+    without loading it into memory.
+    """
+
+    def __init__(self):
+        self.db = None
+        self._pending: Set[asyncio.Task] = set()
+        self._postings: Dict[str, tuple] = {}  # trigram -> (expires_at, names containing it)
+
+    async def start(self, db) -> None:
+        self.db = db
+        self._postings.clear()
+        await db.la_sos_names.create_index("normalized")
+        await db.la_sos_names.create_index("trigrams")
+        await db.la_sos_names.create_index("phonetic")
+        await db.la_sos_name_queries.create_index("searched_at", expireAfterSeconds=LA_SOS_NAME_CONFIRM_SECONDS)
+
+    # ---------- writes ----------
+
+    @staticmethod
+    def _document(entity: Dict[str, Any], source: str, now: datetime) -> Optional[Dict[str, Any]]:
+        name = (entity.get("name") or "").strip()
+        if not name:
+            return None
+        normalized = normalize_name(name)
+        number = (entity.get("entity_number") or "").strip()
+        return {
+            "_id": f"{entity.get('entity_type') or 'Unknown'}:{number}" if number else f"name:{normalized}",
+            "name": name,
+            "normalized": normalized,
+            "trigrams": sorted(trigrams(normalized)),
+            "phonetic": sorted(phonetic_keys(normalized)),
+            "entity_number": number or None,
+            "entity_type": entity.get("entity_type"),
+            "status": entity.get("status"),
+            "city": entity.get("city"),
+            "type_name": entity.get("type_name"),
+            "source": source,
+            "seen_at": now
+        }
+
+    async def _persist(self, docs: List[Dict[str, Any]]) -> None:
+        if self.db is not None and docs:
+            await self.db.la_sos_names.bulk_write(
+                [UpdateOne({"_id": doc["_id"]}, {"$set": doc}, upsert=True) for doc in docs], ordered=False
+            )
+
+    async def record_entities(self, entities: Iterable[Dict[str, Any]], source: str = "search") -> int:
+        """Persist entity search results (or snapshot rows) to the index"""
+        now = datetime.now(timezone.utc)
+        docs = [doc for doc in (self._document(entity, source, now) for entity in entities) if doc]
+        await self._persist(docs)
+        return len(docs)
+
+    def record_in_background(self, entities: Iterable[Dict[str, Any]]) -> None:
+        """Persist without holding up the caller's response"""
+        task = asyncio.create_task(self.record_entities(list(entities)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def flush(self) -> None:
+        """Wait for background writes, so reads see names recorded so far"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def record_query(self, name: str) -> None:
+        if self.db is not None:
+            await self.db.la_sos_name_queries.update_one(
+                {"_id": normalize_name(name)}, {"$set": {"searched_at": datetime.now(timezone.utc)}}, upsert=True
+            )
+
+    async def recently_confirmed(self, name: str) -> bool:
+        """Whether the state API was searched for this (normalized) name within the confirm window"""
+        if self.db is None:
+            return False
+        doc = await self.db.la_sos_name_queries.find_one({"_id": normalize_name(name)})
+        if not doc:
+            return False
+        searched_at = doc["searched_at"]
+        if searched_at.tzinfo is None:
+            searched_at = searched_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - searched_at < timedelta(seconds=LA_SOS_NAME_CONFIRM_SECONDS)
+
+    # ---------- reads ----------
+
+    async def exact(self, name: str) -> List[Dict[str, Any]]:
+        """Known entities whose name differs from `name` only by designators, case or punctuation"""
+        if self.db is None:
+            return []
+        return [self._public(doc) async for doc in self.db.la_sos_names.find({"normalized": normalize_name(name)})]
+
+    async def similar(self, name: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Look-alike names ranked by trigram overlap, with a bonus for words that sound alike"""
+        if self.db is None:
+            return []
+        normalized = normalize_name(name)
+        grams = sorted(trigrams(normalized))
+        keys = sorted(phonetic_keys(normalized))
+
+        # Candidates come from rare trigrams when enough of them exist; counts stop at the cutoff
+        postings = await self._posting_counts(grams)
+        rare = [gram for gram in grams if postings[gram] <= COMMON_TRIGRAM_POSTINGS]
+        candidates = rare if len(rare) >= len(grams) // 2 else grams
+
+        # Stored keys are deduplicated, so |A ∩ B| is a filter and |A ∪ B| = |A| + |B| - |A ∩ B|
+        overlap = {"$size": {"$filter": {"input": "$trigrams", "cond": {"$in": ["$$this", grams]}}}}
+        jaccard = {"$divide": [overlap, {"$subtract": [{"$add": [len(grams), {"$size": "$trigrams"}]}, overlap]}]}
+        common = {"$size": {"$filter": {"input": "$phonetic", "cond": {"$in": ["$$this", keys]}}}}
+        sounds = {"$divide": [
+            common, {"$subtract": [{"$add": [len(keys), {"$size": "$phonetic"}]}, common]}
+        ]} if keys else 0.0
+        pipeline = [
+            {"$match": {
+                "$or": [{"trigrams": {"$in": candidates}}, {"phonetic": {"$in": keys}}],
+                "normalized": {"$ne": normalized}
+            }},
+            {"$set": {"similarity": {"$add": [{"$multiply": [0.7, jaccard]}, {"$multiply": [0.3, sounds]}]}}},
+            {"$match": {"similarity": {"$gte": MIN_SIMILARITY}}},
+            {"$sort": {"similarity": -1, "_id": 1}},
+            {"$limit": limit}
+        ]
+        return [{**self._public(doc), "similarity": round(doc["similarity"], 3)}
+                async for doc in self.db.la_sos_names.aggregate(pipeline)]
+
+    async def _posting_counts(self, grams: List[str]) -> Dict[str, int]:
+        """Names containing each trigram, from the cache or one $group over the uncached ones"""
+        now = time.monotonic()
+        counts = {gram: cached[1] for gram in grams
+                  if (cached := self._postings.get(gram)) and cached[0] > now}
+        missing = [gram for gram in grams if gram not in counts]
+        if missing:
+            pipeline = [
+                {"$match": {"trigrams": {"$in": missing}}},
+                {"$project": {"_id": 0, "trigrams": 1}},
+                {"$unwind": "$trigrams"},
+                {"$match": {"trigrams": {"$in": missing}}},
+                {"$group": {"_id": "$trigrams", "count": {"$sum": 1}}}
+            ]
+            found = {doc["_id"]: doc["count"] async for doc in self.db.la_sos_names.aggregate(pipeline)}
+            for gram in missing:
+                counts[gram] = found.get(gram, 0)
+                self._postings[gram] = (now + TRIGRAM_COUNT_CACHE_SECONDS, counts[gram])
+        return counts
+
+    @staticmethod
+    def _public(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": entry["name"],
+            "entity_number": entry.get("entity_number") or "",
+            "entity_type": entry.get("entity_type") or "Unknown",
+            "city": entry.get("city"),
+            "status": entry.get("status"),
+            "type_name": entry.get("type_name")
+        }
+
+
+name_index = NameIndex()
+
+
+# ==================== SNAPSHOT LOADER ====================
+
+def _snapshot_rows(path: str) -> Iterable[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        if path.endswith((".ndjson", ".jsonl")):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(handle)
+
+
+def _connect():
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+    return AsyncIOMotorClient(os.environ["MONGO_URL"])
+
+
+async def load_snapshot(path: str, batch_size: int = 1000) -> int:
+    client = _connect()
+    await name_index.start(client[os.environ["DB_NAME"]])
+    total, batch = 0, []
+    for row in _snapshot_rows(path):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            total += await name_index.record_entities(batch, source="snapshot")
+            batch = []
+            print(f"  {total} names loaded", end="\r")
+    if batch:
+        total += await name_index.record_entities(batch, source="snapshot")
+    client.close()
+    return total
+
+
+async def reindex(batch_size: int = 1000) -> int:
+    client = _connect()
+    db = client[os.environ["DB_NAME"]]
+    await name_index.start(db)
+    total, batch = 0, []
+    async for doc in db.la_sos_names.find({"trigrams": {"$exists": False}}, {"normalized": 1}):
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {
+            "trigrams": sorted(trigrams(doc["normalized"])),
+            "phonetic": sorted(phonetic_keys(doc["normalized"]))
+        }}))
+        if len(batch) >= batch_size:
+            await db.la_sos_names.bulk_write(batch, ordered=False)
+            total += len(batch)
+            batch = []
+            print(f"  {total} names reindexed", end="\r")
+    if batch:
+        await db.la_sos_names.bulk_write(batch, ordered=False)
+        total += len(batch)
+    client.close()
+    return total
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    if sys.argv[1] == "--reindex":
+        count = asyncio.run(reindex())
+        print(f"✅ Reindexed {count} names in la_sos_names")
+    else:
+        count = asyncio.run(load_snapshot(sys.argv[1]))
+        print(f"✅ Loaded {count} names into la_sos_names")
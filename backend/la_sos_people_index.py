@@ -0,0 +1,256 @@
+"""
+Louisiana Agent & Officer Index for DowUrk AI Hub
+Reverse index from normalized registered-agent and officer names to the entities they serve,
+built from cached charter lookups, so "what else is this person an officer of" is answered
+locally in milliseconds
+
+Re-index every charter the entity mirror holds (new databases are backfilled once on startup):
+    python la_sos_people_index.py
+"""
+
+import asyncio
+import logging
+import os
+import re
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from pymongo import ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+# A worker's claim on the startup backfill lapses after this long (so a dead worker's claim is retaken),
+# and a failed backfill is retried after PEOPLE_BACKFILL_RETRY_SECONDS
+PEOPLE_BACKFILL_LEASE_SECONDS = int(os.environ.get("PEOPLE_BACKFILL_LEASE_SECONDS", "3600"))
+PEOPLE_BACKFILL_RETRY_SECONDS = float(os.environ.get("PEOPLE_BACKFILL_RETRY_SECONDS", "300"))
+
+# Honorifics and generational suffixes do not distinguish people, nor do middle initials
+_IGNORED_TOKENS = {"MR", "MRS", "MS", "DR", "JR", "SR", "II", "III", "IV", "ESQ"}
+_PUNCTUATION = re.compile(r"[^A-Z0-9 ]+")
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== NORMALIZATION ====================
+
+def person_tokens(name: str) -> List[str]:
+    """'Johnson, Marie A. Jr.' -> ['JOHNSON', 'MARIE']: sorted, so name order does not matter"""
+    tokens = [token for token in _PUNCTUATION.sub(" ", name.upper().replace("'", "")).split()
+              if token not in _IGNORED_TOKENS]
+    full = [token for token in tokens if len(token) > 1]
+    return sorted(full if full else tokens)
+
+
+def person_key(name: str) -> str:
+    return " ".join(person_tokens(name))
+
+
+# ==================== INDEX ====================
+
+class PeopleIndex:
+    """
+    Reverse index over the la_sos_people collection, queried in MongoDB.
+
+    One document per (person, entity) with the roles the person holds there and
+    the person's name tokens under a multikey index. Re-looking up an entity
+    replaces its people: names that dropped off are marked removed.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.worker_id = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    async def start(self, db) -> None:
+        self.db = db
+        await db.la_sos_people.create_index([("tokens", 1), ("removed", 1)])
+        await db.la_sos_people.create_index("entity_id")
+        # Charters looked up before the index existed are indexed once, off the startup path
+        self._task = asyncio.create_task(self._backfill_once())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _backfill_once(self) -> None:
+        # One worker at a time claims the backfill; it is marked finished only once every batch is indexed
+        while True:
+            try:
+                if await self._claim_backfill():
+                    total = await self.backfill()
+                    await self.db.la_sos_sync_state.update_one(
+                        {"_id": "people_backfill", "owner": self.worker_id},
+                        {"$set": {"finished_at": datetime.now(timezone.utc), "links": total},
+                         "$unset": {"claimed_until": ""}}
+                    )
+                    logger.info(f"People index backfilled {total} agent and officer links")
+                    return
+                if await self.db.la_sos_sync_state.find_one({"_id": "people_backfill", "finished_at": {"$exists": True}}):
+                    return
+            except Exception as exc:
+                logger.warning(f"People index backfill failed, retrying in {PEOPLE_BACKFILL_RETRY_SECONDS:g}s: {exc}")
+                await self._release_backfill()
+            await asyncio.sleep(PEOPLE_BACKFILL_RETRY_SECONDS)
+
+    async def _claim_backfill(self) -> bool:
+        """Claim the unfinished backfill unless another worker's claim is still live"""
+        now = datetime.now(timezone.utc)
+        try:
+            claim = await self.db.la_sos_sync_state.find_one_and_update(
+                {
+                    "_id": "people_backfill",
+                    "finished_at": {"$exists": False},
+                    "$or": [{"owner": self.worker_id}, {"claimed_until": {"$exists": False}},
+                            {"claimed_until": {"$lt": now}}]
+                },
+                {"$set": {"owner": self.worker_id, "started_at": now,
+                          "claimed_until": now + timedelta(seconds=PEOPLE_BACKFILL_LEASE_SECONDS)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Finished, or claimed by a live worker
+            return False
+        return claim is not None and claim["owner"] == self.worker_id
+
+    async def _release_backfill(self) -> None:
+        try:
+            await self.db.la_sos_sync_state.update_one(
+                {"_id": "people_backfill", "owner": self.worker_id, "finished_at": {"$exists": False}},
+                {"$unset": {"owner": "", "claimed_until": ""}}
+            )
+        except Exception as exc:
+            logger.warning(f"Could not release the people backfill claim: {exc}")
+
+    async def backfill(self, batch_size: int = 500) -> int:
+        """Index charter lookups already held by the entity mirror"""
+        total, batch = 0, []
+        async for entity in self.db.la_sos_entities.find({"details.entity_type": "Charter"}, {"details": 1}):
+            batch.append(entity["details"])
+            if len(batch) >= batch_size:
+                total += await self._record_many(batch)
+                batch = []
+        if batch:
+            total += await self._record_many(batch)
+        return total
+
+    async def size(self) -> int:
+        """Approximate number of (person, entity) links, from collection metadata"""
+        if self.db is None:
+            return 0
+        return await self.db.la_sos_people.estimated_document_count()
+
+    # ---------- writes ----------
+
+    @staticmethod
+    def _documents(details: Dict[str, Any], now: datetime) -> Dict[str, Dict[str, Any]]:
+        entity_id = f"{details.get('entity_type') or 'Unknown'}:{details['entity_number']}"
+        entity = {
+            "entity_id": entity_id,
+            "entity_number": details["entity_number"],
+            "entity_type": details.get("entity_type"),
+            "entity_name": details.get("name"),
+            "status": details.get("status"),
+            "city": details.get("city")
+        }
+        docs: Dict[str, Dict[str, Any]] = {}
+        people = [(agent, "Registered Agent") for agent in details.get("agents", [])] + \
+                 [(officer, officer.get("titles") or "Officer") for officer in details.get("officers", [])]
+        for person, role in people:
+            key = person_key(person.get("name") or "")
+            if not key:
+                continue
+            link_id = f"{key}|{entity_id}"
+            doc = docs.setdefault(link_id, {
+                "_id": link_id, "person": key, "tokens": key.split(), "name": person["name"], "roles": [],
+                **entity, "removed": False, "seen_at": now
+            })
+            if role not in doc["roles"]:
+                doc["roles"].append(role)
+        return docs
+
+    async def record_details(self, details: Dict[str, Any]) -> int:
+        """Replace an entity's agents and officers with those of a fresh charter lookup"""
+        return await self._record_many([details])
+
+    async def _record_many(self, lookups: List[Dict[str, Any]]) -> int:
+        lookups = [details for details in lookups if "error" not in details and details.get("entity_number")]
+        if self.db is None or not lookups:
+            return 0
+        now = datetime.now(timezone.utc)
+        docs: Dict[str, Dict[str, Any]] = {}
+        for details in lookups:
+            docs.update(self._documents(details, now))
+        entity_ids = [f"{details.get('entity_type') or 'Unknown'}:{details['entity_number']}" for details in lookups]
+        operations = [UpdateOne({"_id": link_id}, {"$set": doc}, upsert=True) for link_id, doc in docs.items()]
+        # People who dropped off these entities are marked removed
+        operations.append(UpdateMany(
+            {"entity_id": {"$in": entity_ids}, "removed": False, "_id": {"$nin": list(docs)}},
+            {"$set": {"removed": True, "seen_at": now}}
+        ))
+        await self.db.la_sos_people.bulk_write(operations, ordered=False)
+        return len(docs)
+
+    def record_in_background(self, details: Dict[str, Any]) -> None:
+        task = asyncio.create_task(self.record_details(details))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    # ---------- reads ----------
+
+    async def search(self, name: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        People whose normalized name contains every word of `name`, with their entities.
+
+        "Marie Johnson" matches MARIE A JOHNSON and JOHNSON, MARIE; "Johnson" matches every
+        Johnson. Exact name matches come first, then people linked to the most entities.
+        """
+        tokens = person_tokens(name)
+        if not tokens or self.db is None:
+            return []
+        wanted = " ".join(tokens)
+        pipeline = [
+            {"$match": {"tokens": {"$all": tokens}, "removed": False}},
+            {"$sort": {"entity_name": 1}},
+            {"$group": {"_id": "$person", "names": {"$addToSet": "$name"}, "entities": {"$push": {
+                "entity_number": "$entity_number",
+                "entity_type": {"$ifNull": ["$entity_type", "Unknown"]},
+                "name": {"$ifNull": ["$entity_name", ""]},
+                "status": "$status",
+                "city": "$city",
+                "roles": "$roles"
+            }}}},
+            {"$set": {"exact": {"$eq": ["$_id", wanted]}, "entity_count": {"$size": "$entities"}}},
+            {"$sort": {"exact": -1, "entity_count": -1, "_id": 1}},
+            {"$limit": limit}
+        ]
+        return [{
+            "person": group["_id"],
+            "names": sorted(group["names"]),
+            "entity_count": group["entity_count"],
+            "entities": group["entities"]
+        } async for group in self.db.la_sos_people.aggregate(pipeline)]
+
+
+people_index = PeopleIndex()
+
+
+# ==================== BACKFILL ====================
+
+async def run_backfill() -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from dotenv import load_dotenv
+    load_dotenv(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
+
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    people_index.db = client[os.environ["DB_NAME"]]
+    total = await people_index.backfill()
+    client.close()
+    return total
+
+
+if __name__ == "__main__":
+    count = asyncio.run(run_backfill())
+    print(f"✅ Indexed {count} agent and officer links into la_sos_people")
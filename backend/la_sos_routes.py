@@ -3,14 +3,20 @@ Louisiana Secretary of State API Routes for DowUrk AI Hub
 Business verification, search, and compliance checking endpoints
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 from typing import Optional, List
 import os
 
+from json_response import FastJSONResponse
+from la_sos_transport import LA_SOS_MODE
+from la_sos_people_index import people_index
+from la_sos_budget import budgeted, la_sos_budget
+from auth import get_current_user
+
 from la_sos_service import (
     search_businesses,
-    lookup_business,
+    lookup_business_cached,
     validate_certificate,
     check_name_availability,
     verify_business_for_grant,
@@ -24,7 +30,9 @@ la_sos_router = APIRouter(prefix="/api/la-sos", tags=["Louisiana SOS"])
 
 # We have a test token from Louisiana SOS - use it for real API calls
 # Test token expires 1/19/2027
-USE_DEMO_MODE = False  # Set to True to use demo data instead of real API
+# LA_SOS_MODE=demo serves sample data instead of calling the API; record/replay go through
+# the real client and parsers (see la_sos_transport)
+USE_DEMO_MODE = LA_SOS_MODE == "demo"
 
 
 # ==================== REQUEST MODELS ====================
@@ -53,6 +61,11 @@ class GrantVerificationRequest(BaseModel):
     entity_type_id: int = Field(1, description="Entity type ID")
 
 
+class PeopleSearchRequest(BaseModel):
+    name: str = Field(..., description="Agent/officer name, full or partial (e.g. last name only)")
+    limit: int = Field(20, ge=1, le=100, description="Maximum people to return")
+
+
 # ==================== ENDPOINTS ====================
 
 @la_sos_router.get("/status")
@@ -60,7 +73,7 @@ async def get_api_status():
     """Check Louisiana SOS API integration status"""
     return {
         "service": "Louisiana Secretary of State Commercial API",
-        "mode": "demo" if USE_DEMO_MODE else "live",
+        "mode": LA_SOS_MODE,
         "api_base": "https://commercialapi.sos.la.gov",
         "subscription_url": "https://subscriptions.sos.la.gov",
         "subscription_cost": "$500/year",
@@ -77,7 +90,7 @@ async def get_api_status():
     }
 
 
-@la_sos_router.post("/search")
+@la_sos_router.post("/search", dependencies=[Depends(budgeted("search"))])
 async def search_louisiana_businesses(request: BusinessSearchRequest):
     """
     Search for businesses registered in Louisiana.
@@ -104,10 +117,11 @@ async def search_louisiana_businesses(request: BusinessSearchRequest):
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
     
-    return result
+    # Up to 1000 plain rows: skip jsonable_encoder and render directly
+    return FastJSONResponse(result)
 
 
-@la_sos_router.post("/lookup")
+@la_sos_router.post("/lookup", dependencies=[Depends(budgeted("lookup"))])
 async def lookup_louisiana_business(request: BusinessLookupRequest):
     """
     Get detailed information about a specific Louisiana business.
@@ -118,11 +132,14 @@ async def lookup_louisiana_business(request: BusinessLookupRequest):
     - Business addresses
     - Annual report status
     - Previous names and amendments
+    
+    Served from the local cache when available; "stale": true marks an older
+    copy returned while it is refreshed or while the state API is unavailable.
     """
     if USE_DEMO_MODE:
         result = await demo_lookup_business(request.entity_number)
     else:
-        result = await lookup_business(
+        result = await lookup_business_cached(
             entity_number=request.entity_number,
             entity_type_id=request.entity_type_id,
             use_test_token=USE_DEMO_MODE
@@ -134,7 +151,7 @@ async def lookup_louisiana_business(request: BusinessLookupRequest):
     return result
 
 
-@la_sos_router.post("/validate-certificate")
+@la_sos_router.post("/validate-certificate", dependencies=[Depends(budgeted("validate_certificate"))])
 async def validate_business_certificate(request: CertificateValidationRequest):
     """
     Validate the authenticity of a Louisiana business certificate.
@@ -164,7 +181,7 @@ async def validate_business_certificate(request: CertificateValidationRequest):
     return result
 
 
-@la_sos_router.post("/check-name")
+@la_sos_router.post("/check-name", dependencies=[Depends(budgeted("check_name"))])
 async def check_business_name_availability(request: NameAvailabilityRequest):
     """
     Check if a business name is available for registration in Louisiana.
@@ -204,7 +221,7 @@ async def check_business_name_availability(request: NameAvailabilityRequest):
     return result
 
 
-@la_sos_router.post("/verify-for-grant")
+@la_sos_router.post("/verify-for-grant", dependencies=[Depends(budgeted("verify_for_grant"))])
 async def verify_business_grant_eligibility(request: GrantVerificationRequest):
     """
     Verify a business meets common grant eligibility requirements.
@@ -255,6 +272,43 @@ async def verify_business_grant_eligibility(request: GrantVerificationRequest):
     return result
 
 
+@la_sos_router.post("/people/search")
+async def search_agents_and_officers(request: PeopleSearchRequest):
+    """
+    Find the Louisiana entities a person serves as registered agent or officer.
+    
+    Answered from the local index of charters already looked up (no state API
+    call), so it covers only entities someone has looked up before.
+    """
+    if not request.name.strip():
+        raise HTTPException(status_code=400, detail="Must provide a name")
+    
+    results = await people_index.search(request.name, limit=request.limit)
+    return FastJSONResponse({
+        "success": True,
+        "query": request.name,
+        "result_count": len(results),
+        "results": results,
+        "indexed_links": await people_index.size(),
+        "source": "local"
+    })
+
+
+@la_sos_router.get("/budget")
+async def get_live_call_budget(user_id: str = Depends(get_current_user)):
+    """
+    Paid (live-token) LA SOS usage. Admins get today's calls by route, quotas,
+    the month-to-date and projected monthly call volume and spend; other users
+    get only their own calls today.
+    """
+    user = None
+    if la_sos_budget.db is not None:
+        user = await la_sos_budget.db.users.find_one({"id": user_id}, {"user_type": 1})
+    if user and user.get("user_type") == "admin":
+        return await la_sos_budget.report(user_key=user_id)
+    return await la_sos_budget.user_report(user_id)
+
+
 @la_sos_router.get("/entity-types")
 async def get_entity_types():
     """Get available entity types for Louisiana business searches"""
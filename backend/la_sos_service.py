@@ -5,16 +5,35 @@ Provides business verification, search, and compliance checking for DowUrk AI Hu
 
 import os
 import httpx
+import orjson
 from typing import Dict, List, Optional, Any
 from datetime import datetime
-from pydantic import BaseModel
 import asyncio
+import time
+
+from metrics import record_la_sos_call
+from tracing import inject_headers, span
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, call_upstream
+from la_sos_cache import la_sos_cache
+from la_sos_name_index import name_index, normalize_name
+from la_sos_mirror import la_sos_mirror, query_key
+from la_sos_people_index import people_index
+from la_sos_budget import LaSosBudgetExceeded, la_sos_budget
+from la_sos_transport import LA_SOS_MODE, transport_from_env
 
 # API Configuration
 LA_SOS_API_BASE = "https://commercialapi.sos.la.gov"
 # Test token provided by Louisiana SOS - expires 1/19/2027
 LA_SOS_TOKEN = os.getenv("LA_SOS_API_TOKEN", "z5AjcETzZOTrn28GtYUbDQDTLuqlUhsXUlG")
 LA_SOS_EMAIL = os.getenv("LA_SOS_API_EMAIL", "info@dowurktoday.org")
+# Connect fails fast; reads get longer since searches can be slow
+LA_SOS_TIMEOUT = httpx.Timeout(float(os.getenv("LA_SOS_TIMEOUT", "10")), connect=3.0)
+LA_SOS_RETRY = RetryPolicy(attempts=int(os.getenv("LA_SOS_ATTEMPTS", "2")))
+la_sos_breaker = CircuitBreaker("la_sos", "Louisiana Secretary of State service")
+
+# Optional httpx transport for every LA SOS call (None = real network); LA_SOS_MODE picks
+# record/replay fixtures, set_transport() overrides it
+_transport: Optional[httpx.AsyncBaseTransport] = transport_from_env()
 
 # Entity Type IDs
 ENTITY_TYPES = {
@@ -24,50 +43,65 @@ ENTITY_TYPES = {
 }
 
 
-class BusinessSearchResult(BaseModel):
-    """Model for business search results"""
-    name: str
-    entity_number: str
-    entity_type: str
-    city: Optional[str] = None
-    status: Optional[str] = None
-    type_name: Optional[str] = None
-
-
-class BusinessDetails(BaseModel):
-    """Model for detailed business information"""
-    entity_type: str
-    entity_number: str
-    name: str
-    status: str
-    sub_status: Optional[str] = None
-    registration_date: Optional[str] = None
-    file_date: Optional[str] = None
-    city: Optional[str] = None
-    category: Optional[str] = None
-    business_type: Optional[str] = None
-    annual_report_status: Optional[str] = None
-    agents: List[Dict] = []
-    officers: List[Dict] = []
-    addresses: List[Dict] = []
-    is_good_standing: bool = False
-
-
-class CertificateValidation(BaseModel):
-    """Model for certificate validation results"""
-    is_valid: bool
-    certificate_id: str
-    certificate_date: Optional[str] = None
-    entity_name: Optional[str] = None
-    entity_number: Optional[str] = None
-    validation_message: str
+def set_transport(transport: Optional[httpx.AsyncBaseTransport]) -> None:
+    """
+    Route every LA SOS request through an httpx transport.
+
+    Args:
+        transport: e.g. httpx.MockTransport for tests and benchmarks; None restores the network
+    """
+    global _transport
+    _transport = transport
+
+
+def _sos_failure(response: Optional[httpx.Response], error: Optional[BaseException]) -> Optional[str]:
+    if error is not None:
+        return f"{type(error).__name__}: {error}" if isinstance(error, httpx.TransportError) else None
+    if response.status_code >= 500 or response.status_code == 429:
+        return f"HTTP {response.status_code}"
+    return None
+
+
+async def _sos_get(operation: str, path: str, params: Dict[str, Any]) -> httpx.Response:
+    """
+    GET an LA SOS Commercial API endpoint behind the la_sos circuit breaker.
+
+    Every Commercial API call is a read, so timeouts, transport errors, 429 and 5xx are
+    retried with jittered backoff. Each attempt is counted and timed in /metrics under
+    `operation` and traced as a client span. Every live-token attempt the breaker lets through,
+    retries included, is charged to the caller's budget (LaSosBudgetExceeded when over quota);
+    replayed fixtures cost nothing.
+    """
+    charge = None
+    if params.get("Token") != "TEST" and LA_SOS_MODE != "replay":
+        async def charge() -> None:
+            await la_sos_budget.charge(operation)
+
+    async def attempt() -> httpx.Response:
+        start = time.perf_counter()
+        status = "error"
+        with span(f"la_sos.{operation}", "CLIENT", **{"http.method": "GET", "http.url": f"{LA_SOS_API_BASE}{path}"}) as current:
+            try:
+                async with httpx.AsyncClient(timeout=LA_SOS_TIMEOUT, transport=_transport) as client:
+                    response = await client.get(f"{LA_SOS_API_BASE}{path}", params=params, headers=inject_headers())
+                status = str(response.status_code)
+                return response
+            except httpx.TimeoutException:
+                status = "timeout"
+                raise
+            finally:
+                record_la_sos_call(operation, time.perf_counter() - start, status)
+                current.set(**{"http.status_code": status})
+
+    return await call_upstream(la_sos_breaker, attempt, _sos_failure, LA_SOS_RETRY, admit=charge)
 
 
 async def search_businesses(
     entity_name: Optional[str] = None,
     first_name: Optional[str] = None,
     last_name: Optional[str] = None,
-    use_test_token: bool = True
+    use_test_token: bool = True,
+    mirror_prefix: bool = True
 ) -> Dict[str, Any]:
     """
     Search for businesses by entity name or agent/officer name.
@@ -77,6 +111,9 @@ async def search_businesses(
         first_name: Agent/officer first name
         last_name: Agent/officer last name
         use_test_token: Use test token (free) vs live token (paid)
+        mirror_prefix: Allow an answer from mirrored names starting with entity_name. Those are
+            only the names the mirror happens to hold, fine for a result list but never proof
+            that a name is unregistered
     
     Returns:
         Dictionary with search results
@@ -84,6 +121,13 @@ async def search_businesses(
     if not entity_name and not (first_name or last_name):
         return {"error": "Must provide entity_name or first_name/last_name"}
     
+    # Repeats of recent searches and names the mirror already holds are answered locally
+    token = "test" if use_test_token else "live"
+    mirror_key = query_key(token, entity_name, first_name, last_name)
+    mirrored = await la_sos_mirror.search(mirror_key, token, entity_name if mirror_prefix else None)
+    if mirrored is not None:
+        return mirrored
+    
     # Build request parameters
     params = {
         "Token": LA_SOS_TOKEN if not use_test_token else "TEST",
@@ -98,65 +142,72 @@ async def search_businesses(
         params["LastName"] = last_name
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{LA_SOS_API_BASE}/api/Commercial/Search",
-                params=params
-            )
-            
-            if response.status_code != 200:
-                return {
-                    "error": f"API request failed with status {response.status_code}",
-                    "status_code": response.status_code
-                }
-            
-            data = response.json()
-            
-            # Check for API errors
-            if data.get("Status") == "Error":
-                return {
-                    "error": data.get("Message", "Unknown error"),
-                    "response_code": data.get("ResponseCode")
-                }
-            
-            # Parse results
-            results = []
-            
-            # Entity search results
-            for entity in data.get("EntitySearchResults", []):
-                results.append(BusinessSearchResult(
-                    name=entity.get("Name", ""),
-                    entity_number=entity.get("EntityNumber", ""),
-                    entity_type=ENTITY_TYPES.get(entity.get("EntityTypeId", 0), "Unknown"),
-                    city=entity.get("City"),
-                    status=entity.get("EntityStatus"),
-                    type_name=entity.get("TypeName")
-                ))
-            
-            # Agent/Officer search results
-            for agent in data.get("AgentOfficerSearchResults", []):
-                results.append(BusinessSearchResult(
-                    name=agent.get("AgentOfficerName", ""),
-                    entity_number=agent.get("EntityNumber", ""),
-                    entity_type=ENTITY_TYPES.get(agent.get("EntityTypeId", 0), "Unknown"),
-                    city=agent.get("City"),
-                    status=agent.get("EntityStatus"),
-                    type_name=f"{agent.get('TypeName', '')} ({agent.get('Affiliation', '')})"
-                ))
-            
+        response = await _sos_get("search", "/api/Commercial/Search", params)
+        if response.status_code != 200:
             return {
-                "success": True,
-                "result_count": data.get("ResultCount", len(results)),
-                "results": [r.model_dump() for r in results],
-                "token_type": data.get("TokenType", "Test")
+                "error": f"API request failed with status {response.status_code}",
+                "status_code": response.status_code
             }
-            
+        
+        decoded = decode_search_response(response.content)
+        if "error" in decoded:
+            return decoded
+        entity_rows, agent_rows = decoded["entity_rows"], decoded["agent_rows"]
+        # Every entity name the API returns feeds the local name index
+        name_index.record_in_background(entity_rows)
+        la_sos_mirror.record_search(mirror_key, token, entity_rows, agent_rows, decoded["token_type"])
+        
+        return {
+            "success": True,
+            "result_count": decoded["result_count"],
+            "results": entity_rows + agent_rows,
+            "token_type": decoded["token_type"]
+        }
+        
+    except LaSosBudgetExceeded:
+        # Over the paid-call budget: answer from what the local indexes already know
+        local = await _local_search(entity_name, first_name, last_name)
+        if not local:
+            raise
+        return {
+            "success": True,
+            "result_count": len(local),
+            "results": local,
+            "token_type": "Local",
+            "source": "local_index",
+            "notice": "Live search budget reached; showing matches from previously retrieved records."
+        }
+    except CircuitOpenError:
+        raise
     except httpx.TimeoutException:
         return {"error": "Request timed out. Please try again."}
     except Exception as e:
         return {"error": f"Search failed: {str(e)}"}
 
 
+async def _local_search(
+    entity_name: Optional[str],
+    first_name: Optional[str],
+    last_name: Optional[str]
+) -> List[Dict[str, Any]]:
+    """Search rows, shaped like decode_search_response rows, from the local name and people indexes, no API call"""
+    if entity_name:
+        return await name_index.exact(entity_name) + await name_index.similar(entity_name, limit=50)
+    # Built as plain dicts like decode_search_response, without a model per row
+    return [
+        {
+            "name": person["names"][0],
+            "entity_number": entity["entity_number"],
+            "entity_type": entity["entity_type"],
+            "city": entity["city"],
+            "status": entity["status"],
+            "type_name": f"{entity['name']} ({', '.join(entity['roles'])})"
+        }
+        for person in await people_index.search(f"{first_name or ''} {last_name or ''}", limit=20)
+        for entity in person["entities"]
+    ]
+
+
 async def lookup_business(
     entity_number: str,
     entity_type_id: int = 1,
@@ -181,66 +232,165 @@ async def lookup_business(
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{LA_SOS_API_BASE}/api/Commercial/Search",
-                params=params
-            )
-            
-            if response.status_code != 200:
-                return {
-                    "error": f"API request failed with status {response.status_code}",
-                    "status_code": response.status_code
-                }
-            
-            data = response.json()
-            
-            if data.get("Status") == "Error":
-                return {
-                    "error": data.get("Message", "Unknown error"),
-                    "response_code": data.get("ResponseCode")
-                }
+        response = await _sos_get("lookup", "/api/Commercial/Search", params)
+        if response.status_code != 200:
+            return {
+                "error": f"API request failed with status {response.status_code}",
+                "status_code": response.status_code
+            }
+        
+        parsed = decode_lookup_response(response.content, entity_type_id)
+        if "error" in parsed:
+            return parsed
+        
+        la_sos_mirror.record_details("test" if use_test_token else "live", entity_type_id, entity_number, parsed)
+        if entity_type_id == 1:
+            # Agents and officers feed the local people index
+            people_index.record_in_background(parsed)
+        return parsed
             
-            # Parse based on entity type
-            if entity_type_id == 1:  # Charter
-                details = data.get("CharterDetails", {})
-                return _parse_charter_details(details)
-            elif entity_type_id == 8:  # Name Reservation
-                details = data.get("NameReservationDetails", {})
-                return _parse_name_reservation_details(details)
-            elif entity_type_id == 16:  # Trade Service
-                details = data.get("TradeServiceDetails", {})
-                return _parse_trade_service_details(details)
-            else:
-                return {"error": f"Unknown entity type: {entity_type_id}"}
-                
+    except (CircuitOpenError, LaSosBudgetExceeded):
+        raise
     except httpx.TimeoutException:
         return {"error": "Request timed out. Please try again."}
     except Exception as e:
         return {"error": f"Lookup failed: {str(e)}"}
 
 
+def lookup_cache_key(entity_number: str, entity_type_id: int, use_test_token: bool) -> str:
+    token_type = "test" if use_test_token else "live"
+    return f"lookup:{token_type}:{entity_type_id}:{entity_number.strip().upper()}"
+
+
+async def lookup_business_cached(
+    entity_number: str,
+    entity_type_id: int = 1,
+    use_test_token: bool = True
+) -> Dict[str, Any]:
+    """
+    lookup_business served from the la_sos_cache collection (stale-while-revalidate).
+    
+    Args:
+        entity_number: The unique entity identifier
+        entity_type_id: 1=Charter, 8=Name Reservation, 16=Trade Service
+        use_test_token: Use test token (free) vs live token (paid)
+    
+    Returns:
+        lookup_business's result plus "stale" and "fetched_at"
+    """
+    return await la_sos_cache.get(
+        lookup_cache_key(entity_number, entity_type_id, use_test_token),
+        lambda: lookup_business(entity_number, entity_type_id=entity_type_id, use_test_token=use_test_token)
+    )
+
+
+# ==================== DECODING ====================
+# Raw response bytes go through orjson straight to the API output shape: plain dicts built
+# in one comprehension per list, with no per-row model validation or dump
+
+def _api_error(data: Dict) -> Optional[Dict[str, Any]]:
+    if data.get("Status") == "Error":
+        return {
+            "error": data.get("Message", "Unknown error"),
+            "response_code": data.get("ResponseCode")
+        }
+    return None
+
+
+def decode_search_response(content: bytes) -> Dict[str, Any]:
+    """
+    Decode a Commercial API search response into rows of name, entity_number, entity_type,
+    city, status and type_name.
+    
+    Args:
+        content: Raw response body
+    
+    Returns:
+        entity_rows, agent_rows, result_count and token_type (or "error")
+    """
+    data = orjson.loads(content)
+    error = _api_error(data)
+    if error:
+        return error
+    
+    types = ENTITY_TYPES
+    entity_rows = [
+        {
+            "name": entity.get("Name") or "",
+            "entity_number": entity.get("EntityNumber") or "",
+            "entity_type": types.get(entity.get("EntityTypeId", 0), "Unknown"),
+            "city": entity.get("City"),
+            "status": entity.get("EntityStatus"),
+            "type_name": entity.get("TypeName")
+        }
+        for entity in data.get("EntitySearchResults") or ()
+    ]
+    agent_rows = [
+        {
+            "name": agent.get("AgentOfficerName") or "",
+            "entity_number": agent.get("EntityNumber") or "",
+            "entity_type": types.get(agent.get("EntityTypeId", 0), "Unknown"),
+            "city": agent.get("City"),
+            "status": agent.get("EntityStatus"),
+            "type_name": f"{agent.get('TypeName', '')} ({agent.get('Affiliation', '')})"
+        }
+        for agent in data.get("AgentOfficerSearchResults") or ()
+    ]
+    return {
+        "entity_rows": entity_rows,
+        "agent_rows": agent_rows,
+        "result_count": data.get("ResultCount", len(entity_rows) + len(agent_rows)),
+        "token_type": data.get("TokenType", "Test")
+    }
+
+
+def decode_lookup_response(content: bytes, entity_type_id: int) -> Dict[str, Any]:
+    """
+    Decode a Commercial API lookup response with the parser for its entity type.
+    
+    Args:
+        content: Raw response body
+        entity_type_id: 1=Charter, 8=Name Reservation, 16=Trade Service
+    
+    Returns:
+        The parsed details (or "error")
+    """
+    data = orjson.loads(content)
+    error = _api_error(data)
+    if error:
+        return error
+    
+    if entity_type_id == 1:  # Charter
+        return _parse_charter_details(data.get("CharterDetails", {}))
+    if entity_type_id == 8:  # Name Reservation
+        return _parse_name_reservation_details(data.get("NameReservationDetails", {}))
+    if entity_type_id == 16:  # Trade Service
+        return _parse_trade_service_details(data.get("TradeServiceDetails", {}))
+    return {"error": f"Unknown entity type: {entity_type_id}"}
+
+
 def _parse_charter_details(details: Dict) -> Dict[str, Any]:
     """Parse charter details from API response"""
     if not details:
         return {"error": "No charter details found"}
     
+    get = details.get
     # Determine good standing status
-    annual_status = details.get("AnnualReportStatus", "")
-    is_good_standing = annual_status.lower() in ["good standing", "current", "active"]
+    annual_status = get("AnnualReportStatus", "")
+    is_good_standing = annual_status.lower() in ("good standing", "current", "active")
     
     return {
         "success": True,
         "entity_type": "Charter",
-        "entity_number": details.get("CharterNumber", ""),
-        "name": details.get("CharterName", ""),
-        "status": details.get("CharterStatusDescription", ""),
-        "sub_status": details.get("CharterSubStatusDescription"),
-        "registration_date": details.get("RegistrationDate"),
-        "file_date": details.get("FileDate"),
-        "city": details.get("City"),
-        "category": details.get("CharterCategory"),
-        "business_type": details.get("BusinessType"),
+        "entity_number": get("CharterNumber", ""),
+        "name": get("CharterName", ""),
+        "status": get("CharterStatusDescription", ""),
+        "sub_status": get("CharterSubStatusDescription"),
+        "registration_date": get("RegistrationDate"),
+        "file_date": get("FileDate"),
+        "city": get("City"),
+        "category": get("CharterCategory"),
+        "business_type": get("BusinessType"),
         "annual_report_status": annual_status,
         "is_good_standing": is_good_standing,
         "agents": [
@@ -252,7 +402,7 @@ def _parse_charter_details(details: Dict) -> Dict[str, Any]:
                 "zip": a.get("ZipCode"),
                 "appointment_date": a.get("AppointmentDate")
             }
-            for a in details.get("Agents", [])
+            for a in get("Agents") or ()
         ],
         "officers": [
             {
@@ -263,7 +413,7 @@ def _parse_charter_details(details: Dict) -> Dict[str, Any]:
                 "state": o.get("State"),
                 "zip": o.get("Zip")
             }
-            for o in details.get("Officers", [])
+            for o in get("Officers") or ()
         ],
         "addresses": [
             {
@@ -274,15 +424,15 @@ def _parse_charter_details(details: Dict) -> Dict[str, Any]:
                 "state": addr.get("State"),
                 "zip": addr.get("ZipCode")
             }
-            for addr in details.get("Addresses", [])
+            for addr in get("Addresses") or ()
         ],
         "previous_names": [
             {"name": pn.get("Name"), "change_date": pn.get("ChangeDate")}
-            for pn in details.get("PreviousNames", [])
+            for pn in get("PreviousNames") or ()
         ],
         "amendments": [
             {"description": am.get("Description"), "date_filed": am.get("DateFiled")}
-            for am in details.get("Amendments", [])
+            for am in get("Amendments") or ()
         ]
     }
 
@@ -353,36 +503,33 @@ async def validate_certificate(
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{LA_SOS_API_BASE}/api/Certificate/Validate",
-                params=params
-            )
-            
-            if response.status_code != 200:
-                return {
-                    "error": f"API request failed with status {response.status_code}",
-                    "status_code": response.status_code
-                }
-            
-            data = response.json()
-            
-            if data.get("Status") == "Error":
-                return {
-                    "error": data.get("Message", "Unknown error"),
-                    "response_code": data.get("ResponseCode")
-                }
-            
+        response = await _sos_get("validate_certificate", "/api/Certificate/Validate", params)
+        if response.status_code != 200:
             return {
-                "success": True,
-                "is_valid": data.get("IsValid", False),
-                "certificate_id": data.get("CertificateId", certificate_id),
-                "certificate_date": data.get("CertificateDate"),
-                "entity_name": data.get("EntityName"),
-                "entity_number": data.get("EntityNumber"),
-                "validation_message": data.get("ValidationMessage", "Certificate validated successfully" if data.get("IsValid") else "Certificate is not valid")
+                "error": f"API request failed with status {response.status_code}",
+                "status_code": response.status_code
             }
-            
+        
+        data = orjson.loads(response.content)
+        
+        if data.get("Status") == "Error":
+            return {
+                "error": data.get("Message", "Unknown error"),
+                "response_code": data.get("ResponseCode")
+            }
+        
+        return {
+            "success": True,
+            "is_valid": data.get("IsValid", False),
+            "certificate_id": data.get("CertificateId", certificate_id),
+            "certificate_date": data.get("CertificateDate"),
+            "entity_name": data.get("EntityName"),
+            "entity_number": data.get("EntityNumber"),
+            "validation_message": data.get("ValidationMessage", "Certificate validated successfully" if data.get("IsValid") else "Certificate is not valid")
+        }
+        
+    except (CircuitOpenError, LaSosBudgetExceeded):
+        raise
     except httpx.TimeoutException:
         return {"error": "Request timed out. Please try again."}
     except Exception as e:
@@ -402,27 +549,34 @@ async def check_name_availability(
     
     Returns:
         Dictionary with availability status and similar names
-    """
-    # Search for exact and similar matches
-    search_result = await search_businesses(
-        entity_name=business_name,
-        use_test_token=use_test_token
-    )
-    
-    if "error" in search_result:
-        return search_result
     
-    results = search_result.get("results", [])
-    
-    # Check for exact match
-    exact_match = None
-    similar_names = []
-    
-    for result in results:
-        if result["name"].lower() == business_name.lower():
-            exact_match = result
-        else:
-            similar_names.append(result)
+    Answers from the local name index when it already holds a conflicting name
+    or the state API was searched for this name within the confirm window;
+    otherwise a remote search runs first (and feeds the index).
+    """
+    source = "local"
+    if not await name_index.exact(business_name) and not await name_index.recently_confirmed(business_name):
+        search_result = await search_businesses(
+            entity_name=business_name,
+            use_test_token=use_test_token,
+            mirror_prefix=False
+        )
+        
+        if "error" in search_result:
+            return search_result
+        
+        # Answers from the mirror or the index itself confirm nothing new about the state's records
+        if search_result.get("source") not in ("local_index", "mirror"):
+            await name_index.record_query(business_name)
+            source = "remote"
+    
+    # Names differing only by case, punctuation or designators (LLC, INC...) conflict; the
+    # search above indexes its rows in the background, so wait for that first
+    await name_index.flush()
+    conflicts = await name_index.exact(business_name)
+    exact_match = next((match for match in conflicts if (match["status"] or "").lower() == "active"),
+                       conflicts[0] if conflicts else None)
+    similar_names = await name_index.similar(business_name, limit=10)
     
     is_available = exact_match is None
     
@@ -431,7 +585,9 @@ async def check_name_availability(
         "business_name": business_name,
         "is_available": is_available,
         "exact_match": exact_match,
-        "similar_names": similar_names[:10],  # Limit to 10 similar names
+        "similar_names": similar_names,  # Ranked by similarity, at most 10
+        "normalized_name": normalize_name(business_name),
+        "source": source,
         "recommendation": (
             f"The name '{business_name}' appears to be available for registration."
             if is_available else
@@ -457,8 +613,8 @@ async def verify_business_for_grant(
     Returns:
         Dictionary with verification results and eligibility assessment
     """
-    # Get business details
-    details = await lookup_business(
+    # Get business details (cached; may be stale if the API is down)
+    details = await lookup_business_cached(
         entity_number=entity_number,
         entity_type_id=entity_type_id,
         use_test_token=use_test_token
@@ -509,7 +665,9 @@ async def verify_business_for_grant(
             "registration_date": details.get("registration_date"),
             "business_type": details.get("business_type"),
             "annual_report_status": details.get("annual_report_status")
-        }
+        },
+        "stale": details.get("stale", False),
+        "data_as_of": details.get("fetched_at")
     }
 
 
@@ -0,0 +1,152 @@
+"""
+Louisiana SOS Transports for DowUrk AI Hub
+Record real LA SOS Commercial API responses to fixture files and replay them offline, with
+configurable latency and error injection, so search, lookup, certificate validation and grant
+verification can be tested and benchmarked through the real parsing path without the network
+
+Set LA_SOS_MODE to choose how la_sos_service reaches the API:
+    live    - real network (default)
+    record  - real network, every response also saved under LA_SOS_FIXTURES
+    replay  - answered from LA_SOS_FIXTURES only; never touches the network
+    demo    - routes return built-in sample payloads (no API calls at all)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+LA_SOS_MODE = os.environ.get("LA_SOS_MODE", "live").lower()
+LA_SOS_FIXTURES = os.environ.get("LA_SOS_FIXTURES", str(Path(__file__).parent / "fixtures" / "la_sos"))
+# Replay only: added delay per response, plus uniform jitter
+LA_SOS_REPLAY_LATENCY_MS = float(os.environ.get("LA_SOS_REPLAY_LATENCY_MS", "0"))
+LA_SOS_REPLAY_JITTER_MS = float(os.environ.get("LA_SOS_REPLAY_JITTER_MS", "0"))
+# Replay only: share of requests answered 503, and share that time out
+LA_SOS_REPLAY_ERROR_RATE = float(os.environ.get("LA_SOS_REPLAY_ERROR_RATE", "0"))
+LA_SOS_REPLAY_TIMEOUT_RATE = float(os.environ.get("LA_SOS_REPLAY_TIMEOUT_RATE", "0"))
+LA_SOS_REPLAY_SEED = os.environ.get("LA_SOS_REPLAY_SEED")
+
+MODES = ("live", "record", "replay", "demo")
+
+# Credentials never reach fixture files or fixture names
+_SECRET_PARAMS = {"Token", "EmailAddress"}
+# The saved body is already decoded, so these would no longer describe it
+_STALE_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+logger = logging.getLogger(__name__)
+
+
+def fixture_name(request: httpx.Request) -> str:
+    """Stable file name for a request: path plus non-secret query params, order-insensitive"""
+    params = sorted(
+        (name, value.strip().upper()) for name, value in request.url.params.multi_items()
+        if name not in _SECRET_PARAMS
+    )
+    digest = hashlib.sha1(json.dumps([request.url.path, params]).encode()).hexdigest()[:16]
+    return f"{request.url.path.strip('/').replace('/', '_')}-{digest}.json"
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Passes requests to the network and saves each response as a fixture"""
+
+    def __init__(self, fixture_dir: str, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.fixture_dir = Path(fixture_dir)
+        self.fixture_dir.mkdir(parents=True, exist_ok=True)
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.inner.handle_async_request(request)
+        content = await response.aread()
+        fixture = {
+            "request": {
+                "path": request.url.path,
+                "params": {name: value for name, value in request.url.params.items() if name not in _SECRET_PARAMS}
+            },
+            "status_code": response.status_code,
+            "content_type": response.headers.get("content-type", "application/json"),
+            "body": content.decode("utf-8", errors="replace")
+        }
+        await asyncio.to_thread(self._write, fixture_name(request), fixture)
+        headers = [(name, value) for name, value in response.headers.items() if name.lower() not in _STALE_HEADERS]
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    def _write(self, name: str, fixture: Dict[str, Any]) -> None:
+        path = self.fixture_dir / name
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(fixture, indent=2))
+        tmp.replace(path)
+
+    async def aclose(self) -> None:
+        # la_sos_service opens a client per call; the inner pool outlives each of them
+        pass
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Answers from recorded fixtures, with optional latency, jitter and injected failures.
+
+    Requests without a fixture get a 404 (logged) rather than a network call. Fixtures are
+    read once at construction, so replay adds no file I/O to the measured path.
+    """
+
+    def __init__(self, fixture_dir: str, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0, timeout_rate: float = 0, seed: Optional[int] = None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self._random = random.Random(seed)
+        self.fixtures: Dict[str, Dict[str, Any]] = {}
+        for path in sorted(Path(fixture_dir).glob("*.json")):
+            self.fixtures[path.name] = json.loads(path.read_text())
+        if not self.fixtures:
+            logger.warning(f"No LA SOS fixtures found in {fixture_dir}; every replayed request will 404")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self.latency_ms + self._random.uniform(0, self.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        roll = self._random.random()
+        if roll < self.timeout_rate:
+            raise httpx.ReadTimeout("Injected LA SOS timeout", request=request)
+        if roll < self.timeout_rate + self.error_rate:
+            return httpx.Response(503, json={"Status": "Error", "Message": "Injected LA SOS error"}, request=request)
+
+        name = fixture_name(request)
+        fixture = self.fixtures.get(name)
+        if fixture is None:
+            params = {key: value for key, value in request.url.params.items() if key not in _SECRET_PARAMS}
+            logger.warning(f"No LA SOS fixture {name} for {request.url.path} {params}")
+            return httpx.Response(404, json={"Status": "Error", "Message": f"No recorded fixture {name}"},
+                                  request=request)
+        return httpx.Response(
+            fixture["status_code"],
+            headers={"content-type": fixture.get("content_type", "application/json")},
+            content=fixture["body"].encode("utf-8"),
+            request=request
+        )
+
+
+def transport_from_env() -> Optional[httpx.AsyncBaseTransport]:
+    """The transport LA_SOS_MODE asks for (None = plain network)"""
+    if LA_SOS_MODE not in MODES:
+        raise ValueError(f"LA_SOS_MODE must be one of {', '.join(MODES)}, not {LA_SOS_MODE!r}")
+    if LA_SOS_MODE == "record":
+        return RecordingTransport(LA_SOS_FIXTURES)
+    if LA_SOS_MODE == "replay":
+        return ReplayTransport(
+            LA_SOS_FIXTURES,
+            latency_ms=LA_SOS_REPLAY_LATENCY_MS,
+            jitter_ms=LA_SOS_REPLAY_JITTER_MS,
+            error_rate=LA_SOS_REPLAY_ERROR_RATE,
+            timeout_rate=LA_SOS_REPLAY_TIMEOUT_RATE,
+            seed=int(LA_SOS_REPLAY_SEED) if LA_SOS_REPLAY_SEED else None
+        )
+    return None
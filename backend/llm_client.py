@@ -0,0 +1,83 @@
+"""
+LLM Client Helpers for DowUrk AI Services
+Single entry point for chat completions so every call is measured, traced and circuit-broken the same way
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from metrics import record_llm_call
+from tracing import inject_headers, span
+from resilience import CircuitBreaker, call_upstream
+
+# Completions are neither free nor idempotent, so the LLM gets a breaker but no retries of our own
+llm_breaker = CircuitBreaker("llm", "AI service")
+
+
+class LazyAsyncOpenAI:
+    """
+    Stand-in for AsyncOpenAI that imports openai and builds the client on first use.
+
+    The openai package is the single largest import in the API, and most workers
+    serve plenty of requests before their first completion.
+    """
+
+    def __init__(self, **kwargs: Any):
+        self._kwargs: Dict[str, Any] = kwargs
+        self._client = None
+
+    def get(self):
+        if self._client is None:
+            from openai import AsyncOpenAI
+            self._client = AsyncOpenAI(**self._kwargs)
+        return self._client
+
+    def __getattr__(self, name: str):
+        return getattr(self.get(), name)
+
+
+async def create_chat_completion(client, **kwargs):
+    """
+    Call client.chat.completions.create and record latency and token usage.
+
+    Args:
+        client: AsyncOpenAI client of the calling service
+        **kwargs: Passed through to chat.completions.create
+
+    Returns:
+        The ChatCompletion response
+
+    Raises:
+        CircuitOpenError: the LLM circuit is open (served as 503)
+    """
+    model = kwargs.get("model", "unknown")
+    with span(f"llm.chat {model}", "CLIENT", **{"llm.model": model}) as current:
+        kwargs["extra_headers"] = inject_headers(kwargs.get("extra_headers"))
+
+        async def attempt():
+            start = time.perf_counter()
+            try:
+                response = await client.chat.completions.create(**kwargs)
+            except Exception:
+                record_llm_call(model, time.perf_counter() - start, "error")
+                raise
+            record_llm_call(model, time.perf_counter() - start, "success", response.usage)
+            return response
+
+        response = await call_upstream(llm_breaker, attempt, _llm_failure)
+        if response.usage is not None:
+            current.set(**{"llm.prompt_tokens": response.usage.prompt_tokens,
+                           "llm.completion_tokens": response.usage.completion_tokens})
+        return response
+
+
+def _llm_failure(response, error) -> Optional[str]:
+    """Connection errors, timeouts, 429 and 5xx count against the breaker; bad requests do not"""
+    if error is None:
+        return None
+    from openai import APIConnectionError, APIStatusError
+    if isinstance(error, APIConnectionError):
+        return f"{type(error).__name__}: {error}"
+    if isinstance(error, APIStatusError) and (error.status_code >= 500 or error.status_code == 429):
+        return f"HTTP {error.status_code}"
+    return None
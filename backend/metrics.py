@@ -0,0 +1,328 @@
+"""
+Prometheus Metrics for DowUrk API
+In-process counters, gauges and histograms rendered in the Prometheus text format at /metrics,
+with collectors for HTTP routes, MongoDB commands, LLM calls and the Louisiana SOS API
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+
+# When set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Spans fast Mongo reads through multi-second LLM completions
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base for a labelled metric family. Safe to update from pymongo's monitoring threads."""
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+_INF_LABEL = 'le="+Inf"'
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelValues, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def time(self, **labels: str) -> "_Timer":
+        """Context manager observing the elapsed wall time of its block"""
+        return _Timer(self, labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, _INF_LABEL)} {state[-1]}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ==================== METRIC FAMILIES ====================
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status",
+                        ("method", "route", "status"))
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route template",
+                         ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+
+MONGO_LATENCY = Histogram("mongodb_command_duration_seconds", "MongoDB command latency",
+                          ("collection", "command"))
+MONGO_FAILURES = Counter("mongodb_command_failures_total", "Failed MongoDB commands",
+                         ("collection", "command"))
+
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "LLM chat completion latency", ("model", "route"))
+LLM_REQUESTS = Counter("llm_requests_total", "LLM chat completions by outcome", ("model", "route", "outcome"))
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens used", ("model", "route", "type"))
+
+LA_SOS_LATENCY = Histogram("la_sos_request_duration_seconds", "Louisiana SOS API latency", ("operation",))
+LA_SOS_REQUESTS = Counter("la_sos_requests_total", "Louisiana SOS API calls by status", ("operation", "status"))
+
+
+# ==================== HTTP ====================
+
+# ASGI scope of the request being served; the router adds the matched route to it
+_current_scope: ContextVar[Optional[dict]] = ContextVar("metrics_scope", default=None)
+
+
+def current_route() -> str:
+    """Route template of the request in progress (e.g. /api/businesses/{business_id})"""
+    scope = _current_scope.get()
+    if scope is None:
+        return "background"
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Per-route latency and status counts plus an in-flight gauge (plain ASGI, no body buffering)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        token = _current_scope.set(scope)
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            _current_scope.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            HTTP_LATENCY.observe(elapsed, method=scope["method"], route=route)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status["code"]))
+
+
+# ==================== MONGODB ====================
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Command monitoring listener: latency per collection and command name"""
+
+    def __init__(self):
+        self._collections: Dict[Tuple[int, object], str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _collection(event: monitoring.CommandStartedEvent) -> str:
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            return target
+        # getMore carries the cursor id under its command name
+        return str(event.command.get("collection", ""))
+
+    def started(self, event):
+        with self._lock:
+            self._collections[(event.request_id, event.connection_id)] = self._collection(event)
+
+    def _finish(self, event) -> str:
+        with self._lock:
+            return self._collections.pop((event.request_id, event.connection_id), "")
+
+    def succeeded(self, event):
+        collection = self._finish(event)
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, collection=collection, command=event.command_name)
+
+    def failed(self, event):
+        collection = self._finish(event)
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, collection=collection, command=event.command_name)
+        MONGO_FAILURES.inc(collection=collection, command=event.command_name)
+
+
+mongo_command_metrics = MongoCommandMetrics()
+
+
+# ==================== LLM / LA SOS ====================
+
+class RecentCalls:
+    """Latency and error rate over an upstream's most recent calls (read by the readiness check)"""
+
+    def __init__(self, max_calls: int = 200, window_seconds: float = 300):
+        self.window_seconds = window_seconds
+        self._calls: deque = deque(maxlen=max_calls)  # (time, seconds, ok)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float, ok: bool) -> None:
+        with self._lock:
+            self._calls.append((time.time(), elapsed, ok))
+
+    def summary(self) -> Dict[str, Any]:
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            calls = [call for call in self._calls if call[0] >= cutoff]
+        if not calls:
+            return {"calls": 0, "error_rate": 0.0, "p50_ms": None, "p95_ms": None, "last_ms": None}
+        latencies = sorted(elapsed for _, elapsed, _ in calls)
+        errors = sum(1 for _, _, ok in calls if not ok)
+        return {
+            "calls": len(calls),
+            "error_rate": round(errors / len(calls), 3),
+            "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+            "last_ms": round(calls[-1][1] * 1000, 1)
+        }
+
+
+LLM_RECENT = RecentCalls()
+LA_SOS_RECENT = RecentCalls()
+
+
+def record_llm_call(model: str, elapsed: float, outcome: str, usage=None) -> None:
+    LLM_RECENT.record(elapsed, outcome == "success")
+    route = current_route()
+    LLM_LATENCY.observe(elapsed, model=model, route=route)
+    LLM_REQUESTS.inc(model=model, route=route, outcome=outcome)
+    if usage is not None:
+        LLM_TOKENS.inc(usage.prompt_tokens or 0, model=model, route=route, type="prompt")
+        LLM_TOKENS.inc(usage.completion_tokens or 0, model=model, route=route, type="completion")
+
+
+def record_la_sos_call(operation: str, elapsed: float, status: str) -> None:
+    # 4xx answers still mean the upstream is up; timeouts, transport errors and 5xx do not
+    LA_SOS_RECENT.record(elapsed, status.isdigit() and not status.startswith("5"))
+    LA_SOS_LATENCY.observe(elapsed, operation=operation)
+    LA_SOS_REQUESTS.inc(operation=operation, status=status)
@@ -0,0 +1,232 @@
+"""
+Slow Query Profiler for DowUrk API
+Records MongoDB commands over a latency threshold, grouped by query shape, and captures
+their explain() plans in the background
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", "100"))
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+# A shape is re-explained at most this often
+EXPLAIN_COOLDOWN_SECONDS = 300
+MAX_CONCURRENT_EXPLAINS = 2
+MAX_SHAPES = 500
+
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "findAndModify", "update", "delete"}
+# Session and transport fields that explain() rejects or does not need
+_STRIPPED_FIELDS = {"lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "autocommit",
+                    "startTransaction", "writeConcern", "readConcern", "comment"}
+# Parts of a command that define its shape (values are masked, structure is kept)
+_SHAPE_FIELDS = ("filter", "query", "pipeline", "sort", "projection", "key", "updates", "deletes")
+
+logger = logging.getLogger(__name__)
+
+
+def query_shape(value: Any) -> Any:
+    """Mask literal values but keep field names and operators: {"city": "X"} -> {"city": "?"}"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = [query_shape(item) for item in value]
+        # $in: [a, b, c] and friends collapse to one placeholder
+        return shapes if any(isinstance(item, (dict, list)) for item in shapes) else ["?"] if shapes else []
+    return "?"
+
+
+def _command_shape(command_name: str, command: Dict[str, Any]) -> Dict[str, Any]:
+    shape = {field: query_shape(command[field]) for field in _SHAPE_FIELDS if field in command}
+    if command_name in ("update", "delete"):
+        # Only the q (and sort) of each statement matter for the plan
+        statements = command.get("updates") or command.get("deletes") or []
+        shape.pop("updates", None)
+        shape.pop("deletes", None)
+        shape["q"] = query_shape(statements[0].get("q", {})) if statements else {}
+    return shape
+
+
+def summarize_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Winning plan stages and execution stats from an explain(executionStats) result"""
+    planner = explain.get("queryPlanner")
+    stats = explain.get("executionStats", {})
+    if planner is None:
+        # Aggregations report the cursor stage's plan inside the first stage
+        for stage in explain.get("stages", []):
+            cursor = stage.get("$cursor")
+            if cursor:
+                planner = cursor.get("queryPlanner")
+                stats = cursor.get("executionStats", stats)
+                break
+    planner = planner or {}
+
+    stages: List[str] = []
+    indexes: List[str] = []
+    node = planner.get("winningPlan", {})
+    pending = [node.get("queryPlan", node)]
+    while pending:
+        node = pending.pop()
+        if not isinstance(node, dict):
+            continue
+        stage = node.get("stage")
+        if stage:
+            stages.append(stage)
+        if node.get("indexName"):
+            indexes.append(node["indexName"])
+        if "inputStage" in node:
+            pending.append(node["inputStage"])
+        pending.extend(node.get("inputStages", []))
+
+    return {
+        "stages": stages,
+        "collection_scan": "COLLSCAN" in stages,
+        "indexes": indexes,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis")
+    }
+
+
+class SlowQueryProfiler(monitoring.CommandListener):
+    """
+    Command listener aggregating slow commands by (namespace, command, shape).
+
+    Listener callbacks run on pymongo's threads, so they only update the shape
+    table under a lock and hand explain work to the event loop with
+    call_soon_threadsafe; the explain itself runs as a background task.
+    """
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS, explain: bool = SLOW_QUERY_EXPLAIN):
+        self.threshold_ms = threshold_ms
+        self.explain_enabled = explain
+        self.client = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[Tuple[int, Any], Tuple[str, Dict[str, Any]]] = {}
+        self._shapes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._explain_slots: Optional[asyncio.Semaphore] = None
+
+    def start(self, client) -> None:
+        """Enable explain capture (needs the Motor client and the running loop)"""
+        self.client = client
+        self.loop = asyncio.get_running_loop()
+        self._explain_slots = asyncio.Semaphore(MAX_CONCURRENT_EXPLAINS)
+
+    # ---------- listener callbacks (pymongo threads) ----------
+
+    def started(self, event):
+        if event.command_name in EXPLAINABLE_COMMANDS:
+            with self._lock:
+                self._pending[(event.request_id, event.connection_id)] = (event.database_name, event.command)
+
+    def succeeded(self, event):
+        self._finish(event, failed=False)
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool) -> None:
+        if event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        with self._lock:
+            started = self._pending.pop((event.request_id, event.connection_id), None)
+        duration_ms = event.duration_micros / 1000
+        if started is None or duration_ms < self.threshold_ms:
+            return
+        database, command = started
+        self._record(database, event.command_name, command, duration_ms, failed)
+
+    def _record(self, database: str, command_name: str, command: Dict[str, Any],
+                duration_ms: float, failed: bool) -> None:
+        collection = command.get(command_name)
+        namespace = f"{database}.{collection}"
+        shape = _command_shape(command_name, command)
+        key = json.dumps([namespace, command_name, shape], sort_keys=True, default=str)
+        now = time.time()
+
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is None:
+                entry = self._shapes[key] = {
+                    "namespace": namespace,
+                    "command": command_name,
+                    "shape": shape,
+                    "count": 0,
+                    "failures": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "first_seen": now,
+                    "plan": None,
+                    "explained_at": 0.0
+                }
+                logger.warning(f"Slow {command_name} on {namespace} ({duration_ms:.0f} ms): {json.dumps(shape, default=str)}")
+            self._shapes.move_to_end(key)
+            entry["count"] += 1
+            entry["failures"] += int(failed)
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_seen"] = now
+            while len(self._shapes) > MAX_SHAPES:
+                self._shapes.popitem(last=False)
+
+            due = now - entry["explained_at"] >= EXPLAIN_COOLDOWN_SECONDS
+            if due and self.explain_enabled and self.loop is not None and not failed:
+                entry["explained_at"] = now
+            else:
+                due = False
+
+        if due:
+            self.loop.call_soon_threadsafe(self._schedule_explain, key, database, command)
+
+    # ---------- explain capture (event loop) ----------
+
+    def _schedule_explain(self, key: str, database: str, command: Dict[str, Any]) -> None:
+        self.loop.create_task(self._explain(key, database, command))
+
+    async def _explain(self, key: str, database: str, command: Dict[str, Any]) -> None:
+        explainable = {field: value for field, value in command.items() if field not in _STRIPPED_FIELDS}
+        try:
+            async with self._explain_slots:
+                result = await self.client[database].command(
+                    {"explain": explainable, "verbosity": "executionStats"}
+                )
+            plan = summarize_plan(result)
+        except Exception as exc:
+            plan = {"error": str(exc)}
+        with self._lock:
+            entry = self._shapes.get(key)
+            if entry is not None:
+                entry["plan"] = plan
+
+    # ---------- reporting ----------
+
+    def report(self, limit: int = 20, sort: str = "total_ms") -> Dict[str, Any]:
+        with self._lock:
+            entries = [dict(entry) for entry in self._shapes.values()]
+        for entry in entries:
+            entry["avg_ms"] = round(entry["total_ms"] / entry["count"], 2)
+            entry["total_ms"] = round(entry["total_ms"], 2)
+            entry["max_ms"] = round(entry["max_ms"], 2)
+            entry.pop("explained_at", None)
+        entries.sort(key=lambda entry: entry.get(sort, 0), reverse=True)
+        return {
+            "threshold_ms": self.threshold_ms,
+            "shapes_tracked": len(entries),
+            "queries": entries[:limit]
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+
+
+slow_query_profiler = SlowQueryProfiler()
@@ -0,0 +1,263 @@
+"""
+Rate Limiting for DowUrk API
+Sliding-window and token-bucket limiters backed by process memory or a shared MongoDB collection
+"""
+
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Callable, NamedTuple
+
+from fastapi import HTTPException, Request
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+# "memory" keeps counters per worker; "mongo" shares them across all uvicorn workers
+RATE_LIMIT_BACKEND = os.environ.get("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_KEYS = int(os.environ.get("RATE_LIMIT_MAX_KEYS", "10000"))
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a single hit against a limit"""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds until the next hit would be allowed (0 when allowed)
+
+
+# ==================== STORAGE BACKENDS ====================
+
+class MemoryRateLimitStore:
+    """
+    Process-local store with a bounded number of keys.
+
+    Entries expire once their window has fully elapsed; the least recently used
+    keys are evicted when more than `max_keys` clients are being tracked.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[str, list]" = OrderedDict()  # key -> [expires_at, state]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, key: str, now: float) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _put(self, key: str, state: Any, expires_at: float, now: float) -> None:
+        self._entries[key] = [expires_at, state]
+        self._entries.move_to_end(key)
+        # Drop expired entries from the cold end, then enforce the size bound
+        while self._entries:
+            expires, _ = next(iter(self._entries.values()))
+            if expires > now and len(self._entries) <= self.max_keys:
+                break
+            self._entries.popitem(last=False)
+
+    async def hit_sliding_window(self, key: str, limit: int, window: float, now: float) -> RateLimitResult:
+        if limit <= 0:
+            return RateLimitResult(False, limit, 0, window)
+        hits = self._get(key, now)
+        if hits is None:
+            hits = deque(maxlen=limit)
+        cutoff = now - window
+        while hits and hits[0] <= cutoff:
+            hits.popleft()
+
+        if len(hits) >= limit:
+            self._put(key, hits, hits[-1] + window, now)
+            return RateLimitResult(False, limit, 0, hits[0] + window - now)
+
+        hits.append(now)
+        self._put(key, hits, now + window, now)
+        return RateLimitResult(True, limit, limit - len(hits), 0.0)
+
+    async def hit_token_bucket(self, key: str, capacity: int, refill_rate: float, now: float) -> RateLimitResult:
+        bucket = self._get(key, now)
+        if bucket is None:
+            bucket = [float(capacity), now]
+        tokens = min(float(capacity), bucket[0] + (now - bucket[1]) * refill_rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        bucket[0], bucket[1] = tokens, now
+        self._put(key, bucket, now + (capacity - tokens) / refill_rate, now)
+
+        if allowed:
+            return RateLimitResult(True, capacity, int(tokens), 0.0)
+        return RateLimitResult(False, capacity, 0, (1 - tokens) / refill_rate)
+
+
+class MongoRateLimitStore:
+    """
+    Shared store using one document per key in a TTL-indexed collection.
+
+    Each hit is a single atomic pipeline update, so every worker (and every
+    instance behind the load balancer) enforces the same limit.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("expire_at", expireAfterSeconds=0)
+
+    async def _update(self, key: str, pipeline: list) -> dict:
+        try:
+            return await self.collection.find_one_and_update(
+                {"_id": key}, pipeline, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Concurrent first hits on a key both tried the upsert insert; the loser now updates
+            return await self.collection.find_one_and_update(
+                {"_id": key}, pipeline, upsert=True, return_document=ReturnDocument.AFTER
+            )
+
+    async def hit_sliding_window(self, key: str, limit: int, window: float, now: float) -> RateLimitResult:
+        if limit <= 0:
+            return RateLimitResult(False, limit, 0, window)
+        pipeline = [
+            {"$set": {"hits": {"$filter": {
+                "input": {"$ifNull": ["$hits", []]},
+                "cond": {"$gt": ["$$this", now - window]}
+            }}}},
+            {"$set": {"allowed": {"$lt": [{"$size": "$hits"}, limit]}}},
+            {"$set": {
+                "hits": {"$cond": ["$allowed", {"$concatArrays": ["$hits", [now]]}, "$hits"]},
+                "expire_at": _expire_at(now + window)
+            }}
+        ]
+        doc = await self._update(key, pipeline)
+        hits = doc["hits"]
+        if doc["allowed"]:
+            return RateLimitResult(True, limit, limit - len(hits), 0.0)
+        return RateLimitResult(False, limit, 0, hits[0] + window - now)
+
+    async def hit_token_bucket(self, key: str, capacity: int, refill_rate: float, now: float) -> RateLimitResult:
+        pipeline = [
+            {"$set": {"tokens": {"$min": [
+                capacity,
+                {"$add": [
+                    {"$ifNull": ["$tokens", capacity]},
+                    {"$multiply": [{"$subtract": [now, {"$ifNull": ["$ts", now]}]}, refill_rate]}
+                ]}
+            ]}, "ts": now}},
+            {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+            {"$set": {
+                "tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                "expire_at": _expire_at(now + capacity / refill_rate)
+            }}
+        ]
+        doc = await self._update(key, pipeline)
+        tokens = doc["tokens"]
+        if doc["allowed"]:
+            return RateLimitResult(True, capacity, int(tokens), 0.0)
+        return RateLimitResult(False, capacity, 0, (1 - tokens) / refill_rate)
+
+
+def _expire_at(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+_default_store = None
+
+
+def get_rate_limit_store():
+    """Get the store used by limiters that were not given one explicitly"""
+    global _default_store
+    if _default_store is None:
+        _default_store = MemoryRateLimitStore()
+    return _default_store
+
+
+async def configure_rate_limit_store(db) -> None:
+    """Select the shared store according to RATE_LIMIT_BACKEND (called on startup)"""
+    global _default_store
+    if RATE_LIMIT_BACKEND == "mongo":
+        store = MongoRateLimitStore(db.rate_limits)
+        await store.ensure_indexes()
+        _default_store = store
+    else:
+        _default_store = MemoryRateLimitStore()
+
+
+# ==================== ALGORITHMS ====================
+
+class SlidingWindow:
+    """At most `limit` hits in any rolling `window_seconds` interval"""
+
+    def __init__(self, limit: int, window_seconds: float):
+        self.limit = limit
+        self.window_seconds = window_seconds
+
+    async def hit(self, store, key: str, now: float) -> RateLimitResult:
+        return await store.hit_sliding_window(key, self.limit, self.window_seconds, now)
+
+
+class TokenBucket:
+    """Bursts of up to `capacity` hits, refilled at `refill_per_second`"""
+
+    def __init__(self, capacity: int, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+
+    async def hit(self, store, key: str, now: float) -> RateLimitResult:
+        return await store.hit_token_bucket(key, self.capacity, self.refill_per_second, now)
+
+
+# ==================== FASTAPI DEPENDENCY ====================
+
+def client_ip(request: Request) -> str:
+    """Default key function: the connecting client's IP address"""
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimiter:
+    """
+    FastAPI dependency that rejects requests over the limit with a 429.
+
+    Usage:
+        @router.post("/blessings", dependencies=[Depends(RateLimiter("blessings", SlidingWindow(1, 300)))])
+    """
+
+    def __init__(
+        self,
+        scope: str,
+        algorithm,
+        key_func: Callable[[Request], str] = client_ip,
+        detail: str = "Too many requests. Please try again later.",
+        store=None
+    ):
+        self.scope = scope
+        self.algorithm = algorithm
+        self.key_func = key_func
+        self.detail = detail
+        self.store = store
+
+    async def __call__(self, request: Request) -> RateLimitResult:
+        store = self.store if self.store is not None else get_rate_limit_store()
+        key = f"{self.scope}:{self.key_func(request)}"
+        result = await self.algorithm.hit(store, key, time.time())
+
+        if not result.allowed:
+            raise HTTPException(
+                status_code=429,
+                detail=self.detail,
+                headers={
+                    "Retry-After": str(max(1, math.ceil(result.retry_after))),
+                    "X-RateLimit-Limit": str(result.limit),
+                    "X-RateLimit-Remaining": "0"
+                }
+            )
+        return result
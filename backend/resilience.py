@@ -0,0 +1,194 @@
+"""
+Upstream Resilience for DowUrk API
+Per-upstream circuit breakers and jittered retries, so a degraded LLM provider or Louisiana SOS API
+fails requests fast instead of making each one wait out the full timeout
+"""
+
+import asyncio
+import logging
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from fastapi import HTTPException
+
+from metrics import Gauge, Counter
+
+# Consecutive failures that open a circuit, and how long it stays open before a trial call
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.environ.get("CIRCUIT_RESET_SECONDS", "30"))
+
+CIRCUIT_STATE = Gauge("upstream_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("upstream",))
+CIRCUIT_REJECTIONS = Counter("upstream_circuit_rejections_total", "Calls failed fast by an open circuit", ("upstream",))
+UPSTREAM_RETRIES = Counter("upstream_retries_total", "Retried upstream calls", ("upstream",))
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(HTTPException):
+    """Raised instead of calling an upstream whose circuit is open (served as 503 with Retry-After)"""
+
+    def __init__(self, upstream: str, label: str, retry_after: float):
+        self.upstream = upstream
+        super().__init__(
+            status_code=503,
+            detail=f"The {label} is temporarily unavailable. Please try again shortly.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker.
+
+    Closed: calls go through; CIRCUIT_FAILURE_THRESHOLD consecutive failures open it.
+    Open: calls fail immediately with CircuitOpenError for reset_seconds.
+    Half-open: one trial call goes through; success closes the circuit, failure reopens it.
+    """
+
+    def __init__(self, name: str, label: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.label = label
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_failure: Optional[str] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.set(0, upstream=name)
+        BREAKERS[name] = self
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            logger.warning(f"Circuit for {self.name} is now {state}")
+        self.state = state
+        CIRCUIT_STATE.set(_STATE_VALUES[state], upstream=self.name)
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may go through now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            remaining = self.opened_at + self.reset_seconds - time.monotonic()
+            if self.state == OPEN and remaining <= 0:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+        CIRCUIT_REJECTIONS.inc(upstream=self.name)
+        raise CircuitOpenError(self.name, self.label, max(remaining, 1))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self, error: str) -> None:
+        with self._lock:
+            self.failures += 1
+            self.last_failure = error[:200]
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def abandon(self) -> None:
+        """The call was cancelled before the upstream answered; let another trial through"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = self.opened_at + self.reset_seconds - time.monotonic() if self.state == OPEN else 0
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "retry_in_seconds": round(max(0.0, retry_in), 1),
+                "last_failure": self.last_failure
+            }
+
+
+# name -> breaker, for monitoring
+BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def circuit_states() -> Dict[str, Dict[str, Any]]:
+    return {name: breaker.snapshot() for name, breaker in BREAKERS.items()}
+
+
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff (for idempotent calls only)"""
+
+    def __init__(self, attempts: int = 3, base_delay: float = 0.2, max_delay: float = 2.0):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+NO_RETRY = RetryPolicy(attempts=1)
+
+
+async def call_upstream(
+    breaker: CircuitBreaker,
+    attempt: Callable[[], Awaitable[T]],
+    failed: Callable[[Optional[T], Optional[BaseException]], Optional[str]],
+    retry: RetryPolicy = NO_RETRY,
+    admit: Optional[Callable[[], Awaitable[None]]] = None
+) -> T:
+    """
+    Run attempt() behind the breaker, retrying failures per the policy.
+
+    Args:
+        breaker: Circuit of the upstream being called
+        attempt: Makes one call
+        failed: Given (result, exception), a failure description, or None if the upstream answered
+        retry: Retry policy; only use retries for idempotent calls
+        admit: Awaited before each attempt the breaker lets through (e.g. charging a paid call);
+            if it raises, the attempt is abandoned without counting for or against the upstream
+
+    Returns:
+        The last attempt's result (the last exception is re-raised)
+    """
+    for number in range(retry.attempts):
+        breaker.before_call()
+        if admit is not None:
+            try:
+                await admit()
+            except BaseException:
+                breaker.abandon()
+                raise
+        result, error = None, None
+        try:
+            result = await attempt()
+        except Exception as exc:
+            error = exc
+        except BaseException:
+            breaker.abandon()
+            raise
+        failure = failed(result, error)
+        if failure is None:
+            breaker.record_success()
+        else:
+            breaker.record_failure(failure)
+        last = number == retry.attempts - 1
+        if failure is None or last or breaker.state == OPEN:
+            if error is not None:
+                raise error
+            return result
+        UPSTREAM_RETRIES.inc(upstream=breaker.name)
+        await asyncio.sleep(retry.delay(number))
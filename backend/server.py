@@ -1,35 +1,78 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Request
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Request, Query, UploadFile, File
+from fastapi.responses import StreamingResponse, PlainTextResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, create_model
 from typing import List, Optional, Dict, Any
 import uuid
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
-import jwt
-from passlib.context import CryptContext
+from json_response import FastJSONResponse
+from trusted_reads import TrustedReader
+from la_geocoding import geocode_business, parse_point, ensure_geo_indexes
+from rate_limiter import RateLimiter, SlidingWindow, configure_rate_limit_store
+from usage_metering import metered, usage_meter
+from auth import create_access_token, get_current_user
+from metrics import REGISTRY, CONTENT_TYPE, METRICS_TOKEN, MetricsMiddleware, mongo_command_metrics
+from query_profiler import slow_query_profiler
+from tracing import TracingMiddleware, mongo_tracing, exporter as trace_exporter
+from health import health_checker, pool_monitor
+from business_facets import SearchFilters, business_facets
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[mongo_command_metrics, slow_query_profiler, mongo_tracing, pool_monitor])
 db = client[os.environ['DB_NAME']]
 
-# Security
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-security = HTTPBearer()
-JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production')
-JWT_ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Startup and shutdown
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build clients and background services once the worker has an event loop"""
+    from business_import import ensure_import_indexes
+    from ai_hub_dashboard import dashboards
+    from la_sos_cache import la_sos_cache
+    from la_sos_name_index import name_index
+    from la_sos_mirror import la_sos_mirror
+    from la_sos_people_index import people_index
+    from la_sos_budget import la_sos_budget
+
+    slow_query_profiler.start(client)
+    await trace_exporter.start()
+    # Index setup is independent per subsystem, so startup waits for the slowest, not the sum;
+    # nothing loads collections into memory here (the people backfill runs in the background)
+    await asyncio.gather(
+        ensure_geo_indexes(db),
+        ensure_import_indexes(db),
+        business_facets.start(db),
+        configure_rate_limit_store(db),
+        usage_meter.start(db),
+        dashboards.start(db),
+        la_sos_cache.start(db),
+        la_sos_budget.start(db),
+        name_index.start(db),
+        la_sos_mirror.start(db),
+        people_index.start(db)
+    )
+    try:
+        yield
+    finally:
+        await usage_meter.stop()
+        await la_sos_mirror.stop()
+        await people_index.stop()
+        await trace_exporter.stop()
+        client.close()
 
 # Create the main app
-app = FastAPI(title="The DowUrk FramewUrk API")
+app = FastAPI(title="The DowUrk FramewUrk API", default_response_class=FastJSONResponse, lifespan=lifespan)
 api_router = APIRouter(prefix="/api")
 
 # ==================== MODELS ====================
@@ -47,6 +90,9 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
+# Roles a visitor may pick when registering; admins are promoted in the database
+SELF_SERVICE_USER_TYPES = {"entrepreneur", "mentor", "organization"}
+
 class User(UserBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -90,6 +136,14 @@ class Business(BusinessBase):
     rating: float = 0.0
     review_count: int = 0
 
+# Directory exports leave out owner contact details and account ids
+EXPORT_EXCLUDED_FIELDS = {"email", "phone", "user_id"}
+BusinessExport = create_model(
+    "BusinessExport",
+    **{name: (field.annotation, field) for name, field in Business.model_fields.items()
+       if name not in EXPORT_EXCLUDED_FIELDS}
+)
+
 # Event Models
 class EventBase(BaseModel):
     title: str
@@ -187,33 +241,44 @@ class Blessing(BlessingBase):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# Trusted-read fast paths for documents the app wrote itself
+FIELDS_DESCRIPTION = "Comma-separated fields to return (sparse fieldset), e.g. business_name,category,city,logo_url"
+business_reader = TrustedReader(Business)
+# Sparse, so excluded fields are never read out of MongoDB
+business_export_reader = TrustedReader(BusinessExport, sparse=True)
+event_reader = TrustedReader(Event)
+post_reader = TrustedReader(Post)
+resource_reader = TrustedReader(Resource)
+grant_reader = TrustedReader(Grant)
+
 # ==================== HELPER FUNCTIONS ====================
 
+@lru_cache(maxsize=1)
+def password_context():
+    # passlib and bcrypt load on the first register/login, not at worker boot
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def create_access_token(data: dict):
-    to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
-    return encoded_jwt
-
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    return password_context().verify(plain_password, hashed_password)
+
+async def get_current_admin(user_id: str = Depends(get_current_user)):
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "user_type": 1})
+    if not user or user.get("user_type") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user_id
+
+async def get_import_user(user_id: str = Depends(get_current_user)):
+    """Bulk import is for admins and owners of an approved listing"""
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "user_type": 1})
+    if user and user.get("user_type") == "admin":
         return user_id
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.JWTError:
-        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    if await db.businesses.find_one({"user_id": user_id, "is_verified": True}, {"_id": 1}):
+        return user_id
+    raise HTTPException(status_code=403, detail="Bulk import is limited to admins and owners of an approved listing")
 
 # ==================== ROUTES ====================
 
@@ -221,6 +286,16 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
 async def root():
     return {"message": "Welcome to The DowUrk FramewUrk API", "version": "1.0.0"}
 
+# Health probes: liveness never touches dependencies; readiness returns 503 to pull the worker from rotation
+@api_router.get("/health/live")
+async def health_live():
+    return health_checker.liveness()
+
+@api_router.get("/health/ready")
+async def health_ready():
+    result = await health_checker.readiness(db, client.options.pool_options.max_pool_size)
+    return FastJSONResponse(result, status_code=200 if result["ready"] else 503)
+
 # Auth Routes
 @api_router.post("/auth/register", response_model=Dict[str, Any])
 async def register(user_data: UserCreate):
@@ -228,6 +303,8 @@ async def register(user_data: UserCreate):
     existing_user = await db.users.find_one({"email": user_data.email})
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
+    if user_data.user_type not in SELF_SERVICE_USER_TYPES:
+        raise HTTPException(status_code=400, detail=f"user_type must be one of {', '.join(sorted(SELF_SERVICE_USER_TYPES))}")
     
     # Create user
     user = User(**user_data.model_dump(exclude={"password"}))
@@ -267,19 +344,41 @@ async def login(credentials: UserLogin):
     }
 
 # Business Routes
-@api_router.post("/businesses", response_model=Business)
-async def create_business(business_data: BusinessBase, user_id: str = Depends(get_current_user)):
-    business = Business(**business_data.model_dump(), user_id=user_id)
+def business_document(business: Business) -> Dict[str, Any]:
     doc = business.model_dump()
     doc['created_at'] = doc['created_at'].isoformat()
     doc['updated_at'] = doc['updated_at'].isoformat()
+    doc.update(geocode_business(doc))
+    return doc
+
+@api_router.post("/businesses", response_model=Business)
+async def create_business(business_data: BusinessBase, user_id: str = Depends(get_current_user)):
+    business = Business(**business_data.model_dump(), user_id=user_id)
+    doc = business_document(business)
     
     await db.businesses.insert_one(doc)
+    await business_facets.record_created([doc])
     return business
 
-@api_router.get("/businesses", response_model=List[Business])
-async def get_businesses(category: Optional[str] = None, city: Optional[str] = None, 
-                        parish: Optional[str] = None, search: Optional[str] = None):
+@api_router.post("/businesses/import")
+async def import_businesses(file: UploadFile = File(...),
+                            format: Optional[str] = Query(None, description="csv or ndjson; detected from the file name when omitted"),
+                            import_id: Optional[str] = Query(None, description="Resume an earlier import by re-sending the same file"),
+                            user_id: str = Depends(get_import_user)):
+    """Bulk-create listings from a CSV (list cells separated by ';') or NDJSON upload"""
+    from business_import import BusinessImporter
+    
+    importer = BusinessImporter(
+        db, BusinessBase,
+        lambda row, owner_id, business_id: business_document(
+            Business(**row.model_dump(), user_id=owner_id, id=business_id)
+        )
+    )
+    return FastJSONResponse(await importer.run(file, user_id, fmt=format, import_id=import_id))
+
+def build_business_query(category: Optional[str] = None, city: Optional[str] = None,
+                         parish: Optional[str] = None, search: Optional[str] = None) -> Dict[str, Any]:
+    """Directory filters shared by the list and export endpoints"""
     query = {}
     if category:
         query['category'] = category
@@ -292,25 +391,119 @@ async def get_businesses(category: Optional[str] = None, city: Optional[str] = N
             {'business_name': {'$regex': search, '$options': 'i'}},
             {'description': {'$regex': search, '$options': 'i'}}
         ]
+    return query
+
+@api_router.get("/businesses", response_model=List[Business])
+async def get_businesses(category: Optional[str] = None, city: Optional[str] = None, 
+                        parish: Optional[str] = None, search: Optional[str] = None,
+                        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+                        near: Optional[str] = Query(None, description="Center point as 'lat,lng'; results are sorted by distance"),
+                        radius_km: float = Query(25, gt=0, le=500, description="Search radius around `near`")):
+    reader = business_reader.select(fields)
+    query = build_business_query(category, city, parish, search)
+    
+    if near:
+        return await _get_businesses_near(near, radius_km, query, reader)
     
-    businesses = await db.businesses.find(query, {"_id": 0}).to_list(1000)
-    for biz in businesses:
-        if isinstance(biz.get('created_at'), str):
-            biz['created_at'] = datetime.fromisoformat(biz['created_at'])
-        if isinstance(biz.get('updated_at'), str):
-            biz['updated_at'] = datetime.fromisoformat(biz['updated_at'])
-    return businesses
+    businesses = await db.businesses.find(query, reader.projection).to_list(1000)
+    return reader.response(businesses)
+
+async def _get_businesses_near(near: str, radius_km: float, query: Dict[str, Any], reader: TrustedReader):
+    """Businesses within radius_km of a point, nearest first, with distance_km on each row"""
+    try:
+        point = parse_point(near)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="near must be 'lat,lng'")
+    
+    projection = dict(reader.projection)
+    if len(projection) > 1:  # sparse fieldset: keep the computed distance too
+        projection['distance_km'] = 1
+    pipeline = [
+        {'$geoNear': {
+            'near': point,
+            'distanceField': 'distance_km',
+            'distanceMultiplier': 0.001,
+            'maxDistance': radius_km * 1000,
+            'spherical': True,
+            'query': query
+        }},
+        {'$limit': 1000},
+        {'$project': projection}
+    ]
+    businesses = await db.businesses.aggregate(pipeline).to_list(1000)
+    rows = reader.read_many(businesses)
+    for row, biz in zip(rows, businesses):
+        row['distance_km'] = round(biz['distance_km'], 2)
+    return FastJSONResponse(rows)
+
+export_rate_limit = RateLimiter(
+    "business-exports",
+    SlidingWindow(limit=10, window_seconds=3600),
+    detail="Export limit reached, please try again later"
+)
+
+@api_router.get("/businesses/export", dependencies=[Depends(export_rate_limit)])
+async def export_businesses(category: Optional[str] = None, city: Optional[str] = None,
+                            parish: Optional[str] = None, search: Optional[str] = None,
+                            fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+                            format: str = Query("csv", pattern="^(csv|ndjson)$"),
+                            gzip: bool = Query(False, description="Download as a .gz file"),
+                            user_id: str = Depends(get_current_user)):
+    """Full directory export, streamed from the cursor (same filters as GET /businesses, no owner contact fields)"""
+    from business_export import EXPORT_BATCH_SIZE, MEDIA_TYPES, export_rows
+    
+    reader = business_export_reader.select(fields)
+    query = build_business_query(category, city, parish, search)
+    cursor = db.businesses.find(query, reader.projection).batch_size(EXPORT_BATCH_SIZE)
+    
+    filename = f"dowurk-businesses.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        export_rows(cursor, reader, format, gzip=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@api_router.get("/businesses/search")
+async def search_businesses(search: Optional[str] = None,
+                            category: List[str] = Query([]), parish: List[str] = Query([]),
+                            city: List[str] = Query([]), organization_type: List[str] = Query([]),
+                            certifications: List[str] = Query([]), services_offered: List[str] = Query([]),
+                            verified: Optional[bool] = None,
+                            fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+                            skip: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=1000)):
+    """Filtered directory page plus facet counts; repeat a filter to select several values"""
+    reader = business_reader.select(fields)
+    filters = SearchFilters(
+        search=search, category=category, parish=parish, city=city,
+        organization_type=organization_type, certifications=certifications,
+        services_offered=services_offered, verified=verified
+    )
+    result = await business_facets.search(filters, reader.projection, skip=skip, limit=limit)
+    result["results"] = reader.read_many(result["results"])
+    return FastJSONResponse(result)
+
+@api_router.post("/businesses/{business_id}/approve", response_model=Business)
+async def approve_business(business_id: str, admin_id: str = Depends(get_current_admin)):
+    approval = {
+        "is_pending_approval": False,
+        "is_verified": True,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    previous = await db.businesses.find_one_and_update(
+        {"id": business_id}, {"$set": approval}, projection={"_id": 0}
+    )
+    if not previous:
+        raise HTTPException(status_code=404, detail="Business not found")
+    await business_facets.record_approved(previous)
+    
+    return FastJSONResponse(business_reader.read({**previous, **approval}))
 
 @api_router.get("/businesses/{business_id}", response_model=Business)
 async def get_business(business_id: str):
     business = await db.businesses.find_one({"id": business_id}, {"_id": 0})
     if not business:
         raise HTTPException(status_code=404, detail="Business not found")
-    if isinstance(business.get('created_at'), str):
-        business['created_at'] = datetime.fromisoformat(business['created_at'])
-    if isinstance(business.get('updated_at'), str):
-        business['updated_at'] = datetime.fromisoformat(business['updated_at'])
-    return business
+    return FastJSONResponse(business_reader.read(business))
 
 # Event Routes
 @api_router.post("/events", response_model=Event)
@@ -325,22 +518,17 @@ async def create_event(event_data: EventBase, user_id: str = Depends(get_current
     return event
 
 @api_router.get("/events", response_model=List[Event])
-async def get_events(event_type: Optional[str] = None, upcoming: bool = True):
+async def get_events(event_type: Optional[str] = None, upcoming: bool = True,
+                     fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    reader = event_reader.select(fields)
     query = {}
     if event_type:
         query['event_type'] = event_type
     if upcoming:
         query['start_time'] = {'$gte': datetime.now(timezone.utc).isoformat()}
     
-    events = await db.events.find(query, {"_id": 0}).sort('start_time', 1).to_list(1000)
-    for event in events:
-        if isinstance(event.get('created_at'), str):
-            event['created_at'] = datetime.fromisoformat(event['created_at'])
-        if isinstance(event.get('start_time'), str):
-            event['start_time'] = datetime.fromisoformat(event['start_time'])
-        if isinstance(event.get('end_time'), str):
-            event['end_time'] = datetime.fromisoformat(event['end_time'])
-    return events
+    events = await db.events.find(query, reader.projection).sort('start_time', 1).to_list(1000)
+    return reader.response(events)
 
 # Community Feed Routes
 @api_router.post("/posts", response_model=Post)
@@ -358,35 +546,35 @@ async def create_post(post_data: PostBase, user_id: str = Depends(get_current_us
     return post
 
 @api_router.get("/posts", response_model=List[Post])
-async def get_posts(post_type: Optional[str] = None, limit: int = 50):
+async def get_posts(post_type: Optional[str] = None, limit: int = 50,
+                    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    reader = post_reader.select(fields)
     query = {}
     if post_type:
         query['post_type'] = post_type
     
-    posts = await db.posts.find(query, {"_id": 0}).sort('created_at', -1).limit(limit).to_list(limit)
-    for post in posts:
-        if isinstance(post.get('created_at'), str):
-            post['created_at'] = datetime.fromisoformat(post['created_at'])
-    return posts
+    posts = await db.posts.find(query, reader.projection).sort('created_at', -1).limit(limit).to_list(limit)
+    return reader.response(posts)
 
 # Resources Routes
 @api_router.get("/resources", response_model=List[Resource])
-async def get_resources(category: Optional[str] = None, resource_type: Optional[str] = None):
+async def get_resources(category: Optional[str] = None, resource_type: Optional[str] = None,
+                        fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    reader = resource_reader.select(fields)
     query = {}
     if category:
         query['category'] = category
     if resource_type:
         query['resource_type'] = resource_type
     
-    resources = await db.resources.find(query, {"_id": 0}).to_list(1000)
-    for resource in resources:
-        if isinstance(resource.get('created_at'), str):
-            resource['created_at'] = datetime.fromisoformat(resource['created_at'])
-    return resources
+    resources = await db.resources.find(query, reader.projection).to_list(1000)
+    return reader.response(resources)
 
 # Grants Routes
 @api_router.get("/grants", response_model=List[Grant])
-async def get_grants(category: Optional[str] = None, active_only: bool = True):
+async def get_grants(category: Optional[str] = None, active_only: bool = True,
+                     fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)):
+    reader = grant_reader.select(fields)
     query = {}
     if active_only:
         query['is_active'] = True
@@ -394,16 +582,11 @@ async def get_grants(category: Optional[str] = None, active_only: bool = True):
     if category:
         query['categories'] = category
     
-    grants = await db.grants.find(query, {"_id": 0}).sort('deadline', 1).to_list(1000)
-    for grant in grants:
-        if isinstance(grant.get('created_at'), str):
-            grant['created_at'] = datetime.fromisoformat(grant['created_at'])
-        if isinstance(grant.get('deadline'), str):
-            grant['deadline'] = datetime.fromisoformat(grant['deadline'])
-    return grants
+    grants = await db.grants.find(query, reader.projection).sort('deadline', 1).to_list(1000)
+    return reader.response(grants)
 
 # AI Chat Route
-@api_router.post("/ai/chat", response_model=ChatResponse)
+@api_router.post("/ai/chat", response_model=ChatResponse, dependencies=[Depends(metered("ai_chats_per_month"))])
 async def ai_chat(chat_request: ChatRequest):
     from ai_service import generate_ai_response
     
@@ -419,7 +602,7 @@ async def ai_chat(chat_request: ChatRequest):
     )
 
 # AI Business Plan Generation
-@api_router.post("/ai/business-plan")
+@api_router.post("/ai/business-plan", dependencies=[Depends(metered("ai_chats_per_month"))])
 async def generate_business_plan(business_idea: str, industry: str):
     from ai_service import generate_business_plan_outline
     
@@ -427,7 +610,7 @@ async def generate_business_plan(business_idea: str, industry: str):
     return plan
 
 # AI Grant Analysis
-@api_router.post("/ai/grant-analysis")
+@api_router.post("/ai/grant-analysis", dependencies=[Depends(metered("ai_chats_per_month"))])
 async def analyze_grant(business_description: str, grant_criteria: List[str]):
     from ai_service import analyze_grant_eligibility
     
@@ -435,7 +618,7 @@ async def analyze_grant(business_description: str, grant_criteria: List[str]):
     return analysis
 
 # AI Marketing Content Generation
-@api_router.post("/ai/marketing-content")
+@api_router.post("/ai/marketing-content", dependencies=[Depends(metered("ai_chats_per_month"))])
 async def create_marketing_content(business_name: str, business_description: str, content_type: str):
     from ai_service import generate_marketing_content
     
@@ -443,18 +626,15 @@ async def create_marketing_content(business_name: str, business_description: str
     return {"content": content}
 
 # Blessings/Gratitude Wall Routes
-@api_router.post("/blessings", response_model=Blessing)
-async def create_blessing(blessing_data: BlessingBase, request: Request):
-    from rate_limit_helper import check_rate_limit
-    
-    # Rate limiting: 1 blessing per 5 minutes per IP
-    client_ip = request.client.host
-    if not check_rate_limit(client_ip, limit_minutes=5):
-        raise HTTPException(
-            status_code=429, 
-            detail="Please wait 5 minutes between blessing submissions"
-        )
-    
+# Rate limiting: 1 blessing per 5 minutes per IP
+blessing_rate_limit = RateLimiter(
+    "blessings",
+    SlidingWindow(limit=1, window_seconds=300),
+    detail="Please wait 5 minutes between blessing submissions"
+)
+
+@api_router.post("/blessings", response_model=Blessing, dependencies=[Depends(blessing_rate_limit)])
+async def create_blessing(blessing_data: BlessingBase):
     # Validate word count (approximate)
     word_count = len(blessing_data.blessing.split())
     if word_count > 300:
@@ -472,11 +652,21 @@ async def get_blessings():
     total = await db.blessings.count_documents({})
     blessings = await db.blessings.find({}, {"_id": 0}).sort("created_at", -1).limit(50).to_list(50)
     
-    for blessing in blessings:
-        if isinstance(blessing.get('created_at'), str):
-            blessing['created_at'] = datetime.fromisoformat(blessing['created_at'])
-    
-    return {"total": total, "blessings": blessings}
+    # Stored timestamps are already ISO strings, so the documents go straight to orjson
+    return FastJSONResponse({"total": total, "blessings": blessings})
+
+# Admin Routes
+@api_router.get("/admin/slow-queries")
+async def get_slow_queries(limit: int = Query(20, ge=1, le=500),
+                           sort: str = Query("total_ms", pattern="^(total_ms|max_ms|avg_ms|count)$"),
+                           admin_id: str = Depends(get_current_admin)):
+    """Slowest MongoDB query shapes seen by this worker, with their captured explain plans"""
+    return FastJSONResponse(slow_query_profiler.report(limit=limit, sort=sort))
+
+@api_router.delete("/admin/slow-queries")
+async def reset_slow_queries(admin_id: str = Depends(get_current_admin)):
+    slow_query_profiler.reset()
+    return {"message": "Slow query statistics cleared"}
 
 # Include routers
 app.include_router(api_router)
@@ -497,6 +687,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
 
 # Logging
 logging.basicConfig(
@@ -504,7 +702,3 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
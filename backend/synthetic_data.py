@@ -0,0 +1,335 @@
+"""
+Synthetic data generator for DowUrk load testing
+Produces production-scale, reproducible businesses, users, events, posts and grants across Louisiana
+
+Every chunk of rows is generated from its own seeded RNG, so the same --seed (and --base-date)
+always yields the same data no matter how many writers run in parallel. Dates are offsets from
+the base date, today by default, so upcoming events and open grants exist whenever it runs. Ids are prefixed with "syn-";
+re-running skips rows that already exist, and --drop removes them first.
+
+Usage:
+    python synthetic_data.py --businesses 1000000 --users 200000 --events 20000 --posts 500000 --grants 5000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from passlib.context import CryptContext
+from pymongo.errors import BulkWriteError
+
+from expanded_categories import BUSINESS_CATEGORIES, LOUISIANA_PARISHES, MAJOR_CITIES
+from la_geocoding import PARISH_ZIP3, geocode_business
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+ID_PREFIX = "syn-"
+SYNTHETIC_PASSWORD = "synthetic-password"
+
+FIRST_NAMES = ["James", "Michael", "Robert", "Mary", "Patricia", "Jennifer", "Linda", "Latoya",
+               "Marcus", "Jasmine", "Antoine", "Keisha", "Damon", "Tiffany", "Andre", "Renee",
+               "Darnell", "Monique", "Terrence", "Aaliyah", "Jean", "Claudette", "Pierre", "Simone"]
+LAST_NAMES = ["Johnson", "Williams", "Brown", "Jones", "Davis", "Miller", "Wilson", "Moore",
+              "Taylor", "Anderson", "Thomas", "Jackson", "White", "Harris", "Martin", "Boudreaux",
+              "Thibodeaux", "Landry", "Broussard", "Hebert", "Fontenot", "Guidry", "Batiste", "Comeaux"]
+NAME_PREFIXES = ["Louisiana", "Bayou", "Delta", "Creole", "Southern", "Magnolia", "Crescent", "Pelican",
+                 "Cypress", "Acadiana", "Red River", "Gulf Coast"]
+NAME_SUFFIXES = ["Group", "Services", "Solutions", "Co.", "LLC", "Enterprise", "Studio", "Works", "Collective"]
+STREETS = ["Main", "Oak", "Elm", "Magazine", "Canal", "Royal", "Bourbon", "Jefferson", "Louisiana",
+           "Government", "Florida", "Highland", "Airline", "Veterans", "Perkins", "Johnston", "Youree"]
+CERTIFICATIONS = ["MBE", "WBE", "DBE", "SBE", "VOSB", "HUBZone", "8(a)", "LED Hudson", "LED Veteran"]
+AREA_CODES = ["504", "225", "318", "337", "985"]
+USER_TYPES = ["entrepreneur"] * 8 + ["mentor", "organization"]
+EVENT_TYPES = ["workshop", "webinar", "networking", "training", "conference"]
+POST_TYPES = ["announcement", "collaboration", "question", "resource", "success_story"]
+GRANT_ORGS = ["Louisiana Economic Development", "SBA Louisiana District Office", "Greater New Orleans Foundation",
+              "Baton Rouge Area Foundation", "Community Foundation of North Louisiana", "LCTCS Workforce Fund"]
+GRANT_CATEGORIES = ["small_business", "minority_owned", "women_owned", "technology", "nonprofit",
+                    "workforce", "rural", "arts"]
+
+# Real directories are skewed: a few categories and the big metros dominate
+CATEGORY_KEYS = list(BUSINESS_CATEGORIES)
+CATEGORY_WEIGHTS = [1 / (rank + 1) for rank in range(len(CATEGORY_KEYS))]
+CITY_NAMES = list(MAJOR_CITIES)
+CITY_WEIGHTS = [1 / (rank + 1) ** 0.8 for rank in range(len(CITY_NAMES))]
+RURAL_SHARE = 0.2
+
+
+def _rng(seed: int, kind: str, chunk: int) -> random.Random:
+    return random.Random(f"{seed}:{kind}:{chunk}")
+
+
+def base_time(date: Optional[str] = None) -> datetime:
+    """Reference time for generated dates: midnight UTC on `date` (YYYY-MM-DD), default today"""
+    if date:
+        return datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ts(rng: random.Random, opts: argparse.Namespace, min_days: int, max_days: int) -> str:
+    return (opts.base_time + timedelta(days=rng.uniform(min_days, max_days))).isoformat()
+
+
+def _person(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _slug(text: str) -> str:
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+# ==================== ROW GENERATORS ====================
+
+def make_business(rng: random.Random, index: int, opts: argparse.Namespace) -> Dict[str, Any]:
+    category = rng.choices(CATEGORY_KEYS, CATEGORY_WEIGHTS)[0]
+    subcategories = BUSINESS_CATEGORIES[category]["subcategories"]
+    business_type = rng.choice(subcategories)
+    if rng.random() < RURAL_SHARE:
+        parish = rng.choice(LOUISIANA_PARISHES)
+        city = parish
+    else:
+        city = rng.choices(CITY_NAMES, CITY_WEIGHTS)[0]
+        parish = MAJOR_CITIES[city]
+
+    business_name = f"{rng.choice(NAME_PREFIXES)} {business_type} {rng.choice(NAME_SUFFIXES)} {index}"
+    owner_name = _person(rng)
+    slug = _slug(business_name)
+    verified = rng.random() < 0.75
+    created_at = _ts(rng, opts, -1500, 0)
+    doc = {
+        "id": f"{ID_PREFIX}biz-{index:08d}",
+        "business_name": business_name,
+        "owner_name": owner_name,
+        "email": f"{owner_name.lower().replace(' ', '.')}@{slug}.com",
+        "phone": f"({rng.choice(AREA_CODES)}) 555-{rng.randint(1000, 9999)}",
+        "category": category,
+        "description": f"{business_type} serving the {city} area. Committed to quality service and customer satisfaction.",
+        "address": f"{rng.randint(100, 9999)} {rng.choice(STREETS)} St",
+        "city": city,
+        "parish": parish,
+        "zip_code": f"{rng.choice(PARISH_ZIP3[parish])}{rng.randint(1, 99):02d}",
+        "website": f"https://{slug}.com" if rng.random() < 0.6 else None,
+        "social_media": {"facebook": f"https://facebook.com/{slug}"} if rng.random() < 0.5 else {},
+        "hours_of_operation": "Mon-Fri: 9am-6pm, Sat: 10am-4pm",
+        "services_offered": rng.sample(subcategories, min(len(subcategories), rng.randint(1, 3))),
+        "organization_type": "non-profit" if rng.random() < 0.1 else "for-profit",
+        "certifications": rng.sample(CERTIFICATIONS, rng.choices([0, 1, 2, 3], [50, 30, 15, 5])[0]),
+        "user_id": f"{ID_PREFIX}user-{rng.randrange(max(opts.users, 1)):08d}",
+        "created_at": created_at,
+        "updated_at": created_at,
+        "is_verified": verified,
+        "is_pending_approval": not verified,
+        "logo_url": None,
+        "images": [],
+        "rating": round(rng.uniform(3.0, 5.0), 1),
+        "review_count": int(rng.paretovariate(1.5)) - 1
+    }
+    doc.update(geocode_business(doc))
+    return doc
+
+
+def make_user(rng: random.Random, index: int, opts: argparse.Namespace) -> Dict[str, Any]:
+    full_name = _person(rng)
+    return {
+        "id": f"{ID_PREFIX}user-{index:08d}",
+        "email": f"{full_name.lower().replace(' ', '.')}.{index}@example.com",
+        "full_name": full_name,
+        "user_type": rng.choice(USER_TYPES),
+        "phone": f"({rng.choice(AREA_CODES)}) 555-{rng.randint(1000, 9999)}",
+        "location": rng.choice(CITY_NAMES),
+        "bio": None,
+        "interests": rng.sample(CATEGORY_KEYS, 2),
+        "password": opts.password_hash,
+        "created_at": _ts(rng, opts, -1500, 0),
+        "is_active": True,
+        "profile_image": None
+    }
+
+
+def make_event(rng: random.Random, index: int, opts: argparse.Namespace) -> Dict[str, Any]:
+    event_type = rng.choice(EVENT_TYPES)
+    topic = BUSINESS_CATEGORIES[rng.choice(CATEGORY_KEYS)]["name"]
+    start = opts.base_time + timedelta(days=rng.uniform(-365, 365))
+    return {
+        "id": f"{ID_PREFIX}event-{index:08d}",
+        "title": f"{topic} {event_type.title()} #{index}",
+        "description": f"A {event_type} for Louisiana entrepreneurs in {topic.lower()}.",
+        "event_type": event_type,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=rng.randint(1, 4))).isoformat(),
+        "location": f"{rng.choice(CITY_NAMES)} Business Center" if rng.random() < 0.7 else "Online",
+        "organizer": "DowUrk Inc.",
+        "max_attendees": rng.choice([None, 25, 50, 100, 250]),
+        "registration_link": None,
+        "tags": ["entrepreneurship", event_type],
+        "created_at": (start - timedelta(days=rng.randint(7, 60))).isoformat(),
+        "attendees": [f"{ID_PREFIX}user-{rng.randrange(max(opts.users, 1)):08d}" for _ in range(rng.randint(0, 10))],
+        "is_active": True
+    }
+
+
+def make_post(rng: random.Random, index: int, opts: argparse.Namespace) -> Dict[str, Any]:
+    post_type = rng.choice(POST_TYPES)
+    category = rng.choice(CATEGORY_KEYS)
+    return {
+        "id": f"{ID_PREFIX}post-{index:08d}",
+        "title": f"{post_type.replace('_', ' ').title()}: {BUSINESS_CATEGORIES[category]['name']} in {rng.choice(CITY_NAMES)}",
+        "content": "Looking to connect with other Louisiana business owners. " * rng.randint(1, 6),
+        "post_type": post_type,
+        "tags": [category],
+        "user_id": f"{ID_PREFIX}user-{rng.randrange(max(opts.users, 1)):08d}",
+        "user_name": _person(rng),
+        "created_at": _ts(rng, opts, -730, 0),
+        "likes": int(rng.paretovariate(1.2)) - 1,
+        "comments": [],
+        "attachments": []
+    }
+
+
+def make_grant(rng: random.Random, index: int, opts: argparse.Namespace) -> Dict[str, Any]:
+    low = rng.choice([1, 2, 5, 10, 25]) * 1000
+    return {
+        "id": f"{ID_PREFIX}grant-{index:08d}",
+        "title": f"{rng.choice(NAME_PREFIXES)} Small Business Grant #{index}",
+        "organization": rng.choice(GRANT_ORGS),
+        "description": "Funding for Louisiana small businesses to grow, hire and invest in their communities.",
+        "amount_range": f"${low:,} - ${low * rng.choice([2, 5, 10]):,}",
+        "eligibility": ["Louisiana-based", f"Located in {rng.choice(LOUISIANA_PARISHES)} Parish"],
+        "deadline": _ts(rng, opts, -90, 365),
+        "application_link": f"https://example.org/grants/{index}",
+        "categories": rng.sample(GRANT_CATEGORIES, rng.randint(1, 3)),
+        "created_at": _ts(rng, opts, -365, 0),
+        "is_active": True
+    }
+
+
+GENERATORS: Dict[str, Callable[[random.Random, int, argparse.Namespace], Dict[str, Any]]] = {
+    "users": make_user,
+    "businesses": make_business,
+    "events": make_event,
+    "posts": make_post,
+    "grants": make_grant,
+}
+
+
+# ==================== LOADER ====================
+
+class Progress:
+    def __init__(self, kind: str, total: int):
+        self.kind = kind
+        self.total = total
+        self.inserted = 0
+        self.skipped = 0
+        self.started = time.perf_counter()
+
+    @property
+    def done(self) -> int:
+        return self.inserted + self.skipped
+
+    def line(self) -> str:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return (f"   {self.kind:<11} {self.done:>10,}/{self.total:,} "
+                f"({self.done / max(self.total, 1):>6.1%})  {self.done / elapsed:>10,.0f} docs/s")
+
+
+async def _insert_chunk(collection, docs: List[Dict[str, Any]], progress: Progress) -> None:
+    try:
+        result = await collection.insert_many(docs, ordered=False)
+        progress.inserted += len(result.inserted_ids)
+    except BulkWriteError as exc:
+        # Duplicate ids from an earlier run are expected; anything else is a real failure
+        errors = exc.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in errors):
+            raise
+        progress.inserted += exc.details.get("nInserted", 0)
+        progress.skipped += len(errors)
+
+
+async def load_collection(db, kind: str, total: int, opts: argparse.Namespace) -> Progress:
+    """Generate and insert `total` rows with up to opts.concurrency batches in flight"""
+    progress = Progress(kind, total)
+    make_row = GENERATORS[kind]
+    chunks = iter(range(0, total, opts.batch_size))
+
+    async def writer():
+        for start in chunks:
+            rng = _rng(opts.seed, kind, start // opts.batch_size)
+            docs = [make_row(rng, index, opts) for index in range(start, min(start + opts.batch_size, total))]
+            await _insert_chunk(db[kind], docs, progress)
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(opts.report_seconds)
+            print(progress.line(), flush=True)
+
+    report_task = asyncio.create_task(reporter())
+    try:
+        await asyncio.gather(*(writer() for _ in range(opts.concurrency)))
+    finally:
+        report_task.cancel()
+    return progress
+
+
+async def generate(opts: argparse.Namespace) -> None:
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'], maxPoolSize=max(opts.concurrency * 2, 10))
+    db = client[os.environ['DB_NAME']]
+    opts.base_time = base_time(opts.base_date)
+    # One bcrypt hash for every synthetic user: hashing per row would dominate the run
+    opts.password_hash = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(SYNTHETIC_PASSWORD)
+
+    print("🌱 Generating synthetic DowUrk data")
+    print("=" * 60)
+    try:
+        if opts.drop:
+            print("🗑️  Removing earlier synthetic rows...")
+            for kind in GENERATORS:
+                await db[kind].delete_many({"id": {"$regex": f"^{ID_PREFIX}"}})
+
+        started = time.perf_counter()
+        grand_total = 0
+        for kind in GENERATORS:
+            total = getattr(opts, kind)
+            if total <= 0:
+                continue
+            # Lets a re-run skip rows it already wrote instead of duplicating them
+            await db[kind].create_index("id", unique=True)
+            progress = await load_collection(db, kind, total, opts)
+            elapsed = time.perf_counter() - progress.started
+            print(f"✓ {kind}: {progress.inserted:,} inserted, {progress.skipped:,} already present "
+                  f"in {elapsed:.1f}s ({progress.done / max(elapsed, 1e-9):,.0f} docs/s)")
+            grand_total += progress.done
+
+        if opts.businesses > 0:
+            # Directory facet counts are rebuilt from scratch on the next read
+            await db.business_facet_counts.delete_many({})
+
+        elapsed = time.perf_counter() - started
+        print("=" * 60)
+        print(f"✅ {grand_total:,} documents in {elapsed:.1f}s ({grand_total / max(elapsed, 1e-9):,.0f} docs/s)")
+        print(f"💡 Synthetic users sign in with the password '{SYNTHETIC_PASSWORD}'")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--businesses", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--events", type=int, default=5_000)
+    parser.add_argument("--posts", type=int, default=50_000)
+    parser.add_argument("--grants", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=42, help="Same seed, same data")
+    parser.add_argument("--base-date", help="Date (YYYY-MM-DD) generated dates are offset from; default today")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per insert_many")
+    parser.add_argument("--concurrency", type=int, default=8, help="Batches in flight at once")
+    parser.add_argument("--report-seconds", type=float, default=2.0, help="Progress line interval")
+    parser.add_argument("--drop", action="store_true", help="Delete earlier synthetic rows first")
+    asyncio.run(generate(parser.parse_args()))
@@ -0,0 +1,332 @@
+"""
+Request Tracing for DowUrk API
+Sampled spans for route handlers, MongoDB commands, LA SOS calls and LLM completions,
+propagated with W3C traceparent headers and exported to an NDJSON file or a Zipkin collector
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from pymongo import monitoring
+
+# Fraction of requests that start a new trace; requests arriving with a sampled traceparent are always traced
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0"))
+# Finished spans are appended here as Zipkin v2 JSON, one span per line
+TRACE_FILE = os.environ.get("TRACE_FILE")
+# e.g. http://localhost:9411/api/v2/spans (Zipkin, Jaeger and the OTel collector all accept it)
+TRACE_ZIPKIN_URL = os.environ.get("TRACE_ZIPKIN_URL")
+TRACE_SERVICE_NAME = os.environ.get("TRACE_SERVICE_NAME", "dowurk-api")
+TRACE_FLUSH_SECONDS = 2.0
+# Spans beyond this are dropped rather than letting a stalled exporter grow memory
+MAX_BUFFERED_SPANS = 10000
+
+logger = logging.getLogger(__name__)
+
+
+# ==================== SPANS ====================
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_us", "duration_us", "attributes", "error")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, kind: str = "INTERNAL",
+                 attributes: Optional[Dict[str, Any]] = None, start_us: Optional[int] = None):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_us = start_us if start_us is not None else time.time_ns() // 1000
+        self.duration_us = 0
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def finish(self, duration_us: Optional[int] = None) -> None:
+        self.duration_us = duration_us if duration_us is not None else time.time_ns() // 1000 - self.start_us
+        exporter.add(self)
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_zipkin(self) -> Dict[str, Any]:
+        tags = {key: str(value) for key, value in self.attributes.items() if value is not None}
+        if self.error:
+            tags["error"] = self.error
+        span = {
+            "traceId": self.trace_id,
+            "id": self.span_id,
+            "name": self.name,
+            "timestamp": self.start_us,
+            "duration": max(self.duration_us, 1),
+            "localEndpoint": {"serviceName": TRACE_SERVICE_NAME},
+            "tags": tags
+        }
+        if self.parent_id:
+            span["parentId"] = self.parent_id
+        if self.kind != "INTERNAL":
+            span["kind"] = self.kind
+        return span
+
+
+class _NoopSpan:
+    """Returned for unsampled requests so call sites never need to check"""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# Innermost open span of the current request; None when the request is not sampled
+_current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, kind: str = "INTERNAL", **attributes: Any):
+    """
+    Time a block as a child of the current span.
+
+    Costs one ContextVar lookup when the request is not being traced.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    child = Span(parent.trace_id, parent.span_id, name, kind, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = f"{type(exc).__name__}: {exc}"[:300]
+        raise
+    finally:
+        _current_span.reset(token)
+        child.finish()
+
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add the current span's traceparent to outgoing request headers"""
+    headers = dict(headers or {})
+    current = _current_span.get()
+    if current is not None:
+        headers["traceparent"] = current.traceparent()
+    return headers
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent_id, sampled) from a W3C traceparent header, None if malformed"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def _start_root(traceparent: Optional[str], name: str, attributes: Dict[str, Any]) -> Optional[Span]:
+    incoming = parse_traceparent(traceparent)
+    if incoming is not None:
+        trace_id, parent_id, sampled = incoming
+        if not sampled:
+            return None
+    elif TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE:
+        trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+    else:
+        return None
+    return Span(trace_id, parent_id, name, "SERVER", attributes)
+
+
+# ==================== HTTP ====================
+
+class TracingMiddleware:
+    """Server span per sampled request, named by route template (plain ASGI, no body buffering)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not exporter.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        root = _start_root(traceparent, scope["method"], {"http.method": scope["method"], "http.target": scope["path"]})
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set(**{"http.status_code": message["status"]})
+                if message["status"] >= 500:
+                    root.error = f"HTTP {message['status']}"
+                # Lets a client or load test look the trace up
+                message["headers"] = list(message.get("headers", [])) + [(b"traceparent", root.traceparent().encode())]
+            await send(message)
+
+        token = _current_span.set(root)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            root.error = f"{type(exc).__name__}: {exc}"[:300]
+            raise
+        finally:
+            _current_span.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            root.name = f"{scope['method']} {route}"
+            root.set(**{"http.route": route})
+            root.finish()
+
+
+# ==================== MONGODB ====================
+
+class MongoTracing(monitoring.CommandListener):
+    """
+    Client span per MongoDB command issued while a sampled span is open.
+
+    Motor runs pymongo calls through run_in_executor with a copy of the caller's
+    context, so the current span is visible in started() on the worker thread.
+    """
+
+    def __init__(self):
+        self._spans: Dict[Tuple[int, object], Span] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else event.command.get("collection", "")
+        child = Span(parent.trace_id, parent.span_id, f"mongodb.{event.command_name}", "CLIENT", {
+            "db.system": "mongodb",
+            "db.name": event.database_name,
+            "db.collection": collection,
+            "db.operation": event.command_name
+        })
+        with self._lock:
+            self._spans[(event.request_id, event.connection_id)] = child
+
+    def _finish(self, event, error: Optional[str] = None) -> None:
+        if not self._spans:
+            return
+        with self._lock:
+            child = self._spans.pop((event.request_id, event.connection_id), None)
+        if child is not None:
+            child.error = error
+            child.finish(event.duration_micros)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure.get("errmsg", "failed"))[:300])
+
+
+mongo_tracing = MongoTracing()
+
+
+# ==================== EXPORT ====================
+
+class TraceExporter:
+    """
+    Buffers finished spans in memory and flushes them from a background task,
+    so request paths never wait on disk or the collector.
+    """
+
+    def __init__(self):
+        # Nothing is traced until there is somewhere to send the spans
+        self.enabled = bool(TRACE_FILE or TRACE_ZIPKIN_URL)
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._http = None
+        self.dropped = 0
+
+    def add(self, finished: Span) -> None:
+        with self._lock:
+            if len(self._buffer) >= MAX_BUFFERED_SPANS:
+                self.dropped += 1
+                return
+            self._buffer.append(finished)
+
+    def _drain(self) -> List[Span]:
+        with self._lock:
+            spans = list(self._buffer)
+            self._buffer.clear()
+        return spans
+
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        if TRACE_ZIPKIN_URL:
+            import httpx
+            self._http = httpx.AsyncClient(timeout=5.0)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Tracing enabled (sample rate {TRACE_SAMPLE_RATE}, file={TRACE_FILE}, zipkin={TRACE_ZIPKIN_URL})")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(TRACE_FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except Exception as exc:
+                logger.warning(f"Trace export failed: {exc}")
+
+    async def flush(self) -> None:
+        spans = self._drain()
+        if not spans:
+            return
+        payload = [finished.to_zipkin() for finished in spans]
+        if TRACE_FILE:
+            lines = b"".join(orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE) for item in payload)
+            await asyncio.to_thread(self._append, lines)
+        if self._http is not None:
+            response = await self._http.post(TRACE_ZIPKIN_URL, content=orjson.dumps(payload),
+                                             headers={"Content-Type": "application/json"})
+            if response.status_code >= 300:
+                logger.warning(f"Trace collector returned {response.status_code}")
+
+    @staticmethod
+    def _append(lines: bytes) -> None:
+        with open(TRACE_FILE, "ab") as handle:
+            handle.write(lines)
+
+
+exporter = TraceExporter()
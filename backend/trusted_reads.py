@@ -0,0 +1,90 @@
+"""
+Trusted Database Reads for DowUrk API
+Fast path for documents the app wrote itself: shape them like the response model without re-validating
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, create_model
+
+from json_response import FastJSONResponse
+
+# Distinct fieldsets cached per model before the cache is reset
+MAX_SPARSE_READERS = 64
+
+
+class TrustedReader:
+    """
+    Shapes MongoDB documents into a model's response form without validation.
+
+    Every document in these collections was validated on the way in (request
+    models) or written by our seeders, so reads only need missing defaults
+    filled in and unknown keys dropped. Field metadata is computed once per
+    model; timestamps stored as ISO strings are passed through as-is.
+    """
+
+    def __init__(self, model: Type[BaseModel], sparse: bool = False):
+        self.model = model
+        self.fields = tuple(model.model_fields)
+        # Sparse readers project only their own fields out of MongoDB
+        self.projection = {"_id": 0, **{name: 1 for name in self.fields}} if sparse else {"_id": 0}
+        self._sparse_readers: Dict[Tuple[str, ...], "TrustedReader"] = {}
+        self.defaults: Dict[str, Any] = {}
+        self.factories: Dict[str, Any] = {}
+        for name, field in model.model_fields.items():
+            if field.is_required():
+                continue
+            if field.default_factory is not None:
+                self.factories[name] = field.default_factory
+            else:
+                self.defaults[name] = field.default
+
+    def select(self, fields: Optional[str]) -> "TrustedReader":
+        """
+        Reader for a `fields=` sparse fieldset.
+
+        Args:
+            fields: Comma-separated field names; `id` is always included
+
+        Returns:
+            A reader over a slimmed response model (self when no fields are given)
+        """
+        if not fields:
+            return self
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in self.model.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+        key = tuple(sorted({"id", *requested}))
+        reader = self._sparse_readers.get(key)
+        if reader is None:
+            if len(self._sparse_readers) >= MAX_SPARSE_READERS:
+                self._sparse_readers.clear()
+            slim_model = create_model(
+                f"{self.model.__name__}Fields",
+                **{name: (self.model.model_fields[name].annotation, self.model.model_fields[name]) for name in key}
+            )
+            reader = self._sparse_readers[key] = TrustedReader(slim_model, sparse=True)
+        return reader
+
+    def read(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        # Default values are shared between rows; treat the output as read-only
+        out = {}
+        for name in self.fields:
+            if name in doc:
+                out[name] = doc[name]
+            elif name in self.defaults:
+                out[name] = self.defaults[name]
+            elif name in self.factories:
+                out[name] = self.factories[name]()
+        return out
+
+    def read_many(self, docs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        read = self.read
+        return [read(doc) for doc in docs]
+
+    def response(self, docs: Iterable[Dict[str, Any]]) -> FastJSONResponse:
+        """Render a page of documents straight to JSON, bypassing response_model validation"""
+        return FastJSONResponse(self.read_many(docs))
@@ -0,0 +1,255 @@
+"""
+Usage Metering for DowUrk AI Hub
+Per-user, per-month counters that enforce SUBSCRIPTION_TIERS limits before each AI call
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException
+from pymongo import ReturnDocument, UpdateOne
+
+from ai_hub_service import SUBSCRIPTION_TIERS
+from auth import caller_key
+
+logger = logging.getLogger(__name__)
+
+# Units reserved from the shared counter per round trip; small limits get smaller leases
+METERING_LEASE_SIZE = int(os.environ.get("METERING_LEASE_SIZE", "10"))
+METERING_FLUSH_SECONDS = float(os.environ.get("METERING_FLUSH_SECONDS", "5"))
+# Unused units held by an idle worker are handed back so other workers can use them
+METERING_LEASE_IDLE_SECONDS = float(os.environ.get("METERING_LEASE_IDLE_SECONDS", "60"))
+TIER_CACHE_SECONDS = 60
+
+# Metered limit -> prefix used in the /subscription/status usage block
+METERED_LIMITS = {
+    "ai_chats_per_month": "ai_chats",
+    "grant_matches": "grant_matches",
+    "mentor_requests": "mentor_requests"
+}
+
+
+def current_period() -> str:
+    """Metering period key (calendar month, UTC)"""
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+
+class _Lease:
+    """Units this worker has reserved from the shared counter"""
+    __slots__ = ("available", "pending", "last_used")
+
+    def __init__(self):
+        self.available = 0   # reserved and not yet consumed
+        self.pending = 0     # consumed but not yet flushed to `used`
+        self.last_used = time.monotonic()
+
+
+class UsageMeter:
+    """
+    Enforces monthly limits with leased counters.
+
+    Each worker atomically reserves a small block of units from a per-user,
+    per-period document in MongoDB (never beyond the tier limit) and then serves
+    checks from memory. Consumed units are flushed periodically; leases left idle
+    are returned so the remaining quota is available to other workers.
+    """
+
+    def __init__(self):
+        self.collection = None
+        self.users = None
+        self._leases: Dict[Tuple[str, str, str], _Lease] = {}
+        self._locks: Dict[Tuple[str, str, str], asyncio.Lock] = {}
+        self._tiers: Dict[str, Tuple[str, float]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def start(self, db) -> None:
+        self.collection = db.usage_counters
+        self.users = db.users
+        await self.collection.create_index("expire_at", expireAfterSeconds=0)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush(return_all=True)
+
+    # ---------- tiers ----------
+
+    async def get_tier(self, user_key: str) -> str:
+        if user_key.startswith("ip:"):
+            return "free"
+        cached = self._tiers.get(user_key)
+        now = time.monotonic()
+        if cached and cached[1] > now:
+            return cached[0]
+        user = await self.users.find_one({"id": user_key}, {"_id": 0, "subscription_tier": 1})
+        tier = (user or {}).get("subscription_tier") or "free"
+        if tier not in SUBSCRIPTION_TIERS:
+            tier = "free"
+        self._tiers[user_key] = (tier, now + TIER_CACHE_SECONDS)
+        return tier
+
+    # ---------- hot path ----------
+
+    async def acquire(self, user_key: str, metric: str) -> None:
+        """Consume one unit of `metric`, raising a 429 when the tier limit is reached"""
+        tier = await self.get_tier(user_key)
+        limit = SUBSCRIPTION_TIERS[tier]["limits"].get(metric, -1)
+        key = (user_key, metric, current_period())
+
+        lease = self._leases.get(key)
+        if lease is None:
+            lease = self._leases[key] = _Lease()
+        lease.last_used = time.monotonic()
+
+        if limit < 0:
+            lease.pending += 1
+            return
+        if lease.available > 0:
+            lease.available -= 1
+            lease.pending += 1
+            return
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if lease.available == 0:
+                lease.available += await self._reserve(key, limit)
+            if lease.available == 0:
+                raise HTTPException(
+                    status_code=429,
+                    detail=(
+                        f"You've reached this month's {METERED_LIMITS.get(metric, metric).replace('_', ' ')} "
+                        f"limit on the {SUBSCRIPTION_TIERS[tier]['name']} plan. Upgrade for more."
+                    )
+                )
+            lease.available -= 1
+            lease.pending += 1
+
+    async def release(self, user_key: str, metric: str) -> None:
+        """Refund a unit whose AI call failed"""
+        key = (user_key, metric, current_period())
+        lease = self._leases.get(key)
+        if lease and lease.pending > 0:
+            lease.pending -= 1
+            lease.available += 1
+            return
+        # The unit was already flushed to `used`: hand it back to the shared counter
+        if self.collection is not None:
+            await self.collection.update_one({"_id": ":".join(key)}, [{"$set": {
+                "used": {"$max": [0, {"$subtract": [{"$ifNull": ["$used", 0]}, 1]}]},
+                "reserved": {"$max": [0, {"$subtract": [{"$ifNull": ["$reserved", 0]}, 1]}]}
+            }}])
+
+    async def _reserve(self, key: Tuple[str, str, str], limit: int) -> int:
+        user_key, metric, period = key
+        remaining = {"$subtract": [limit, "$reserved"]}
+        pipeline = [
+            {"$set": {
+                "reserved": {"$ifNull": ["$reserved", 0]},
+                "used": {"$ifNull": ["$used", 0]}
+            }},
+            {"$set": {"grant": {"$max": [0, {"$min": [
+                remaining,
+                METERING_LEASE_SIZE,
+                {"$max": [1, {"$floor": {"$divide": [remaining, 4]}}]}
+            ]}]}}},
+            {"$set": {
+                "reserved": {"$add": ["$reserved", "$grant"]},
+                "user_id": user_key,
+                "metric": metric,
+                "period": period,
+                "expire_at": datetime.now(timezone.utc) + timedelta(days=400)
+            }}
+        ]
+        doc = await self.collection.find_one_and_update(
+            {"_id": ":".join(key)}, pipeline, upsert=True, return_document=ReturnDocument.AFTER
+        )
+        return doc["grant"]
+
+    # ---------- flushing ----------
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(METERING_FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Usage meter flush failed: {e}")
+
+    async def flush(self, return_all: bool = False) -> None:
+        """Write consumed units to MongoDB and hand back idle or expired leases"""
+        if self.collection is None:
+            return
+        period = current_period()
+        idle_before = time.monotonic() - METERING_LEASE_IDLE_SECONDS
+        ops = []
+
+        for key, lease in list(self._leases.items()):
+            inc = {}
+            if lease.pending:
+                inc["used"] = lease.pending
+                lease.pending = 0
+            if return_all or key[2] != period or lease.last_used < idle_before:
+                if lease.available:
+                    inc["reserved"] = -lease.available
+                del self._leases[key]
+                self._locks.pop(key, None)
+            if inc:
+                user_key, metric, lease_period = key
+                ops.append(UpdateOne(
+                    {"_id": ":".join(key)},
+                    {"$inc": inc, "$setOnInsert": {"user_id": user_key, "metric": metric, "period": lease_period}},
+                    upsert=True
+                ))
+
+        now = time.monotonic()
+        self._tiers = {k: v for k, v in self._tiers.items() if v[1] > now}
+        if ops:
+            await self.collection.bulk_write(ops, ordered=False)
+
+    # ---------- reporting ----------
+
+    async def get_usage(self, user_key: str) -> Dict:
+        """Usage and limits for the current period, in the /subscription/status shape"""
+        tier = await self.get_tier(user_key)
+        period = current_period()
+        ids = [f"{user_key}:{metric}:{period}" for metric in METERED_LIMITS]
+        docs = {
+            doc["metric"]: doc
+            async for doc in self.collection.find({"_id": {"$in": ids}}, {"metric": 1, "used": 1})
+        }
+
+        usage = {}
+        for metric, prefix in METERED_LIMITS.items():
+            lease = self._leases.get((user_key, metric, period))
+            used = docs.get(metric, {}).get("used", 0) + (lease.pending if lease else 0)
+            usage[f"{prefix}_used"] = used
+            usage[f"{prefix}_limit"] = SUBSCRIPTION_TIERS[tier]["limits"].get(metric, -1)
+        return {"tier": tier, "period": period, "usage": usage}
+
+
+usage_meter = UsageMeter()
+
+
+def metered(metric: str):
+    """
+    FastAPI dependency that meters one unit of `metric` for the caller.
+
+    The caller is the user of the bearer token, or the client IP for anonymous
+    requests. The unit is refunded if the route fails (services report model
+    failures as HTTP errors, so those are refunded too).
+    """
+    async def dependency(user_key: str = Depends(caller_key)):
+        await usage_meter.acquire(user_key, metric)
+        try:
+            yield user_key
+        except Exception:
+            await usage_meter.release(user_key, metric)
+            raise
+
+    return dependency
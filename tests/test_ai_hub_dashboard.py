@@ -0,0 +1,69 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+from ai_hub_dashboard import DashboardAggregator
+from usage_metering import usage_meter
+
+
+def run(scenario):
+    """Run scenario(dashboards, db) against an aggregator started on a fresh mock database"""
+    async def main():
+        db = AsyncMongoMockClient()["dashboard_test"]
+        dashboards = DashboardAggregator()
+        await dashboards.start(db)
+        await usage_meter.start(db)
+        try:
+            return await scenario(dashboards, db)
+        finally:
+            await usage_meter.stop()
+    return asyncio.run(main())
+
+
+def test_sections_follow_record_hooks():
+    async def scenario(dashboards, db):
+        before = await dashboards.get_dashboard("user-1", display_user_id="user-1")
+        await dashboards.record_coaching_session("user-1", {"session_id": "s1", "business_stage": "idea", "health_score": 60})
+        await dashboards.record_checkin("user-1", "s1", {"health_score_change": 5}, ["a", "b"])
+        await dashboards.record_grant_matches("user-1", {"matches": [
+            {"grant_id": "g1", "grant_title": "Small", "match_score": 40},
+            {"grant_id": "g2", "grant_title": "Large", "match_score": 90},
+        ]})
+        await dashboards.record_mentor_matches("user-1", {"matches": [{"mentor_id": "m1"}]})
+        await dashboards.record_peer_group("user-1", {"group_name": "Founders", "group_focus": "retail",
+                                                      "members": ["a", "b", "c"]})
+        # Served from the cache, then rebuilt from the stored document
+        cached = await dashboards.get_dashboard("user-1", display_user_id="user-1")
+        dashboards._cache.clear()
+        stored = await dashboards.get_dashboard("user-1", display_user_id="user-1")
+        return before, cached, stored
+
+    before, cached, stored = run(scenario)
+    assert not before["coaching"]["active_session"]
+    assert before["grants"]["matches_found"] == 0
+    for dashboard in (cached, stored):
+        assert dashboard["coaching"]["session_id"] == "s1"
+        assert dashboard["coaching"]["health_score"] == 65
+        assert dashboard["coaching"]["completed_milestones"] == 2
+        assert dashboard["grants"]["matches_found"] == 2
+        assert [m["grant_id"] for m in dashboard["grants"]["top_matches"]] == ["g2", "g1"]
+        assert dashboard["community"]["mentor_matches"] == 1
+        assert dashboard["community"]["peer_group"]["member_count"] == 3
+
+
+def test_anonymous_callers_share_no_dashboard():
+    async def scenario(dashboards, db):
+        await dashboards.record_coaching_session("ip:10.0.0.1", {"session_id": "s1", "health_score": 60})
+        await dashboards.record_grant_matches("ip:10.0.0.1", {"matches": [{"grant_id": "g1", "match_score": 90}]})
+        await dashboards.record_peer_group("ip:10.0.0.1", {"group_name": "Founders", "members": ["a"]})
+        dashboard = await dashboards.get_dashboard("ip:10.0.0.1")
+        stored = sum([await db[name].count_documents({}) for name in (
+            "ai_hub_dashboards", "coaching_sessions", "grant_match_results", "peer_groups"
+        )])
+        return dashboard, stored
+
+    dashboard, stored = run(scenario)
+    assert stored == 0
+    assert not dashboard["coaching"]["active_session"]
+    assert dashboard["grants"]["matches_found"] == 0
+    assert dashboard["community"]["peer_group"] is None
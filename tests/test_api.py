@@ -0,0 +1,340 @@
+import json
+import time
+from datetime import datetime, timezone, timedelta
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+from openai import AsyncOpenAI
+
+import ai_service
+import server
+
+BUSINESS = {
+    "business_name": "Marie's Creole Kitchen",
+    "owner_name": "Marie LeBlanc",
+    "email": "marie@example.com",
+    "phone": "+1-504-555-0123",
+    "category": "food",
+    "description": "Authentic Louisiana Creole cuisine with family recipes passed down through generations",
+    "address": "1234 Magazine Street",
+    "city": "New Orleans",
+    "parish": "Orleans",
+    "zip_code": "70130",
+    "services_offered": ["Dine-in", "Takeout", "Catering"],
+    "certifications": ["MBE"]
+}
+
+
+def llm_transport() -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        return httpx.Response(200, json={
+            "id": "chatcmpl-test", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "test"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "Register with the Secretary of State."}}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20}
+        })
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture
+def api(monkeypatch):
+    monkeypatch.setattr(server, "db", AsyncMongoMockClient()["api_test"])
+    monkeypatch.setattr(ai_service, "client", AsyncOpenAI(
+        api_key="test", base_url="http://llm.test/v1", http_client=httpx.AsyncClient(transport=llm_transport())
+    ))
+    with TestClient(server.app) as client:
+        yield client
+
+
+def register(api, email="marie@example.com", **extra):
+    response = api.post("/api/auth/register", json={
+        "email": email, "password": "SecurePass123!", "full_name": "Marie LeBlanc", **extra
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def insert(api, collection, docs):
+    api.portal.call(server.db[collection].insert_many, docs)
+
+
+# ==================== AUTH ====================
+
+def test_register_and_login(api):
+    data = register(api)
+    assert data["access_token"]
+    assert data["user"]["id"]
+    assert "password" not in data["user"]
+
+    response = api.post("/api/auth/login", json={"email": "marie@example.com", "password": "SecurePass123!"})
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+
+
+def test_login_rejects_wrong_password(api):
+    register(api)
+    response = api.post("/api/auth/login", json={"email": "marie@example.com", "password": "wrong"})
+    assert response.status_code == 401
+
+
+def test_register_rejects_admin_user_type(api):
+    response = api.post("/api/auth/register", json={
+        "email": "eve@example.com", "password": "pw", "full_name": "Eve", "user_type": "admin"
+    })
+    assert response.status_code == 400
+
+
+def test_invalid_token_is_unauthorized(api):
+    response = api.post("/api/businesses", json=BUSINESS, headers=bearer("not-a-jwt"))
+    assert response.status_code == 401
+
+
+# ==================== BUSINESS DIRECTORY ====================
+
+def test_create_business_requires_auth(api):
+    assert api.post("/api/businesses", json=BUSINESS).status_code in (401, 403)
+
+
+def test_create_list_filter_and_search_businesses(api):
+    token = register(api)["access_token"]
+    response = api.post("/api/businesses", json=BUSINESS, headers=bearer(token))
+    assert response.status_code == 200
+    created = response.json()
+    assert created["business_name"] == BUSINESS["business_name"]
+    assert "_id" not in created
+
+    listed = api.get("/api/businesses").json()
+    assert [business["id"] for business in listed] == [created["id"]]
+    assert api.get("/api/businesses?category=food").json()
+    assert api.get("/api/businesses?category=beauty").json() == []
+
+    page = api.get("/api/businesses/search?search=creole&certifications=MBE").json()
+    assert page["total"] == 1
+    assert page["results"][0]["id"] == created["id"]
+    assert {"value": "food", "count": 1} in page["facets"]["category"]
+
+    assert api.get(f"/api/businesses/{created['id']}").json()["id"] == created["id"]
+    assert api.get("/api/businesses/missing").status_code == 404
+
+
+def test_export_requires_auth_and_omits_contact_fields(api):
+    token = register(api)["access_token"]
+    api.post("/api/businesses", json=BUSINESS, headers=bearer(token))
+    assert api.get("/api/businesses/export").status_code in (401, 403)
+
+    response = api.get("/api/businesses/export?format=ndjson", headers=bearer(token))
+    assert response.status_code == 200
+    row = json.loads(response.text.splitlines()[0])
+    assert row["business_name"] == BUSINESS["business_name"]
+    assert not {"email", "phone", "user_id"} & row.keys()
+
+
+def import_file(api, token, content, name="listings.ndjson", **params):
+    return api.post("/api/businesses/import", params=params, headers=bearer(token),
+                    files={"file": (name, content.encode(), "application/octet-stream")})
+
+
+def test_import_is_limited_to_admins_and_approved_owners(api):
+    token = register(api)["access_token"]
+    assert import_file(api, token, json.dumps(BUSINESS) + "\n").status_code == 403
+
+
+def test_import_reports_invalid_rows_and_skips_duplicates(api):
+    admin = register(api, email="admin@example.com")
+    api.portal.call(server.db.users.update_one, {"id": admin["user"]["id"]}, {"$set": {"user_type": "admin"}})
+    token = admin["access_token"]
+    second = {**BUSINESS, "business_name": "Bayou Bites", "email": "bites@example.com"}
+    content = "\n".join([
+        json.dumps(BUSINESS),
+        json.dumps({"business_name": "No Owner"}),
+        "not json",
+        json.dumps(BUSINESS),
+        json.dumps(second),
+    ]) + "\n"
+
+    first = import_file(api, token, content).json()
+    assert first["status"] == "completed"
+    assert (first["rows_read"], first["inserted"], first["duplicates"], first["error_count"]) == (5, 2, 1, 2)
+    assert [error["row"] for error in first["errors"]] == [2, 3]
+    assert first["errors"][1]["error"].startswith("Invalid JSON")
+
+    # Ids are derived from name, ZIP code and email, so re-sending the file adds nothing
+    again = import_file(api, token, content).json()
+    assert (again["inserted"], again["duplicates"]) == (0, 3)
+    names = sorted(business["business_name"] for business in api.get("/api/businesses").json())
+    assert names == ["Bayou Bites", BUSINESS["business_name"]]
+
+
+def test_import_rejects_overlong_csv_records(api, monkeypatch):
+    import business_import
+    monkeypatch.setattr(business_import, "MAX_RECORD_CHARS", 500)
+    admin = register(api, email="admin@example.com")
+    api.portal.call(server.db.users.update_one, {"id": admin["user"]["id"]}, {"$set": {"user_type": "admin"}})
+    fields = ["business_name", "owner_name", "email", "phone", "category", "description",
+              "address", "city", "parish", "zip_code"]
+    row = ",".join(f'"{BUSINESS[field]}"' for field in fields)
+    overlong = '"unbalanced ' + "x" * 600
+    content = "\n".join([",".join(fields), row, overlong, row.replace("Marie", "Anne")]) + "\n"
+
+    result = import_file(api, admin["access_token"], content, name="listings.csv").json()
+    assert result["inserted"] == 2
+    assert [error["row"] for error in result["errors"]] == [2]
+    assert "longer than 500" in result["errors"][0]["error"]
+
+
+# ==================== BLESSINGS ====================
+
+def test_blessings(api):
+    response = api.post("/api/blessings", json={"name": "Marie", "blessing": "Grateful for this community."})
+    assert response.status_code == 200
+    assert response.json()["id"]
+
+    listed = api.get("/api/blessings")
+    assert listed.status_code == 200
+    assert "Grateful for this community." in listed.text
+
+
+def test_blessing_word_limit(api):
+    response = api.post("/api/blessings", json={"name": "Marie", "blessing": "word " * 301})
+    assert response.status_code == 400
+
+
+def test_blessing_rate_limit(api):
+    blessing = {"name": "Marie", "blessing": "Testing rate limiting"}
+    assert api.post("/api/blessings", json=blessing).status_code == 200
+    response = api.post("/api/blessings", json=blessing)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+
+# ==================== EVENTS, RESOURCES, GRANTS ====================
+
+def test_upcoming_events(api):
+    now = datetime.now(timezone.utc)
+    insert(api, "events", [
+        {"id": f"event-{days}", "title": f"Workshop {days}", "description": "Workshop", "event_type": "workshop",
+         "start_time": (now + timedelta(days=days)).isoformat(), "end_time": (now + timedelta(days=days, hours=2)).isoformat(),
+         "location": "Online", "organizer": "DowUrk Inc.", "tags": [], "attendees": [],
+         "created_at": now.isoformat(), "is_active": True}
+        for days in (-10, 5, 20)
+    ])
+    response = api.get("/api/events")
+    assert response.status_code == 200
+    assert [event["id"] for event in response.json()] == ["event-5", "event-20"]
+
+
+def test_resources(api):
+    response = api.get("/api/resources")
+    assert response.status_code == 200
+    assert isinstance(response.json(), list)
+
+
+def test_active_grants(api):
+    now = datetime.now(timezone.utc)
+    insert(api, "grants", [
+        {"id": f"grant-{days}", "title": f"Grant {days}", "organization": "LED", "description": "Funding",
+         "amount_range": "$1,000 - $5,000", "eligibility": [], "deadline": (now + timedelta(days=days)).isoformat(),
+         "categories": ["small_business"], "created_at": now.isoformat(), "is_active": True}
+        for days in (-30, 30)
+    ])
+    response = api.get("/api/grants")
+    assert response.status_code == 200
+    assert [grant["id"] for grant in response.json()] == ["grant-30"]
+
+
+# ==================== AI ====================
+
+def test_ai_chat(api):
+    response = api.post("/api/ai/chat", json={"message": "How do I register an LLC in Louisiana?"})
+    assert response.status_code == 200
+    assert response.json()["response"] == "Register with the Secretary of State."
+
+
+def test_failed_ai_call_is_an_error_and_is_not_metered(api, monkeypatch):
+    async def provider_down(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(400, json={"error": {"message": "bad request", "type": "invalid_request_error"}})
+    monkeypatch.setattr(ai_service, "client", AsyncOpenAI(
+        api_key="test", base_url="http://llm.test/v1",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(provider_down))
+    ))
+    token = register(api)["access_token"]
+    response = api.post("/api/ai/chat", json={"message": "Hello"}, headers=bearer(token))
+    assert response.status_code == 502
+    usage = api.get("/api/ai-hub/subscription/status", headers=bearer(token)).json()["usage"]
+    assert usage["ai_chats_used"] == 0
+
+
+def test_ai_usage_is_metered_per_authenticated_user(api):
+    token = register(api)["access_token"]
+    api.post("/api/ai/chat", json={"message": "Hello"}, headers=bearer(token))
+    mine = api.get("/api/ai-hub/subscription/status", headers=bearer(token)).json()
+    anonymous = api.get("/api/ai-hub/subscription/status?user_id=" + mine["user_id"]).json()
+    assert mine["usage"]["ai_chats_used"] == 1
+    assert anonymous["user_id"] == "demo_user"
+    assert anonymous["usage"]["ai_chats_used"] == 0
+
+
+# ==================== LA SOS ====================
+
+def test_live_call_budget_report_is_admin_only(api):
+    owner = register(api, email="owner@example.com")
+    admin = register(api, email="admin@example.com")
+    api.portal.call(server.db.users.update_one, {"id": admin["user"]["id"]}, {"$set": {"user_type": "admin"}})
+
+    assert api.get("/api/la-sos/budget").status_code in (401, 403)
+    mine = api.get("/api/la-sos/budget", headers=bearer(owner["access_token"])).json()
+    assert mine["your_calls_today"] == 0
+    assert "calls_today_by_route" not in mine and "projected_month_spend" not in mine
+    full = api.get("/api/la-sos/budget", headers=bearer(admin["access_token"])).json()
+    assert "calls_today_by_route" in full
+
+
+# ==================== HEALTH ====================
+
+def test_health_live(api):
+    assert api.get("/api/health/live").status_code == 200
+
+
+def test_health_ready_is_503_when_mongo_is_down(api, monkeypatch):
+    from pymongo.errors import ServerSelectionTimeoutError
+    from health import health_checker
+
+    async def refused(*args, **kwargs):
+        raise ServerSelectionTimeoutError("Connection refused")
+
+    monkeypatch.setattr(health_checker, "_cached", None)
+    assert api.get("/api/health/ready").status_code == 200
+    monkeypatch.setattr(health_checker, "_cached", None)
+    monkeypatch.setattr(server.db, "command", refused)
+    response = api.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"]["mongo"]["status"] == "fail"
+
+
+# ==================== METRICS ====================
+
+def test_metrics_count_requests_by_route_template(api, monkeypatch):
+    from metrics import HTTP_LATENCY, HTTP_REQUESTS
+
+    labels = {"method": "GET", "route": "/api/businesses/{business_id}", "status": "404"}
+    before = HTTP_REQUESTS.value(**labels)
+    api.get("/api/businesses/missing")
+    api.get("/api/businesses/also-missing")
+    assert HTTP_REQUESTS.value(**labels) == before + 2
+
+    text = api.get("/metrics").text
+    assert 'route="/api/businesses/{business_id}"' in text
+    assert f"{HTTP_LATENCY.name}_bucket" in text
+
+    monkeypatch.setattr(server, "METRICS_TOKEN", "scrape-secret")
+    assert api.get("/metrics").status_code == 401
+    assert api.get("/metrics", headers=bearer("scrape-secret")).status_code == 200
+
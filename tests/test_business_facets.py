@@ -0,0 +1,47 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+from business_facets import BusinessFacets, SearchFilters
+
+BUSINESSES = [
+    {"_id": "1", "business_name": "Creole Kitchen", "category": "food", "parish": "Orleans", "is_verified": True},
+    {"_id": "2", "business_name": "Bayou Bites", "category": "food", "parish": "Caddo"},
+    {"_id": "3", "business_name": "Crown Salon", "category": "beauty", "parish": "Orleans"},
+]
+
+
+def run(scenario):
+    async def main():
+        db = AsyncMongoMockClient()["facets_test"]
+        facets = BusinessFacets()
+        await facets.start(db)
+        await db.businesses.insert_many([dict(doc) for doc in BUSINESSES])
+        return await scenario(facets)
+    return asyncio.run(main())
+
+
+def counts(page, name):
+    return {bucket["value"]: bucket["count"] for bucket in page["facets"][name]}
+
+
+def test_match_combines_selected_facets():
+    filters = SearchFilters(category=["food"], parish=["Orleans", "Caddo"], verified=True)
+    assert filters.match(exclude="category") == {"$and": [
+        {"parish": {"$in": ["Caddo", "Orleans"]}}, {"is_verified": True}
+    ]}
+    assert SearchFilters(category=["food"]).match() == {"category": {"$in": ["food"]}}
+    assert SearchFilters(category=["food"]).match(exclude="category") == {}
+
+
+def test_each_facet_ignores_its_own_selection():
+    async def scenario(facets):
+        return await facets.search(SearchFilters(category=["food"], parish=["Orleans"]), {"_id": 1})
+
+    page = run(scenario)
+    assert page["total"] == 1
+    assert [doc["_id"] for doc in page["results"]] == ["1"]
+    # Categories are counted within Orleans, parishes within food
+    assert counts(page, "category") == {"food": 1, "beauty": 1}
+    assert counts(page, "parish") == {"Orleans": 1, "Caddo": 1}
+    assert counts(page, "verified") == {True: 1}
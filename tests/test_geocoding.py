@@ -0,0 +1,42 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+from la_geocoding import PARISH_CENTROIDS, ZIP3_CENTROIDS, backfill_business_locations, geocode
+
+
+def test_city_is_preferred_over_parish_and_zip():
+    point, precision = geocode("Lafayette", "70118", "Orleans")
+    assert precision == "city"
+    assert point["coordinates"] == [-92.0198, 30.2241]
+
+
+def test_parish_is_preferred_over_zip3():
+    point, precision = geocode("Nowhereville", "70601", "Bienville Parish")
+    assert precision == "parish"
+    assert point["coordinates"] == [PARISH_CENTROIDS["Bienville"][1], PARISH_CENTROIDS["Bienville"][0]]
+
+
+def test_zip3_is_the_last_resort():
+    point, precision = geocode(None, "70601", None)
+    assert precision == "zip3"
+    assert point["coordinates"] == [ZIP3_CENTROIDS["706"][1], ZIP3_CENTROIDS["706"][0]]
+    assert geocode("Nowhereville", "99999", "Nowhere") is None
+
+
+def test_backfill_upgrades_zip3_locations_when_a_parish_is_known():
+    async def scenario():
+        db = AsyncMongoMockClient()["geocoding_test"]
+        await db.businesses.insert_many([
+            {"_id": "a", "zip_code": "70601", "parish": "Bienville",
+             "location": {"type": "Point", "coordinates": [-93.2, 30.25]}, "location_precision": "zip3"},
+            {"_id": "b", "zip_code": "70601", "parish": None,
+             "location": {"type": "Point", "coordinates": [-93.2, 30.25]}, "location_precision": "zip3"},
+            {"_id": "c", "city": "Baton Rouge"},
+        ])
+        updated = await backfill_business_locations(db)
+        return updated, {doc["_id"]: doc.get("location_precision") async for doc in db.businesses.find()}
+
+    updated, precisions = asyncio.run(scenario())
+    assert updated == 2
+    assert precisions == {"a": "parish", "b": "zip3", "c": "city"}
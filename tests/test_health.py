@@ -0,0 +1,59 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import ServerSelectionTimeoutError
+
+import health
+from health import HealthChecker
+
+
+class DownDatabase:
+    async def command(self, name):
+        raise ServerSelectionTimeoutError("localhost:27017: [Errno 111] Connection refused")
+
+
+class HangingDatabase:
+    def __init__(self):
+        self.pings = 0
+
+    async def command(self, name):
+        self.pings += 1
+        await asyncio.sleep(3600)
+
+
+def test_ready_when_mongo_answers():
+    result = asyncio.run(HealthChecker().readiness(AsyncMongoMockClient()["health_test"], 100))
+    assert result["ready"]
+    assert result["checks"]["mongo"]["status"] == "ok"
+
+
+def test_not_ready_when_mongo_is_down():
+    result = asyncio.run(HealthChecker().readiness(DownDatabase(), 100))
+    assert not result["ready"]
+    assert result["status"] == "not_ready"
+    assert "Connection refused" in result["checks"]["mongo"]["error"]
+
+
+def test_hung_ping_times_out_and_is_shared_by_later_probes(monkeypatch):
+    monkeypatch.setattr(health, "HEALTH_MONGO_TIMEOUT", 0.01)
+    monkeypatch.setattr(health, "HEALTH_CACHE_SECONDS", 0)
+    db = HangingDatabase()
+
+    async def probes():
+        checker = HealthChecker()
+        first = await checker.readiness(db, 100)
+        second = await checker.readiness(db, 100)
+        checker._ping.cancel()
+        return first, second
+
+    first, second = asyncio.run(probes())
+    assert not first["ready"] and not second["ready"]
+    assert "timed out" in first["checks"]["mongo"]["error"]
+    assert db.pings == 1
+
+
+def test_not_ready_when_the_pool_is_saturated(monkeypatch):
+    monkeypatch.setattr(health.pool_monitor, "checked_out", 95)
+    result = asyncio.run(HealthChecker().readiness(AsyncMongoMockClient()["health_test"], 100))
+    assert not result["ready"]
+    assert result["checks"]["mongo_pool"]["status"] == "fail"
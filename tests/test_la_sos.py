@@ -0,0 +1,370 @@
+import asyncio
+from datetime import timedelta
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import la_sos_budget as la_sos_budget_module
+import la_sos_cache as la_sos_cache_module
+import la_sos_mirror as la_sos_mirror_module
+import la_sos_service
+from la_sos_budget import LaSosBudgetExceeded, attribute_calls, la_sos_budget
+from la_sos_cache import la_sos_cache
+from la_sos_mirror import la_sos_mirror
+from la_sos_name_index import name_index
+from la_sos_people_index import people_index
+from la_sos_transport import RecordingTransport, ReplayTransport
+from rate_limiter import SlidingWindow
+from resilience import CLOSED, CircuitOpenError
+
+
+class FakeSos:
+    """Stands in for the Commercial API: registered entities, charters and scripted 503s"""
+
+    def __init__(self):
+        self.entities = []
+        self.charters = {}
+        self.failures = 0
+        self.calls = 0
+
+    def register(self, name, number, status="Active"):
+        self.entities.append({"Name": name, "EntityNumber": number, "EntityTypeId": 1, "City": "BATON ROUGE",
+                              "EntityStatus": status, "TypeName": "Limited Liability Company"})
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            return httpx.Response(503)
+        params = request.url.params
+        if "EntityNumber" in params:
+            charter = self.charters.get(params["EntityNumber"])
+            if charter is None:
+                return httpx.Response(200, json={"Status": "Error", "Message": "Not found"})
+            return httpx.Response(200, json={"Status": "Success", "CharterDetails": charter})
+        # Like the state's search, a name matches anywhere in the registered name
+        wanted = params.get("EntityName", "").upper()
+        rows = [entity for entity in self.entities if wanted in entity["Name"].upper()]
+        return httpx.Response(200, json={"Status": "Success", "TokenType": "Test", "ResultCount": len(rows),
+                                         "EntitySearchResults": rows, "AgentOfficerSearchResults": []})
+
+
+@pytest.fixture
+def sos(monkeypatch):
+    fake = FakeSos()
+    la_sos_service.set_transport(httpx.MockTransport(fake))
+    breaker = la_sos_service.la_sos_breaker
+    breaker.state, breaker.failures, breaker._trial_in_flight = CLOSED, 0, False
+    monkeypatch.setattr(la_sos_service.LA_SOS_RETRY, "base_delay", 0)
+    yield fake
+    la_sos_service.set_transport(None)
+
+
+def run(scenario):
+    """Run scenario(db) with the LA SOS services started on a fresh mock database"""
+    async def main():
+        db = AsyncMongoMockClient()["la_sos_test"]
+        for service in (la_sos_cache, la_sos_budget, name_index, la_sos_mirror, people_index):
+            await service.start(db)
+        try:
+            return await scenario(db)
+        finally:
+            await la_sos_mirror.stop()
+            await people_index.stop()
+            for service in (name_index, la_sos_mirror, people_index):
+                await asyncio.gather(*service._pending)
+    return asyncio.run(main())
+
+
+async def settle():
+    """Let fire-and-forget index and mirror writes finish"""
+    for _ in range(3):
+        await asyncio.sleep(0)
+        await asyncio.gather(*name_index._pending, *la_sos_mirror._pending, *people_index._pending)
+
+
+# ==================== MIRROR ====================
+
+def test_list_search_is_answered_from_mirrored_name_prefix(sos):
+    sos.register("ACME PLUMBING LLC", "100K")
+
+    async def scenario(db):
+        await la_sos_service.search_businesses(entity_name="Acme Plumbing")
+        await settle()
+        return await la_sos_service.search_businesses(entity_name="Acme")
+
+    result = run(scenario)
+    assert sos.calls == 1
+    assert result["source"] == "mirror"
+    assert [row["entity_number"] for row in result["results"]] == ["100K"]
+
+
+def test_name_check_does_not_trust_a_mirrored_prefix(sos):
+    sos.register("ACME PLUMBING LLC", "100K")
+    sos.register("ACME LLC", "200K")
+
+    async def scenario(db):
+        await la_sos_service.search_businesses(entity_name="Acme Plumbing")
+        await settle()
+        checked = await la_sos_service.check_name_availability("Acme")
+        return checked, await name_index.recently_confirmed("Acme")
+
+    checked, confirmed = run(scenario)
+    assert sos.calls == 2
+    assert not checked["is_available"]
+    assert checked["exact_match"]["entity_number"] == "200K"
+    assert confirmed
+
+
+def test_name_check_answered_by_a_mirror_replay_is_local(sos):
+    sos.register("BAYOU BAKERY LLC", "300K")
+
+    async def scenario(db):
+        await la_sos_service.search_businesses(entity_name="Bayou Bakery")
+        await settle()
+        # The name index lost the row, the mirror still replays the search
+        await db.la_sos_names.delete_many({})
+        checked = await la_sos_service.check_name_availability("Bayou Bakery")
+        return checked, await name_index.recently_confirmed("Bayou Bakery")
+
+    checked, confirmed = run(scenario)
+    assert sos.calls == 1
+    assert checked["source"] == "local"
+    assert not confirmed
+
+
+def test_sync_refreshes_live_entities_by_age_most_requested_first(sos):
+    for number in ("1K", "2K", "3K", "4K"):
+        sos.charters[number] = {"CharterNumber": number, "CharterName": f"ENTITY {number} LLC",
+                                "CharterStatusDescription": "Active", "City": "BATON ROUGE",
+                                "Agents": [], "Officers": []}
+
+    async def scenario(db):
+        now = la_sos_mirror_module._utcnow()
+        stale = now - timedelta(seconds=la_sos_mirror_module.LA_SOS_MIRROR_MAX_AGE_SECONDS + 60)
+        await db.la_sos_entities.insert_many([
+            {"_id": "live:1:1K", "token": "live", "entity_type_id": 1, "entity_number": "1K",
+             "refreshed_at": now, "requests": 9, "seen_at": now},
+            {"_id": "live:1:2K", "token": "live", "entity_type_id": 1, "entity_number": "2K",
+             "refreshed_at": stale, "requests": 1, "seen_at": now},
+            {"_id": "live:1:3K", "token": "live", "entity_type_id": 1, "entity_number": "3K",
+             "refreshed_at": None, "requests": 5, "seen_at": now},
+            {"_id": "test:1:4K", "token": "test", "entity_type_id": 1, "entity_number": "4K",
+             "refreshed_at": stale, "requests": 9, "seen_at": now},
+        ])
+        first = await la_sos_mirror.sync_once(limit=1)
+        await settle()
+        first_refreshed = await db.la_sos_entities.find_one({"_id": "live:1:3K"})
+        second = await la_sos_mirror.sync_once(limit=10)
+        await settle()
+        refreshed = {doc["_id"]: doc["refreshed_at"] async for doc in db.la_sos_entities.find()}
+        return first, first_refreshed, second, refreshed, await la_sos_mirror.stats()
+
+    first, first_refreshed, second, refreshed, stats = run(scenario)
+    # Never refreshed and most requested first, then the stale one; fresh and test-token entities are left alone
+    assert first == {"due": 1, "budget": 1, "refreshed": 1, "failed": 0}
+    assert first_refreshed["refreshed_at"] is not None
+    assert second == {"due": 1, "budget": 1, "refreshed": 1, "failed": 0}
+    assert sos.calls == 2
+    untouched = refreshed["live:1:1K"]
+    assert refreshed["live:1:3K"] >= untouched and refreshed["live:1:2K"] >= untouched
+    assert refreshed["test:1:4K"] < untouched
+    assert stats["due_for_refresh"] == 0
+
+
+# ==================== BUDGET ====================
+
+async def budget_state(db):
+    """Today's counters by scope|key, and the hits in the shared minute window"""
+    day = la_sos_budget_module._utcnow().strftime("%Y-%m-%d")
+    counters = {doc["_id"].split("|", 1)[1]: doc["calls"] async for doc in db.la_sos_budget.find({"day": day})}
+    window = await db.rate_limits.find_one({"_id": "la_sos_live"})
+    return counters, len(window["hits"]) if window else 0
+
+
+def test_daily_rejection_is_not_counted_in_the_minute_window(monkeypatch):
+    monkeypatch.setattr(la_sos_budget_module, "LA_SOS_DAILY_CALLS_PER_USER", 1)
+    monkeypatch.setattr(la_sos_budget, "_minute", SlidingWindow(5, 60))
+
+    async def scenario(db):
+        attribute_calls("user-1", "lookup")
+        await la_sos_budget.charge("lookup")
+        with pytest.raises(LaSosBudgetExceeded) as refused:
+            await la_sos_budget.charge("lookup")
+        return refused.value.scope, await budget_state(db)
+
+    scope, (counters, minute_hits) = run(scenario)
+    assert scope == "user"
+    assert counters == {"total|all": 1, "route|lookup": 1, "user|user-1": 1}
+    assert minute_hits == 1
+
+
+def test_minute_rejection_rolls_back_daily_counters(monkeypatch):
+    monkeypatch.setattr(la_sos_budget, "_minute", SlidingWindow(1, 60))
+
+    async def scenario(db):
+        attribute_calls("user-1", "search")
+        await la_sos_budget.charge("search")
+        with pytest.raises(LaSosBudgetExceeded) as refused:
+            await la_sos_budget.charge("search")
+        return refused.value.scope, await budget_state(db)
+
+    scope, (counters, minute_hits) = run(scenario)
+    assert scope == "minute"
+    assert counters == {"total|all": 1, "route|search": 1, "user|user-1": 1}
+    assert minute_hits == 1
+
+
+def test_retries_are_charged_and_calls_refused_by_the_breaker_are_not(sos, monkeypatch):
+    monkeypatch.setattr(la_sos_budget, "_minute", SlidingWindow(100, 60))
+    monkeypatch.setattr(la_sos_service.LA_SOS_RETRY, "attempts", 2)
+    monkeypatch.setattr(la_sos_service.la_sos_breaker, "failure_threshold", 2)
+    sos.failures = 10
+
+    async def scenario(db):
+        failed = await la_sos_service.lookup_business("100K", use_test_token=False)
+        with pytest.raises(CircuitOpenError):
+            await la_sos_service.lookup_business("200K", use_test_token=False)
+        return failed, await budget_state(db)
+
+    failed, (counters, minute_hits) = run(scenario)
+    assert failed["status_code"] == 503
+    assert sos.calls == 2
+    assert counters["total|all"] == 2
+    assert minute_hits == 2
+
+
+# ==================== PEOPLE INDEX ====================
+
+def charter(number, name, agent):
+    return {"entity_type": "Charter", "entity_number": number, "name": name, "status": "Active",
+            "city": "BATON ROUGE", "agents": [{"name": agent}], "officers": []}
+
+
+def test_people_backfill_is_marked_finished_only_after_it_succeeds(monkeypatch):
+    import la_sos_people_index
+    monkeypatch.setattr(la_sos_people_index, "PEOPLE_BACKFILL_RETRY_SECONDS", 0)
+    record_many = people_index._record_many
+    attempts = []
+
+    async def flaky(lookups):
+        attempts.append(len(lookups))
+        if len(attempts) == 1:
+            raise RuntimeError("connection reset")
+        return await record_many(lookups)
+
+    async def scenario(db):
+        await people_index.stop()
+        await db.la_sos_sync_state.delete_many({})
+        await db.la_sos_entities.insert_many([
+            {"_id": "Charter:1", "details": charter("1", "ACME LLC", "Marie Johnson")},
+            {"_id": "Charter:2", "details": charter("2", "BAYOU LLC", "Johnson, Marie")},
+        ])
+        monkeypatch.setattr(people_index, "_record_many", flaky)
+        await people_index._backfill_once()
+        marker = await db.la_sos_sync_state.find_one({"_id": "people_backfill"})
+        return marker, await people_index.search("Marie Johnson")
+
+    marker, people = run(scenario)
+    assert len(attempts) == 2
+    assert marker["links"] == 2 and "finished_at" in marker and "claimed_until" not in marker
+    assert [len(person["entities"]) for person in people] == [2]
+
+
+def test_people_backfill_retakes_a_lapsed_claim_and_skips_a_finished_one():
+    async def scenario(db):
+        await people_index.stop()
+        # An interrupted run of the old one-shot marker: started, never finished
+        await db.la_sos_sync_state.replace_one({"_id": "people_backfill"}, {"started_at": "earlier"}, upsert=True)
+        retaken = await people_index._claim_backfill()
+        await db.la_sos_sync_state.update_one({"_id": "people_backfill"}, {"$set": {"finished_at": "now"}})
+        return retaken, await people_index._claim_backfill()
+
+    retaken, again = run(scenario)
+    assert retaken
+    assert not again
+
+
+# ==================== NAME INDEX ====================
+
+def test_similar_names_use_cached_trigram_posting_counts():
+    async def scenario(db):
+        await name_index.record_entities([
+            {"name": "Bayou Bakery LLC", "entity_number": "1"},
+            {"name": "Bayou Bakers Inc", "entity_number": "2"},
+            {"name": "Crescent Plumbing LLC", "entity_number": "3"},
+        ])
+        similar = await name_index.similar("Bayou Bakery Co")
+        counts = await name_index._posting_counts(["BAY", "PLU", "ZZZ"])
+        # A name added later is not counted until the cached count expires
+        await name_index.record_entities([{"name": "Bayou Bistro LLC", "entity_number": "4"}])
+        return similar, counts, await name_index._posting_counts(["BAY"])
+
+    similar, counts, cached = run(scenario)
+    assert [match["entity_number"] for match in similar] == ["2"]
+    assert counts == {"BAY": 2, "PLU": 1, "ZZZ": 0}
+    assert cached == {"BAY": 2}
+
+
+# ==================== CACHE ====================
+
+def test_cache_serves_stale_results_while_revalidating():
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        return {"name": f"ACME LLC v{len(fetches)}"}
+
+    async def failing():
+        return {"error": "Request timed out. Please try again."}
+
+    async def scenario(db):
+        age = la_sos_cache_module.LA_SOS_CACHE_FRESH_SECONDS + 60
+        fetched_at = la_sos_cache_module._utcnow() - timedelta(seconds=age)
+        await db.la_sos_cache.insert_one({"_id": "lookup:a", "result": {"name": "ACME LLC v0"}, "fetched_at": fetched_at})
+        stale = await la_sos_cache.get("lookup:a", fetch)
+        await asyncio.gather(*la_sos_cache._pending)
+        fresh = await la_sos_cache.get("lookup:a", fetch)
+
+        # Past the revalidate window the fetch is awaited; when it fails the old copy still answers
+        age = la_sos_cache_module.LA_SOS_CACHE_REVALIDATE_SECONDS + 60
+        fetched_at = la_sos_cache_module._utcnow() - timedelta(seconds=age)
+        await db.la_sos_cache.insert_one({"_id": "lookup:b", "result": {"name": "OLD LLC"}, "fetched_at": fetched_at})
+        fallback = await la_sos_cache.get("lookup:b", failing)
+        uncached = await la_sos_cache.get("lookup:c", failing)
+        return stale, fresh, fallback, uncached, await db.la_sos_cache.count_documents({})
+
+    stale, fresh, fallback, uncached, stored = run(scenario)
+    assert (stale["name"], stale["stale"]) == ("ACME LLC v0", True)
+    assert (fresh["name"], fresh["stale"]) == ("ACME LLC v1", False)
+    assert len(fetches) == 1
+    assert (fallback["name"], fallback["stale"]) == ("OLD LLC", True)
+    assert "error" in uncached
+    assert stored == 2
+
+
+# ==================== RECORD / REPLAY ====================
+
+def test_recorded_responses_replay_without_secrets(sos, tmp_path):
+    sos.register("ACME PLUMBING LLC", "100K")
+
+    async def call(transport, token, name):
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.get("https://commercialapi.sos.la.gov/api/Search",
+                                    params={"Token": token, "EntityName": name})
+
+    async def scenario():
+        recorded = await call(RecordingTransport(str(tmp_path), inner=httpx.MockTransport(sos)), "secret", "Acme")
+        replay = ReplayTransport(str(tmp_path))
+        # Fixtures ignore the token and the case of query values
+        replayed = await call(replay, "other-token", "ACME")
+        missing = await call(replay, "secret", "Bayou")
+        return recorded, replayed, missing
+
+    recorded, replayed, missing = asyncio.run(scenario())
+    assert sos.calls == 1
+    assert replayed.json() == recorded.json()
+    assert missing.status_code == 404
+    assert "secret" not in "".join(path.read_text() for path in tmp_path.glob("*.json"))
+
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from query_profiler import SlowQueryProfiler, query_shape, summarize_plan
+
+
+def command(profiler, request_id, duration_ms, name="find", failed=False, **fields):
+    """Feed one command's started and finished events through the listener"""
+    body = {name: "businesses", **fields}
+    profiler.started(SimpleNamespace(command_name=name, request_id=request_id, connection_id=1,
+                                     database_name="dowurk", command=body))
+    finished = SimpleNamespace(command_name=name, request_id=request_id, connection_id=1,
+                               duration_micros=int(duration_ms * 1000))
+    (profiler.failed if failed else profiler.succeeded)(finished)
+
+
+def test_query_shape_masks_literals():
+    assert query_shape({"city": "Baton Rouge", "category": {"$in": ["food", "beauty"]}}) == \
+        {"city": "?", "category": {"$in": ["?"]}}
+    assert query_shape([{"$match": {"parish": "Orleans"}}]) == [{"$match": {"parish": "?"}}]
+
+
+def test_slow_commands_are_grouped_by_shape():
+    profiler = SlowQueryProfiler(threshold_ms=50, explain=False)
+    command(profiler, 1, 120, filter={"city": "New Orleans"})
+    command(profiler, 2, 80, filter={"city": "Shreveport"})
+    command(profiler, 3, 10, filter={"city": "Monroe"})
+    command(profiler, 4, 300, failed=True, filter={"parish": "Caddo"})
+    # Commands that are never explained (e.g. inserts) are ignored
+    command(profiler, 5, 900, name="insert", documents=[{}])
+
+    report = profiler.report()
+    assert report["shapes_tracked"] == 2
+    by_filter = {str(entry["shape"]["filter"]): entry for entry in report["queries"]}
+    city = by_filter[str({"city": "?"})]
+    assert (city["count"], city["total_ms"], city["max_ms"], city["avg_ms"]) == (2, 200.0, 120.0, 100.0)
+    assert by_filter[str({"parish": "?"})]["failures"] == 1
+    assert [entry["total_ms"] for entry in report["queries"]] == [300.0, 200.0]
+
+
+def test_summarize_plan_finds_collection_scans_and_indexes():
+    explain = {
+        "queryPlanner": {"winningPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "city_1"}}},
+        "executionStats": {"totalDocsExamined": 12, "totalKeysExamined": 12, "nReturned": 12, "executionTimeMillis": 3}
+    }
+    plan = summarize_plan(explain)
+    assert plan["stages"] == ["FETCH", "IXSCAN"]
+    assert plan["indexes"] == ["city_1"] and not plan["collection_scan"]
+
+    aggregate = {"stages": [{"$cursor": {
+        "queryPlanner": {"winningPlan": {"stage": "COLLSCAN"}},
+        "executionStats": {"totalDocsExamined": 5000}
+    }}]}
+    plan = summarize_plan(aggregate)
+    assert plan["collection_scan"] and plan["docs_examined"] == 5000
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import DuplicateKeyError
+
+from rate_limiter import (
+    MemoryRateLimitStore,
+    MongoRateLimitStore,
+    RateLimiter,
+    SlidingWindow,
+    TokenBucket
+)
+
+
+def memory_store():
+    return MemoryRateLimitStore()
+
+
+def mongo_store():
+    return MongoRateLimitStore(AsyncMongoMockClient()["rate_limit_test"]["rate_limits"])
+
+
+@pytest.fixture(params=[memory_store, mongo_store], ids=["memory", "mongo"])
+def store(request):
+    return request.param()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_sliding_window_allows_up_to_limit(store):
+    window = SlidingWindow(3, 60)
+
+    async def scenario():
+        return [await window.hit(store, "client", 1000.0 + i) for i in range(4)]
+
+    results = run(scenario())
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert [result.remaining for result in results[:3]] == [2, 1, 0]
+    assert results[3].retry_after == pytest.approx(57.0)
+
+
+def test_sliding_window_frees_slots_after_window(store):
+    window = SlidingWindow(2, 60)
+
+    async def scenario():
+        await window.hit(store, "client", 1000.0)
+        await window.hit(store, "client", 1010.0)
+        blocked = await window.hit(store, "client", 1020.0)
+        reopened = await window.hit(store, "client", 1061.0)
+        return blocked, reopened
+
+    blocked, reopened = run(scenario())
+    assert not blocked.allowed
+    assert reopened.allowed
+
+
+def test_sliding_window_keys_are_independent(store):
+    window = SlidingWindow(1, 60)
+
+    async def scenario():
+        return await window.hit(store, "a", 1000.0), await window.hit(store, "b", 1000.0)
+
+    first, second = run(scenario())
+    assert first.allowed and second.allowed
+
+
+def test_sliding_window_zero_limit_blocks_everything(store):
+    result = run(SlidingWindow(0, 60).hit(store, "client", 1000.0))
+    assert not result.allowed
+    assert result.remaining == 0
+
+
+def test_token_bucket_refills(store):
+    bucket = TokenBucket(2, 1.0)
+
+    async def scenario():
+        hits = [await bucket.hit(store, "client", 1000.0) for _ in range(3)]
+        hits.append(await bucket.hit(store, "client", 1001.0))
+        return hits
+
+    results = run(scenario())
+    assert [result.allowed for result in results] == [True, True, False, True]
+    assert results[2].retry_after == pytest.approx(1.0)
+
+
+def test_limiter_uses_its_own_empty_store():
+    # An empty MemoryRateLimitStore is falsy (it defines __len__) but must still be used
+    store = MemoryRateLimitStore()
+    limiter = RateLimiter("test", SlidingWindow(1, 60), key_func=lambda request: "client",
+                          store=store)
+    run(limiter(None))
+    assert len(store) == 1
+
+
+def test_mongo_store_retries_concurrent_first_hit():
+    store = mongo_store()
+    update = store.collection.find_one_and_update
+    calls = []
+
+    async def racing_update(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise DuplicateKeyError("E11000 duplicate key error")
+        return await update(*args, **kwargs)
+
+    store.collection.find_one_and_update = racing_update
+    result = run(SlidingWindow(2, 60).hit(store, "client", 1000.0))
+    assert result.allowed
+    assert len(calls) == 2
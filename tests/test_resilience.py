@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from resilience import (
+    BREAKERS,
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    call_upstream
+)
+
+
+@pytest.fixture
+def breaker():
+    breaker = CircuitBreaker("test_upstream", "test service", failure_threshold=2, reset_seconds=30)
+    yield breaker
+    BREAKERS.pop("test_upstream", None)
+
+
+def failed(result, error):
+    if error is not None:
+        return str(error)
+    return None if result == "ok" else f"bad result {result}"
+
+
+def call(breaker, results, retry=RetryPolicy(attempts=1)):
+    """Run call_upstream over scripted attempt outcomes (values are returned, exceptions raised)"""
+    outcomes = iter(results)
+
+    async def attempt():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return asyncio.run(call_upstream(breaker, attempt, failed, retry))
+
+
+def test_consecutive_failures_open_the_circuit(breaker):
+    assert call(breaker, ["bad"]) == "bad"
+    assert breaker.state == CLOSED
+    assert call(breaker, ["ok"]) == "ok"
+    assert breaker.failures == 0
+
+    call(breaker, ["bad"])
+    with pytest.raises(ConnectionError):
+        call(breaker, [ConnectionError("reset")])
+    assert breaker.state == OPEN
+    assert breaker.snapshot()["last_failure"] == "reset"
+
+    with pytest.raises(CircuitOpenError) as refused:
+        call(breaker, ["ok"])
+    assert refused.value.status_code == 503
+    assert int(refused.value.headers["Retry-After"]) >= 1
+
+
+def test_half_open_trial_closes_or_reopens_the_circuit(breaker):
+    call(breaker, ["bad"])
+    call(breaker, ["bad"])
+    breaker.opened_at -= breaker.reset_seconds
+
+    # One trial call goes through; a second caller is refused while it is in flight
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure("still down")
+    assert breaker.state == OPEN
+
+    breaker.opened_at -= breaker.reset_seconds
+    assert call(breaker, ["ok"]) == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_retries_stop_once_the_circuit_opens(breaker):
+    retry = RetryPolicy(attempts=5, base_delay=0)
+    assert call(breaker, ["bad", "ok"], retry) == "ok"
+    assert breaker.state == CLOSED
+
+    # Two failures open the circuit, so the remaining attempts are not made
+    assert call(breaker, ["bad", "bad", "ok"], retry) == "bad"
+    assert breaker.state == OPEN
+
+
+def test_abandoned_trial_lets_another_through(breaker):
+    call(breaker, ["bad"])
+    call(breaker, ["bad"])
+    breaker.opened_at -= breaker.reset_seconds
+
+    async def cancelled():
+        raise asyncio.CancelledError()
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(call_upstream(breaker, cancelled, failed))
+    assert breaker.state == HALF_OPEN
+    assert call(breaker, ["ok"]) == "ok"
+    assert breaker.state == CLOSED
@@ -0,0 +1,54 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import tracing
+from tracing import TracingMiddleware, exporter, parse_traceparent, span
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+
+
+@pytest.fixture
+def traced(monkeypatch):
+    monkeypatch.setattr(exporter, "enabled", True)
+    exporter._drain()
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        with span("lookup", item=item_id) as child:
+            child.set(found=True)
+        return {"id": item_id}
+
+    yield TestClient(app)
+    exporter._drain()
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f"00-{TRACE_ID}-00f067aa0ba902b7-01") == (TRACE_ID, "00f067aa0ba902b7", True)
+    assert parse_traceparent(f"00-{TRACE_ID}-00f067aa0ba902b7-00")[2] is False
+    assert parse_traceparent("00-xyz-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(f"00-{'0' * 32}-00f067aa0ba902b7-01") is None
+    assert parse_traceparent(None) is None
+
+
+def test_sampled_request_is_traced_by_route_template(traced):
+    response = traced.get("/items/42", headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-01"})
+    assert response.headers["traceparent"].startswith(f"00-{TRACE_ID}-")
+
+    child, root = exporter._drain()
+    assert root.name == "GET /items/{item_id}"
+    assert root.parent_id == "00f067aa0ba902b7"
+    assert root.attributes["http.status_code"] == 200
+    assert (child.name, child.parent_id, child.trace_id) == ("lookup", root.span_id, TRACE_ID)
+    assert child.attributes == {"item": "42", "found": True}
+    assert root.to_zipkin()["kind"] == "SERVER"
+
+
+def test_unsampled_requests_record_nothing(traced, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0)
+    traced.get("/items/1")
+    response = traced.get("/items/2", headers={"traceparent": f"00-{TRACE_ID}-00f067aa0ba902b7-00"})
+    assert "traceparent" not in response.headers
+    assert exporter._drain() == []
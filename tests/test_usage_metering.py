@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from mongomock_motor import AsyncMongoMockClient
+
+from usage_metering import UsageMeter, current_period
+
+
+def run(scenario):
+    """Run scenario(meter, db) against a meter started on a fresh mock database"""
+    async def main():
+        db = AsyncMongoMockClient()["metering_test"]
+        meter = UsageMeter()
+        await meter.start(db)
+        try:
+            return await scenario(meter, db)
+        finally:
+            await meter.stop()
+    return asyncio.run(main())
+
+
+def counter_id(user_key, metric="ai_chats_per_month"):
+    return f"{user_key}:{metric}:{current_period()}"
+
+
+def test_free_tier_is_refused_once_the_monthly_limit_is_used():
+    async def scenario(meter, db):
+        for _ in range(20):
+            await meter.acquire("ip:10.0.0.1", "ai_chats_per_month")
+        with pytest.raises(HTTPException) as refused:
+            await meter.acquire("ip:10.0.0.1", "ai_chats_per_month")
+        # Another caller has its own quota
+        await meter.acquire("ip:10.0.0.2", "ai_chats_per_month")
+        return refused.value
+
+    assert run(scenario).status_code == 429
+
+
+def test_refund_before_flush_returns_the_unit_to_the_lease():
+    async def scenario(meter, db):
+        await meter.acquire("ip:10.0.0.1", "ai_chats_per_month")
+        await meter.release("ip:10.0.0.1", "ai_chats_per_month")
+        return await meter.get_usage("ip:10.0.0.1")
+
+    assert run(scenario)["usage"]["ai_chats_used"] == 0
+
+
+def test_refund_after_flush_is_written_to_the_shared_counter():
+    async def scenario(meter, db):
+        await meter.acquire("ip:10.0.0.1", "ai_chats_per_month")
+        await meter.acquire("ip:10.0.0.1", "ai_chats_per_month")
+        await meter.flush(return_all=True)
+        flushed = await db.usage_counters.find_one({"_id": counter_id("ip:10.0.0.1")})
+        await meter.release("ip:10.0.0.1", "ai_chats_per_month")
+        refunded = await db.usage_counters.find_one({"_id": counter_id("ip:10.0.0.1")})
+        return flushed, refunded
+
+    flushed, refunded = run(scenario)
+    assert (flushed["used"], flushed["reserved"]) == (2, 2)
+    assert (refunded["used"], refunded["reserved"]) == (1, 1)
+
+
+def test_refunded_units_can_be_used_again_at_the_limit():
+    async def scenario(meter, db):
+        for _ in range(20):
+            await meter.acquire("ip:10.0.0.1", "ai_chats_per_month")
+        await meter.flush(return_all=True)
+        await meter.release("ip:10.0.0.1", "ai_chats_per_month")
+        await meter.acquire("ip:10.0.0.1", "ai_chats_per_month")
+        with pytest.raises(HTTPException):
+            await meter.acquire("ip:10.0.0.1", "ai_chats_per_month")
+
+    run(scenario)